@@ -0,0 +1,78 @@
+"""
+Side-by-side timing of the same BDD feature on the Selenium and Playwright engines.
+
+Runs the step definitions of a feature once per engine (same browser, device and
+options), reads the per-scenario durations from JUnit XML and prints them next to
+each other with the wall-clock time of each run.
+
+Usage:
+    python -m benchmarks.bench_engines
+    python -m benchmarks.bench_engines --tests tests/test_order_page.py -- --headless --device=iphone17
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ElementTree
+
+
+ENGINES = ("selenium", "playwright")
+
+
+def run_engine(engine: str, tests: str, extra_args: list) -> tuple:
+    """
+    Run pytest for one engine
+
+    Returns:
+        tuple: ({test name: (seconds, outcome)}, wall-clock seconds)
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        junit_path = os.path.join(tmp_dir, "junit.xml")
+        command = [sys.executable, "-m", "pytest", tests, f"--engine={engine}",
+                   f"--junitxml={junit_path}", "-q", "-p", "no:cacheprovider", *extra_args]
+        start = time.perf_counter()
+        subprocess.run(command, check=False)
+        wall_seconds = time.perf_counter() - start
+
+        results = {}
+        if os.path.exists(junit_path):
+            for case in ElementTree.parse(junit_path).iter("testcase"):
+                failed = case.find("failure") is not None or case.find("error") is not None
+                skipped = case.find("skipped") is not None
+                outcome = "failed" if failed else "skipped" if skipped else "passed"
+                results[case.get("name")] = (float(case.get("time", 0)), outcome)
+    return results, wall_seconds
+
+
+def print_report(results: dict, wall_times: dict):
+    names = sorted({name for engine_results in results.values() for name in engine_results})
+    header = f"{'scenario':<62}" + "".join(f"{engine:>20}" for engine in ENGINES)
+    print("\n" + header)
+    print("-" * len(header))
+    for name in names:
+        row = f"{name[:62]:<62}"
+        for engine in ENGINES:
+            seconds, outcome = results[engine].get(name, (0.0, "missing"))
+            row += f"{f'{seconds:.2f}s ({outcome})':>20}"
+        print(row)
+    print("-" * len(header))
+    totals = f"{'total (sum of scenarios)':<62}"
+    totals += "".join(f"{sum(s for s, _ in results[engine].values()):>19.2f}s" for engine in ENGINES)
+    print(totals)
+    print(f"{'wall clock (incl. startup)':<62}" + "".join(f"{wall_times[engine]:>19.2f}s" for engine in ENGINES))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tests", default="tests/test_order_page.py",
+                        help="Test module holding the feature's scenarios (default: features/order_page.feature)")
+    parser.add_argument("pytest_args", nargs=argparse.REMAINDER, help="Extra pytest options after --")
+    args = parser.parse_args()
+    extra = [arg for arg in args.pytest_args if arg != "--"]
+
+    all_results, all_wall_times = {}, {}
+    for engine_name in ENGINES:
+        all_results[engine_name], all_wall_times[engine_name] = run_engine(engine_name, args.tests, extra)
+    print_report(all_results, all_wall_times)
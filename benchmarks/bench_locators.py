@@ -0,0 +1,60 @@
+"""
+Micro-benchmark for the Playwright -> Selenium locator compiler.
+
+Measures compile cost per locator string against the memoized registry lookup and,
+when --url is given, the in-browser lookup time of each emitted strategy.
+
+Usage:
+    python -m benchmarks.bench_locators
+    python -m benchmarks.bench_locators --url https://staging.inline.app/... --headless
+"""
+import argparse
+import time
+
+from locators.order_page_locators import OrderPageLocators  # noqa: F401  (fills the registry)
+from utils.drivers import create_driver, get_device_class
+from utils.locator_converter import LOCATOR_REGISTRY, compile_locator
+
+
+def _per_call_us(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def bench_compile(iterations: int):
+    print(f"{'locator':<60} {'strategy':<14} {'compile us':>11} {'lookup us':>10}")
+    for source in LOCATOR_REGISTRY.sources():
+        compile_us = _per_call_us(lambda: compile_locator(source), iterations)
+        lookup_us = _per_call_us(lambda: LOCATOR_REGISTRY.get(source), iterations)
+        strategy = LOCATOR_REGISTRY.get(source)[0]
+        print(f"{source[:60]:<60} {strategy:<14} {compile_us:>11.2f} {lookup_us:>10.3f}")
+
+
+def bench_browser_lookup(url: str, headless: bool, iterations: int):
+    driver = create_driver("chrome", headless, get_device_class("desktop"))
+    try:
+        driver.get(url)
+        print(f"\n{'locator':<60} {'strategy':<14} {'matches':>7} {'find_elements ms':>17}")
+        for source in LOCATOR_REGISTRY.sources():
+            locator_type, locator_value = LOCATOR_REGISTRY.get(source)
+            matches = len(driver.find_elements(locator_type, locator_value))
+            lookup_ms = _per_call_us(
+                lambda: driver.find_elements(locator_type, locator_value), iterations
+            ) / 1000
+            print(f"{source[:60]:<60} {locator_type:<14} {matches:>7} {lookup_ms:>17.2f}")
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--url", help="Page to run the emitted locators against (Chrome)")
+    parser.add_argument("--headless", action="store_true")
+    args = parser.parse_args()
+
+    bench_compile(args.iterations)
+    if args.url:
+        bench_browser_lookup(args.url, args.headless, max(1, args.iterations // 100))
@@ -0,0 +1,165 @@
+"""
+Startup benchmark: pytest collection time, fixture setup time and the per-step setup
+cost of page objects. Measured in a fresh interpreter:
+
+    collection      wall-clock time of `pytest --collect-only` (imports, pytest_configure,
+                    feature parsing), median of --runs
+    session         wall-clock time of a pytest run of --tests generated tests that set up
+                    the fixtures of a browser test that need no browser (device,
+                    matrix_device, network_proxy, test_config, base_url), median of --runs
+    fixture setup   setup phase of one of those tests (pytest's own report duration), median
+    page object     OrderPage(None) per call; every step builds its page objects
+    config          Config.current() per call (the cached session config)
+
+With --baseline REF the same measurements run on a git worktree of REF, e.g. the commit
+before a change, and are printed side by side.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --baseline HEAD~1 --runs 7
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the measured tree; only uses APIs present before and after the Config change
+PER_CALL_SCRIPT = """
+import timeit
+from config.config import Config
+from pages.order_page import OrderPage
+current = getattr(Config, "current", Config)
+number = {iterations}
+print(timeit.timeit(lambda: OrderPage(None), number=number) / number * 1e6)
+print(timeit.timeit(current, number=number) / number * 1e6)
+"""
+
+# Written into the measured tree for one run, so the tree's conftest.py provides the fixtures
+SETUP_TEST_FILE = os.path.join("benchmarks", "_setup_bench_test.py")
+SETUP_TEST = """
+import pytest
+
+
+@pytest.mark.parametrize("run", range({tests}))
+def test_fixture_setup(run, device, matrix_device, network_proxy, test_config, base_url):
+    pass
+"""
+
+# Loaded with -p from a temporary directory: setup phase durations of the tests above
+SETUP_PLUGIN = """
+import json
+import os
+
+durations = []
+
+
+def pytest_runtest_logreport(report):
+    if report.when == "setup":
+        durations.append(report.duration)
+
+
+def pytest_sessionfinish(session):
+    with open(os.environ["BENCH_SETUP_OUTPUT"], "w") as output:
+        json.dump(durations, output)
+"""
+
+
+def measure_setup(tree: str, runs: int, tests: int) -> tuple:
+    """
+    Returns:
+        tuple: (session seconds, fixture setup ms per test), medians
+    """
+    sessions, setups = [], []
+    test_path = os.path.join(tree, SETUP_TEST_FILE)
+    with open(test_path, "w") as test_file:
+        test_file.write(SETUP_TEST.format(tests=tests))
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with open(os.path.join(tmp_dir, "bench_setup_plugin.py"), "w") as plugin:
+                plugin.write(SETUP_PLUGIN)
+            output = os.path.join(tmp_dir, "setup.json")
+            env = dict(os.environ, BENCH_SETUP_OUTPUT=output,
+                       PYTHONPATH=os.pathsep.join(filter(None, [tmp_dir, os.getenv("PYTHONPATH")])))
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.run(
+                    [sys.executable, "-m", "pytest", SETUP_TEST_FILE, "-q", "-p", "no:cacheprovider",
+                     "-p", "bench_setup_plugin"],
+                    cwd=tree, env=env, check=True, stdout=subprocess.DEVNULL,
+                )
+                sessions.append(time.perf_counter() - start)
+                with open(output) as durations:
+                    setups.extend(json.load(durations))
+    finally:
+        os.remove(test_path)
+    return statistics.median(sessions), statistics.median(setups) * 1000
+
+
+def measure(tree: str, runs: int, iterations: int, tests: int) -> dict:
+    """
+    Returns:
+        dict: collection and session seconds, fixture setup in ms per test (medians),
+              page object and config construction in us per call
+    """
+    collection = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider"],
+            cwd=tree, check=True, stdout=subprocess.DEVNULL,
+        )
+        collection.append(time.perf_counter() - start)
+    session, fixture_setup = measure_setup(tree, runs, tests)
+    output = subprocess.run(
+        [sys.executable, "-c", PER_CALL_SCRIPT.format(iterations=iterations)],
+        cwd=tree, check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return {
+        "collection": statistics.median(collection),
+        "session": session,
+        "fixture setup": fixture_setup,
+        "page object": float(output[0]),
+        "config": float(output[1]),
+    }
+
+
+def measure_baseline(ref: str, runs: int, iterations: int, tests: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tree = os.path.join(tmp_dir, "baseline")
+        subprocess.run(["git", "worktree", "add", "--detach", tree, ref], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL)
+        try:
+            return measure(tree, runs, iterations, tests)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", tree], cwd=ROOT, check=False)
+
+
+def print_results(results: dict):
+    names = list(results)
+    print(f"{'':<14}" + "".join(f"{name:>16}" for name in names))
+    units = {"collection": "s", "session": "s", "fixture setup": "ms", "page object": "us", "config": "us"}
+    for metric, unit in units.items():
+        values = "".join(f"{results[name][metric]:>13.3f} {unit:<2}" for name in names)
+        print(f"{metric:<14}{values}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", help="Git ref to compare with (checked out in a temporary worktree)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--tests", type=int, default=50, help="Generated tests per fixture setup run")
+    args = parser.parse_args()
+
+    results = {}
+    if args.baseline:
+        results[args.baseline] = measure_baseline(args.baseline, args.runs, args.iterations, args.tests)
+    results["working tree"] = measure(ROOT, args.runs, args.iterations, args.tests)
+    print_results(results)
@@ -9,15 +9,21 @@ load_dotenv()
 # define supported browser types
 BrowserType = Literal['chrome', 'safari', 'firefox']
 # define supported environment types
-EnvType = Literal['dev', 'staging', 'prod']
+EnvType = Literal['dev', 'staging', 'prod', 'local']
 
 # Domain Configuration -> Both dev, staging, prod use the same domain
+# 'local' is the stand-in ordering site served in-process (utils/local_site.py)
 DOMAIN = {
     'dev': 'staging.inline.app',
     'staging': 'staging.inline.app',
-    'prod': 'staging.inline.app'
+    'prod': 'staging.inline.app',
+    'local': '127.0.0.1'
 }
 
+# Config of the running session, see Config.current()
+_current = None
+
+
 # Get current env domain
 def get_domain(env: str = None):
     if env is None:
@@ -26,20 +32,74 @@ def get_domain(env: str = None):
 
 
 class Config:
+    """
+    Settings of one test session, layered from lowest to highest priority:
+    defaults in this class < .env file < environment variables < overrides (CLI options).
+
+    Instances are validated and immutable; the session's instance is created once in
+    pytest_configure and shared through Config.current() and the test_config fixture.
+    Use replace() for another environment/browser/device combination in the same process.
+    """
+
+    # Allowed values of the choice settings
+    CHOICES = {
+        'BROWSER': ('chrome', 'safari', 'firefox'),
+        'ENGINE': ('selenium', 'playwright'),
+        'ENV': ('dev', 'staging', 'prod', 'local'),
+        'WAIT_ENGINE': ('polling', 'observer'),
+        'INPUT_STRATEGY': ('typed', 'native-setter'),
+        'CLICK_ENGINE': ('standard', 'overlay'),
+        'OVERLAY_POLICY': ('wait', 'dismiss', 'dispatch'),
+        'PAGE_READY_STRATEGY': ('document', 'network-idle', 'locators'),
+        'ADAPTIVE_TIMEOUTS': ('off', 'learn', 'on'),
+        'BROWSER_REUSE': ('off', 'worker'),
+        'NETWORK_MODE': ('live', 'record', 'replay'),
+        'SCHEDULER': ('xdist', 'lpt'),
+    }
 
-    def __init__(self):
+    def __init__(self, overrides: Dict[str, Any] = None):
+        overrides = dict(overrides or {})
+        # .env values are already in os.environ (load_dotenv does not override the environment)
+        env = {**os.environ, **{name: str(value) for name, value in overrides.items()}}
         # browser configuration
-        self.BROWSER: BrowserType = os.getenv('BROWSER', 'chrome')  # type: ignore
-        self.HEADLESS: bool = os.getenv('HEADLESS', 'False').lower() == 'true'
+        self.BROWSER: BrowserType = env.get('BROWSER', 'chrome')  # type: ignore
+        self.HEADLESS: bool = env.get('HEADLESS', 'False').lower() == 'true'
+        # automation engine: 'selenium' or 'playwright'
+        self.ENGINE: str = env.get('ENGINE', 'selenium')
         
         # wait time configuration
-        self.DEFAULT_TIMEOUT: int = int(os.getenv('DEFAULT_TIMEOUT', '20'))
-        self.POLL_FREQUENCY: float = float(os.getenv('POLL_FREQUENCY', '0.5'))
-        self.RETRY_TIMES: int = int(os.getenv('RETRY_TIMES', '3'))
-        self.RETRY_DELAY: int = int(os.getenv('RETRY_DELAY', '2'))
+        self.DEFAULT_TIMEOUT: int = int(env.get('DEFAULT_TIMEOUT', '20'))
+        self.POLL_FREQUENCY: float = float(env.get('POLL_FREQUENCY', '0.5'))
+        self.RETRY_TIMES: int = int(env.get('RETRY_TIMES', '3'))
+        self.RETRY_DELAY: int = int(env.get('RETRY_DELAY', '2'))
+        # adaptive wait timeouts: 'off', 'learn' (record latencies only) or 'on'
+        self.ADAPTIVE_TIMEOUTS: str = env.get('ADAPTIVE_TIMEOUTS', 'off')
+        self.WAIT_HISTORY_FILE: str = env.get('WAIT_HISTORY_FILE', '.wait_latencies.json')
+        # adapted timeout = TIMEOUT_MULTIPLIER x p99 success latency, within [TIMEOUT_FLOOR, TIMEOUT_CEILING]
+        self.TIMEOUT_MULTIPLIER: float = float(env.get('TIMEOUT_MULTIPLIER', '3'))
+        self.TIMEOUT_FLOOR: float = float(env.get('TIMEOUT_FLOOR', '1'))
+        self.TIMEOUT_CEILING: float = float(env.get('TIMEOUT_CEILING', str(self.DEFAULT_TIMEOUT)))
+        # total wait budget per scenario in seconds, 0 = unlimited
+        self.SCENARIO_BUDGET: float = float(env.get('SCENARIO_BUDGET', '0'))
+        # negative waits (not visible / not clickable / text not contains) pass once the condition held this long
+        self.STABILITY_WINDOW_MS: int = int(env.get('STABILITY_WINDOW_MS', '300'))
+        # wait engine: 'polling' (WebDriverWait) or 'observer' (in-page MutationObserver, polling fallback)
+        self.WAIT_ENGINE: str = env.get('WAIT_ENGINE', 'polling')
+        # send_keys_to_element: 'typed' (clear, verify, keystrokes) or 'native-setter' (one script call)
+        self.INPUT_STRATEGY: str = env.get('INPUT_STRATEGY', 'typed')
+        # click engine: 'standard' (wait until clickable, JS click fallback) or 'overlay' (elementFromPoint probe)
+        self.CLICK_ENGINE: str = env.get('CLICK_ENGINE', 'standard')
+        # covered click targets with the overlay engine: 'wait', 'dismiss' or 'dispatch'
+        self.OVERLAY_POLICY: str = env.get('OVERLAY_POLICY', 'wait')
+        # page readiness after navigation: 'document', 'network-idle' or 'locators'
+        self.PAGE_READY_STRATEGY: str = env.get('PAGE_READY_STRATEGY', 'document')
+        self.NETWORK_IDLE_THRESHOLD: int = int(env.get('NETWORK_IDLE_THRESHOLD', '0'))
+        self.NETWORK_IDLE_MS: int = int(env.get('NETWORK_IDLE_MS', '500'))
+        # reuse resolved WebElements of the current page (re-resolved when stale)
+        self.ELEMENT_CACHE: bool = env.get('ELEMENT_CACHE', 'False').lower() == 'true'
         
         # environment configuration
-        self.ENV: EnvType = os.getenv('ENV', 'staging')  # type: ignore
+        self.ENV: EnvType = env.get('ENV', 'staging')  # type: ignore
         
         # URL configuration - based on environment setting different BASE_PATH
         if self.ENV == 'staging':
@@ -48,19 +108,115 @@ class Config:
             default_path = '/order/-N86uOXnWsyA-7n8EKma:inline-staging-2a466/-NEdHYAxrToGxfj4BxSw?language=en'
         else:
             default_path = '/order/-N86uOXnWsyA-7n8EKma:inline-staging-2a466/-NEdHYAxrToGxfj4BxSw?language=en'
-        self.BASE_PATH: str = os.getenv('BASE_PATH', default_path)
+        self.BASE_PATH: str = env.get('BASE_PATH', default_path)
+        # --env=local: port of the in-process site (0 = any free port, set once it listens),
+        # its response latency, render delay and the probability of injected flakiness
+        self.LOCAL_SITE_PORT: int = int(env.get('LOCAL_SITE_PORT', '0'))
+        self.LOCAL_SITE_LATENCY_MS: int = int(env.get('LOCAL_SITE_LATENCY_MS', '0'))
+        self.LOCAL_SITE_RENDER_DELAY_MS: int = int(env.get('LOCAL_SITE_RENDER_DELAY_MS', '0'))
+        self.LOCAL_SITE_FLAKINESS: float = float(env.get('LOCAL_SITE_FLAKINESS', '0'))
+        self.LOCAL_SITE_SEED: int = int(env.get('LOCAL_SITE_SEED', '0'))
         
         # device configuration
-        self.DEVICE_TYPE: str = 'desktop'  # default device type
+        self.DEVICE_TYPE: str = env.get('DEVICE_TYPE', 'desktop')
+        # device matrix: '' (off), 'all' or a comma list of device types, switched by emulation
+        self.DEVICES: str = env.get('DEVICES', '')
+        
+        # browser reuse configuration: 'off' launches a browser per test, 'worker' keeps a warm driver
+        self.BROWSER_REUSE: str = env.get('BROWSER_REUSE', 'off')
+        self.CONTEXTS_PER_WORKER: int = int(env.get('CONTEXTS_PER_WORKER', '1'))
+
+        # resource blocking profile (config/resource_profiles.py), 'off' loads everything
+        self.BLOCK_RESOURCES: str = env.get('BLOCK_RESOURCES', 'off')
+        # baseline run: load what the profile matches and record its sizes, for the bytes saved by blocking
+        self.RESOURCE_BASELINE: bool = env.get('RESOURCE_BASELINE', 'False').lower() == 'true'
+        self.RESOURCE_SIZES_FILE: str = env.get('RESOURCE_SIZES_FILE', '.resource_sizes.json')
+
+        # network mode: 'live', 'record' or 'replay' through the local proxy, recordings kept in NETWORK_STORE
+        self.NETWORK_MODE: str = env.get('NETWORK_MODE', 'live')
+        self.NETWORK_STORE: str = env.get('NETWORK_STORE', 'recordings')
+
+        # duration history for --scheduler=lpt and --shard=i/N
+        self.DURATIONS_FILE: str = env.get('DURATIONS_FILE', '.durations.json')
+        self.SCHEDULER: str = env.get('SCHEDULER', 'xdist')
+        self.SHARD: str = env.get('SHARD', '')
+
+        # step/wait timing trace (JSONL + Chrome trace-event export) written to TRACE_DIR
+        self.TIMING_TRACE: bool = env.get('TIMING_TRACE', 'False').lower() == 'true'
+        self.TRACE_DIR: str = env.get('TRACE_DIR', 'traces')
+        # WebDriver command (round-trip) counts per test, step and BaseAction method
+        self.COMMAND_TRACE: bool = env.get('COMMAND_TRACE', 'False').lower() == 'true'
+
+        # check every declared locator once per page before the run (utils/locator_health.py)
+        self.PREFLIGHT_LOCATORS: bool = env.get('PREFLIGHT_LOCATORS', 'False').lower() == 'true'
+
+        # Given-step checkpoints: restore URL, cookies and web storage instead of replaying setup
+        self.CHECKPOINTS: bool = env.get('CHECKPOINTS', 'False').lower() == 'true'
+        
+        # pytest-bdd: feature files and the mtime-keyed cache of their parsed form
+        self.FEATURES_DIR: str = env.get('FEATURES_DIR', 'features')
+        self.BDD_CACHE_FILE: str = env.get('BDD_CACHE_FILE', '.bdd_cache.pickle')
         
         # log configuration
-        self.LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
-        self.SCREENSHOT_PATH: str = os.getenv('SCREENSHOT_PATH', 'screenshots')
+        self.LOG_LEVEL: str = env.get('LOG_LEVEL', 'INFO')
+        self.SCREENSHOT_PATH: str = env.get('SCREENSHOT_PATH', 'screenshots')
+        # failure artifacts written in the background under SCREENSHOT_PATH ('none' to disable)
+        self.FAILURE_ARTIFACTS: str = env.get('FAILURE_ARTIFACTS', 'screenshot,dom,console,network')
+        self.ARTIFACT_BUDGET_MB: float = float(env.get('ARTIFACT_BUDGET_MB', '200'))
+        self.ARTIFACT_THREADS: int = int(env.get('ARTIFACT_THREADS', '2'))
+
+        unknown = sorted(name for name in overrides if name not in vars(self))
+        if unknown:
+            raise ValueError(f"Unknown config settings: {', '.join(unknown)}")
+        self._overrides = overrides
+        self._validate()
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f"Config is immutable, use replace({name}=...) for another combination")
+        super().__setattr__(name, value)
+
+    def _validate(self):
+        for name, allowed in self.CHOICES.items():
+            if getattr(self, name) not in allowed:
+                raise ValueError(f"Invalid {name}: {getattr(self, name)!r} (expected one of {', '.join(allowed)})")
+        for name in ('DEFAULT_TIMEOUT', 'POLL_FREQUENCY', 'CONTEXTS_PER_WORKER'):
+            if getattr(self, name) <= 0:
+                raise ValueError(f"Invalid {name}: {getattr(self, name)} (must be positive)")
+        if not 0 <= self.LOCAL_SITE_FLAKINESS <= 1:
+            raise ValueError(f"Invalid LOCAL_SITE_FLAKINESS: {self.LOCAL_SITE_FLAKINESS} (must be between 0 and 1)")
+
+    def replace(self, **overrides) -> 'Config':
+        """
+        Copy of this config with some settings changed, e.g. replace(ENV='dev', BROWSER='firefox')
+        """
+        return Config({**self._overrides, **overrides})
+
+    @classmethod
+    def current(cls) -> 'Config':
+        """
+        The session's config (see activate), built once from the environment if none was activated
+        """
+        global _current
+        if _current is None:
+            _current = cls()
+        return _current
+
+    def activate(self):
+        """
+        Make this the config returned by Config.current() (once per session, in pytest_configure)
+        """
+        global _current
+        _current = self
     
     @property
     def BASE_URL(self) -> str:
         protocol = 'https://'
         domain = get_domain(self.ENV)
+        if self.ENV == 'local':
+            protocol = 'http://'
+            domain = f"{domain}:{self.LOCAL_SITE_PORT}"
         # ensure BASE_PATH starts with / to avoid concatenation error
         base_path = '/' + self.BASE_PATH.lstrip('/') if self.BASE_PATH else ''
         return f"{protocol}{domain}{base_path}"
@@ -78,19 +234,61 @@ class Config:
         Returns:
             Dict[str, Any]: Configuration dictionary
         """
-        instance = cls()
+        instance = cls.current()
         return {
             'browser': instance.BROWSER,
             'headless': instance.HEADLESS,
+            'engine': instance.ENGINE,
             'timeout': instance.DEFAULT_TIMEOUT,
             'poll_frequency': instance.POLL_FREQUENCY,
             'retry_times': instance.RETRY_TIMES,
             'retry_delay': instance.RETRY_DELAY,
+            'wait_engine': instance.WAIT_ENGINE,
+            'click_engine': instance.CLICK_ENGINE,
+            'input_strategy': instance.INPUT_STRATEGY,
+            'overlay_policy': instance.OVERLAY_POLICY,
+            'page_ready_strategy': instance.PAGE_READY_STRATEGY,
+            'network_idle_threshold': instance.NETWORK_IDLE_THRESHOLD,
+            'network_idle_ms': instance.NETWORK_IDLE_MS,
+            'element_cache': instance.ELEMENT_CACHE,
             'env': instance.ENV,
             'base_url': instance.BASE_URL,
             'domain': get_domain(instance.ENV),
             'base_path': instance.BASE_PATH,
+            'local_site_port': instance.LOCAL_SITE_PORT,
+            'local_site_latency_ms': instance.LOCAL_SITE_LATENCY_MS,
+            'local_site_render_delay_ms': instance.LOCAL_SITE_RENDER_DELAY_MS,
+            'local_site_flakiness': instance.LOCAL_SITE_FLAKINESS,
+            'local_site_seed': instance.LOCAL_SITE_SEED,
             'log_level': instance.LOG_LEVEL,
             'screenshot_path': instance.SCREENSHOT_PATH,
-            'device_type': instance.DEVICE_TYPE
+            'failure_artifacts': instance.FAILURE_ARTIFACTS,
+            'artifact_budget_mb': instance.ARTIFACT_BUDGET_MB,
+            'artifact_threads': instance.ARTIFACT_THREADS,
+            'device_type': instance.DEVICE_TYPE,
+            'devices': instance.DEVICES,
+            'browser_reuse': instance.BROWSER_REUSE,
+            'contexts_per_worker': instance.CONTEXTS_PER_WORKER,
+            'checkpoints': instance.CHECKPOINTS,
+            'block_resources': instance.BLOCK_RESOURCES,
+            'resource_baseline': instance.RESOURCE_BASELINE,
+            'resource_sizes_file': instance.RESOURCE_SIZES_FILE,
+            'network_mode': instance.NETWORK_MODE,
+            'network_store': instance.NETWORK_STORE,
+            'durations_file': instance.DURATIONS_FILE,
+            'scheduler': instance.SCHEDULER,
+            'shard': instance.SHARD,
+            'timing_trace': instance.TIMING_TRACE,
+            'trace_dir': instance.TRACE_DIR,
+            'command_trace': instance.COMMAND_TRACE,
+            'adaptive_timeouts': instance.ADAPTIVE_TIMEOUTS,
+            'wait_history_file': instance.WAIT_HISTORY_FILE,
+            'timeout_multiplier': instance.TIMEOUT_MULTIPLIER,
+            'timeout_floor': instance.TIMEOUT_FLOOR,
+            'timeout_ceiling': instance.TIMEOUT_CEILING,
+            'scenario_budget': instance.SCENARIO_BUDGET,
+            'stability_window_ms': instance.STABILITY_WINDOW_MS,
+            'preflight_locators': instance.PREFLIGHT_LOCATORS,
+            'features_dir': instance.FEATURES_DIR,
+            'bdd_cache_file': instance.BDD_CACHE_FILE
         } 
\ No newline at end of file
@@ -0,0 +1,113 @@
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+# File extensions per resource type, for requests whose type the browser does not report
+# (Firefox versions without WebDriver BiDi request destinations)
+TYPE_EXTENSIONS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "ogg", "mp3", "wav", "m3u8"),
+}
+
+# Analytics, tag managers and other third-party scripts none of the assertions rely on
+THIRD_PARTY_PATTERNS = (
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*connect.facebook.net*",
+    "*hotjar.com*",
+    "*segment.io*",
+    "*cdn.segment.com*",
+    "*clarity.ms*",
+    "*intercom.io*",
+    "*sentry-cdn.com*",
+)
+
+
+@dataclass(frozen=True)
+class ResourceProfile:
+
+    name: str = "off"
+
+    # Resource types to block (lowercase Playwright/CDP resource type names: image, font, media, ...)
+    block_types: Tuple[str, ...] = ()
+
+    # URL glob patterns to block, e.g. "*google-analytics.com*"
+    block_patterns: Tuple[str, ...] = ()
+
+    # URL glob patterns never blocked, even if matched above
+    allow_patterns: Tuple[str, ...] = ()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.block_types or self.block_patterns)
+
+    def blocks(self, url: str, resource_type: str) -> bool:
+        if any(fnmatchcase(url, pattern) for pattern in self.allow_patterns):
+            return False
+        if resource_type.lower() in self.block_types:
+            return True
+        return any(fnmatchcase(url, pattern) for pattern in self.block_patterns)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+def guess_resource_type(url: str) -> str:
+    """
+    Resource type of a URL from its file extension, 'other' if it has none of TYPE_EXTENSIONS
+    """
+    extension = urlsplit(url).path.rpartition(".")[2].lower()
+    for resource_type, extensions in TYPE_EXTENSIONS.items():
+        if extension in extensions:
+            return resource_type
+    return "other"
+
+
+RESOURCE_PROFILES: Dict[str, ResourceProfile] = {
+    "off": ResourceProfile(),
+    # Images, fonts and audio/video only
+    "media": ResourceProfile(
+        name="media",
+        block_types=("image", "font", "media"),
+    ),
+    # Analytics and third-party scripts only
+    "third-party": ResourceProfile(
+        name="third-party",
+        block_patterns=THIRD_PARTY_PATTERNS,
+    ),
+    # Everything above; stylesheets and first-party scripts always load
+    "lean": ResourceProfile(
+        name="lean",
+        block_types=("image", "font", "media"),
+        block_patterns=THIRD_PARTY_PATTERNS,
+    ),
+}
+
+# Per-feature profile used instead of --block-resources when blocking is on.
+# Payment pages load third-party payment SDKs, so they only drop media.
+FEATURE_RESOURCE_PROFILES: Dict[str, str] = {
+    "payment.feature": "media",
+    "order_management.feature": "media",
+}
+
+
+def get_resource_profile(name: str, feature_file: Optional[str] = None) -> ResourceProfile:
+    """
+    Get the resource profile for a test
+
+    Args:
+        name: Profile selected with --block-resources
+        feature_file: Feature file name of the scenario, for FEATURE_RESOURCE_PROFILES
+
+    Returns:
+        ResourceProfile: The 'off' profile if blocking is disabled
+    """
+    if name not in RESOURCE_PROFILES:
+        raise ValueError(f"Unsupported resource profile: {name}")
+    if name != "off" and feature_file in FEATURE_RESOURCE_PROFILES:
+        name = FEATURE_RESOURCE_PROFILES[feature_file]
+    return RESOURCE_PROFILES[name]
@@ -1,117 +1,539 @@
+import collections
 import os
 from datetime import datetime
 import traceback
 
 import pytest
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.safari.options import Options as SafariOptions
-from selenium.webdriver.firefox.service import Service as FirefoxService
 from pytest_bdd import given, when, then
 
 from config.config import Config
-from config.devices import BaseDevice, IPhone17ProMax, IPhone17, IPadPro, Pixel9Pro
+from config.resource_profiles import RESOURCE_PROFILES, ResourceProfile, get_resource_profile
+from pages.base_actions.driver_state import get_driver_state
+from utils.artifacts import ARTIFACT_KINDS, ArtifactWriter, attach_console_listener, capture
+from utils.bdd_cache import FeatureCache, StepIndex, dry_run
+from utils.device_emulation import DeviceMatrixStats
+from utils.checkpoints import get_checkpoint_store, record_step
+from utils.command_tracer import CommandTracer, merge_command_counts
+from utils.driver_pool import DriverPool
+from utils.drivers import (
+    DEVICE_CLASSES,
+    PLAYWRIGHT_BROWSERS,
+    create_driver,
+    create_playwright_context_options,
+    get_device_class,
+)
+from utils.durations import DurationHistory, LPTScheduling, parse_shard, split_shards
+from utils.local_site import LocalSite, start_local_site
+from utils.multi_context import SharedChromiumPool, SharedChromiumWorker
+from utils.network_replay import NetworkProxy, NetworkStore
+from utils.resource_blocking import (
+    BLOCKING_METHODS,
+    ResourceBlockingStats,
+    apply_selenium_profile,
+    collect_selenium_blocked,
+    load_sizes,
+    route_playwright_profile,
+    save_sizes,
+)
+from utils.run_reports import collect_worker_output, get_reports, is_xdist_worker, publish_report, worker_id
+from utils.tracing import TimingTrace, merge_summaries
+from utils.wait_timeouts import WaitTimeouts, save_history
 
+SESSION_CONFIG = pytest.StashKey[Config]()
+ELEMENT_CACHE_STATS = pytest.StashKey[dict]()
+INTERCEPTED_CLICKS = pytest.StashKey[list]()
+RESOURCE_BLOCKING = pytest.StashKey[ResourceBlockingStats]()
+DURATION_HISTORY = pytest.StashKey[DurationHistory]()
+TIMING_TRACE = pytest.StashKey[TimingTrace]()
+COMMAND_TRACER = pytest.StashKey[CommandTracer]()
+WAIT_TIMEOUTS = pytest.StashKey[WaitTimeouts]()
+LOCATOR_PREFLIGHT = pytest.StashKey[dict]()
+ARTIFACT_WRITER = pytest.StashKey[ArtifactWriter]()
+DEVICE_MATRIX = pytest.StashKey[DeviceMatrixStats]()
+FEATURE_CACHE = pytest.StashKey[FeatureCache]()
+BDD_DRY_RUN = pytest.StashKey[dict]()
+LOCAL_SITE = pytest.StashKey[LocalSite]()
+# Driver or Playwright page of the running test, for the failure artifacts in makereport
+TEST_DRIVER = pytest.StashKey[object]()
 
 
+@pytest.hookimpl(trylast=True)
 def pytest_configure(config):
     config.addinivalue_line("markers", "bdd: BDD tests")
     config.addinivalue_line("filterwarnings", "ignore::pytest.PytestUnknownMarkWarning")
     
-    env = config.getoption("--env")
-    if env:
-        os.environ['ENV'] = env
+    # The session's config: defaults < .env < environment < command line, built once
+    try:
+        settings = Config({name: config.getoption(option) for option, name in CLI_SETTINGS.items()})
+    except ValueError as exc:
+        raise pytest.UsageError(str(exc))
+    if settings.ENV == "local":
+        # One site per process (controller and xdist workers), BASE_URL follows its port
+        try:
+            config.stash[LOCAL_SITE], settings = start_local_site(settings)
+        except OSError as exc:
+            raise pytest.UsageError(
+                f"--env=local cannot listen on port {settings.LOCAL_SITE_PORT} ({exc}); "
+                "use LOCAL_SITE_PORT=0 with -n"
+            )
+    settings.activate()
+    config.stash[SESSION_CONFIG] = settings
+    # Parsed features of unchanged files, before the test modules call scenarios()
+    config.stash[FEATURE_CACHE] = FeatureCache(settings.BDD_CACHE_FILE)
+    config.stash[FEATURE_CACHE].prime()
+    if config.getoption("--bdd-dry-run") and getattr(config.option, "numprocesses", None):
+        raise pytest.UsageError("--bdd-dry-run resolves the steps in this process and cannot be combined with -n")
+
+    config.stash[ELEMENT_CACHE_STATS] = {"hits": 0, "misses": 0, "stale": 0}
+    config.stash[INTERCEPTED_CLICKS] = []
+    config.stash[RESOURCE_BLOCKING] = ResourceBlockingStats(
+        load_sizes(settings.RESOURCE_SIZES_FILE), settings.RESOURCE_BASELINE
+    )
+    config.stash[DURATION_HISTORY] = DurationHistory(
+        settings.DURATIONS_FILE, settings.BROWSER, settings.DEVICE_TYPE
+    )
+    if not is_xdist_worker(config):
+        # The controller sees the reports of every test, also the ones run by xdist workers
+        config.pluginmanager.register(config.stash[DURATION_HISTORY], "duration_history")
+    runs_tests = is_xdist_worker(config) or not getattr(config.option, "numprocesses", None)
+    if settings.TIMING_TRACE and runs_tests:
+        config.stash[TIMING_TRACE] = TimingTrace(settings.TRACE_DIR, worker_id(config))
+        config.stash[TIMING_TRACE].activate()
+    if settings.COMMAND_TRACE:
+        if settings.ENGINE != "selenium":
+            raise pytest.UsageError("--command-trace traces WebDriver commands and needs --engine=selenium")
+        if runs_tests:
+            config.stash[COMMAND_TRACER] = CommandTracer(settings.TRACE_DIR, worker_id(config))
+    if get_matrix_devices(config):
+        if settings.ENGINE == "selenium" and settings.BROWSER != "chrome":
+            raise pytest.UsageError("--devices switches devices with CDP emulation and needs chrome or --engine=playwright")
+        config.stash[DEVICE_MATRIX] = DeviceMatrixStats()
+    artifact_kinds = get_artifact_kinds(config)
+    if artifact_kinds and runs_tests:
+        # The run budget is shared evenly by the xdist workers
+        workers = int(os.getenv("PYTEST_XDIST_WORKER_COUNT", "1"))
+        config.stash[ARTIFACT_WRITER] = ArtifactWriter(
+            settings.SCREENSHOT_PATH, worker_id(config),
+            budget_bytes=int(settings.ARTIFACT_BUDGET_MB * 1024 * 1024 / workers),
+            threads=settings.ARTIFACT_THREADS,
+        )
+    adaptive_timeouts = settings.ADAPTIVE_TIMEOUTS
+    scenario_budget = settings.SCENARIO_BUDGET
+    if (adaptive_timeouts != "off" or scenario_budget) and runs_tests:
+        config.stash[WAIT_TIMEOUTS] = WaitTimeouts(
+            settings.WAIT_HISTORY_FILE, settings.BROWSER, settings.DEVICE_TYPE,
+            mode=adaptive_timeouts,
+            multiplier=settings.TIMEOUT_MULTIPLIER,
+            floor=settings.TIMEOUT_FLOOR,
+            ceiling=settings.TIMEOUT_CEILING,
+            budget=scenario_budget,
+        )
+        config.stash[WAIT_TIMEOUTS].activate()
+
+    try:
+        parse_shard(settings.SHARD)
+    except ValueError as exc:
+        raise pytest.UsageError(str(exc))
+
+    network = settings.NETWORK_MODE
+    if network != "live" and settings.BROWSER == "safari":
+        raise pytest.UsageError("--network=record|replay needs a browser with proxy settings (chrome or firefox)")
+
+    contexts = settings.CONTEXTS_PER_WORKER
+    if contexts > 1:
+        if settings.ENGINE != "playwright" or settings.BROWSER != "chrome":
+            raise pytest.UsageError("--contexts-per-worker requires --engine=playwright and --browser=chrome")
+        if not is_xdist_worker(config) and not getattr(config.option, "numprocesses", None):
+            raise pytest.UsageError("--contexts-per-worker=N shares one Chromium between N xdist workers and needs -n")
+        if network != "live":
+            raise pytest.UsageError("--network=record|replay launches the browser of each worker with its own proxy")
+        if is_xdist_worker(config):
+            config.pluginmanager.register(
+                SharedChromiumWorker(config.workerinput["shared_chromium"]), SharedChromiumWorker.name
+            )
+        elif not config.option.collectonly:
+            pool = SharedChromiumPool(settings.HEADLESS, config.option.numprocesses, contexts)
+            pool.start()
+            config.pluginmanager.register(pool, SharedChromiumPool.name)
+
+
+# Command line options that override a Config setting
+CLI_SETTINGS = {
+    "--env": "ENV",
+    "--browser": "BROWSER",
+    "--headless": "HEADLESS",
+    "--engine": "ENGINE",
+    "--device": "DEVICE_TYPE",
+    "--devices": "DEVICES",
+    "--wait-engine": "WAIT_ENGINE",
+    "--click-engine": "CLICK_ENGINE",
+    "--overlay-policy": "OVERLAY_POLICY",
+    "--input-strategy": "INPUT_STRATEGY",
+    "--page-ready": "PAGE_READY_STRATEGY",
+    "--element-cache": "ELEMENT_CACHE",
+    "--browser-reuse": "BROWSER_REUSE",
+    "--contexts-per-worker": "CONTEXTS_PER_WORKER",
+    "--checkpoints": "CHECKPOINTS",
+    "--block-resources": "BLOCK_RESOURCES",
+    "--resource-baseline": "RESOURCE_BASELINE",
+    "--scheduler": "SCHEDULER",
+    "--shard": "SHARD",
+    "--timing-trace": "TIMING_TRACE",
+    "--command-trace": "COMMAND_TRACE",
+    "--adaptive-timeouts": "ADAPTIVE_TIMEOUTS",
+    "--scenario-budget": "SCENARIO_BUDGET",
+    "--failure-artifacts": "FAILURE_ARTIFACTS",
+    "--preflight-locators": "PREFLIGHT_LOCATORS",
+    "--network": "NETWORK_MODE",
+}
+
+
+def get_session_config(config) -> Config:
+    return config.stash[SESSION_CONFIG]
+
+
+def get_matrix_devices(config) -> list:
+    """
+    Device names of the --devices matrix, empty without one
+    """
+    value = get_session_config(config).DEVICES.strip().lower()
+    if not value:
+        return []
+    if value == "all":
+        return list(DEVICE_CLASSES)
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in DEVICE_CLASSES]
+    if unknown:
+        raise pytest.UsageError(f"--devices: unknown {', '.join(unknown)} (choose from {', '.join(DEVICE_CLASSES)} or all)")
+    return names
+
+
+def get_artifact_kinds(config) -> list:
+    """
+    Artifacts captured on failure (--failure-artifacts), empty with 'none'
+    """
+    value = get_session_config(config).FAILURE_ARTIFACTS
+    kinds = [kind.strip() for kind in value.split(",") if kind.strip() and kind.strip() != "none"]
+    unknown = sorted(set(kinds) - set(ARTIFACT_KINDS))
+    if unknown:
+        raise pytest.UsageError(
+            f"--failure-artifacts: unknown {', '.join(unknown)} (choose from {', '.join(ARTIFACT_KINDS)} or none)"
+        )
+    return kinds
 
 
 def pytest_addoption(parser):
-    config = Config()
-    parser.addoption("--headless", action="store_true", default=False,
+    # Option defaults come from the layered Config (defaults < .env < environment)
+    try:
+        config = Config()
+    except ValueError as exc:
+        raise pytest.UsageError(str(exc))
+    parser.addoption("--headless", action="store_true", default=config.HEADLESS,
                     help="Run tests in headless mode")
     parser.addoption("--env", action="store", default=config.ENV,
-                    help=f"Environment: {', '.join(['dev', 'staging', 'prod'])}")
+                    help=f"Environment: {', '.join(['dev', 'staging', 'prod', 'local'])}")
     parser.addoption("--browser", action="store", default=config.BROWSER,
                     help=f"Browser: {', '.join(['chrome', 'safari', 'firefox'])}")
     parser.addoption("--device", action="store", default=config.DEVICE_TYPE,
                     help="Device type: desktop, iphone17promax, iphone17, ipadpro, pixel9pro")
-
-
-def get_device_class(device_type: str) -> BaseDevice:
-    devices = {
-        "desktop": BaseDevice,
-        "iphone17promax": IPhone17ProMax,
-        "iphone17": IPhone17,
-        "ipadpro": IPadPro,
-        "pixel9pro": Pixel9Pro
-    }
-    device_class = devices.get(device_type.lower())
-    if not device_class:
-        raise ValueError(f"Unsupported device type: {device_type}")
-    return device_class()
+    parser.addoption("--devices", action="store", default=config.DEVICES,
+                    help="Run every test on each device (all, or a comma list), switching devices by emulation "
+                         "in the warm worker driver (implies --browser-reuse=worker on Selenium)")
+    parser.addoption("--engine", action="store", default=config.ENGINE,
+                    choices=["selenium", "playwright"],
+                    help="Automation engine: selenium (WebDriver) or playwright (one browser, a BrowserContext per test)")
+    parser.addoption("--wait-engine", action="store", default=config.WAIT_ENGINE,
+                    choices=["polling", "observer"],
+                    help="Wait engine: polling (WebDriverWait) or observer (in-page MutationObserver)")
+    parser.addoption("--click-engine", action="store", default=config.CLICK_ENGINE,
+                    choices=["standard", "overlay"],
+                    help="Click engine: standard (wait until clickable) or overlay (elementFromPoint probe, OVERLAY_POLICY)")
+    parser.addoption("--overlay-policy", action="store", default=config.OVERLAY_POLICY,
+                    choices=["wait", "dismiss", "dispatch"],
+                    help="Overlay click engine: wait for, dismiss or click through an element covering the target")
+    parser.addoption("--input-strategy", action="store", default=config.INPUT_STRATEGY,
+                    choices=["typed", "native-setter"],
+                    help="send_keys_to_element default: typed (keystrokes) or native-setter (value setter + input/change events)")
+    parser.addoption("--page-ready", action="store", default=config.PAGE_READY_STRATEGY,
+                    choices=["document", "network-idle", "locators"],
+                    help="Page readiness after navigation: document, network-idle or locators")
+    parser.addoption("--element-cache", action="store_true", default=config.ELEMENT_CACHE,
+                    help="Reuse resolved WebElements of the current page (re-resolved when stale)")
+    parser.addoption("--browser-reuse", action="store", default=config.BROWSER_REUSE,
+                    choices=["off", "worker"],
+                    help="Browser reuse: off (new browser per test) or worker (warm driver per xdist worker)")
+    parser.addoption("--contexts-per-worker", action="store", type=int, default=config.CONTEXTS_PER_WORKER,
+                    help="Share one Chromium between N xdist workers (-n), a BrowserContext per test (--engine=playwright)")
+    parser.addoption("--checkpoints", action="store_true", default=config.CHECKPOINTS,
+                    help="Restore the browser state of already-run @checkpoint Given steps instead of replaying them")
+    parser.addoption("--block-resources", action="store", default=config.BLOCK_RESOURCES,
+                    choices=list(RESOURCE_PROFILES),
+                    help="Resource blocking profile from config/resource_profiles.py (per-feature overrides apply)")
+    parser.addoption("--resource-baseline", action="store_true", default=config.RESOURCE_BASELINE,
+                    help="Load what the --block-resources profile matches and record its sizes for the bytes saved")
+    parser.addoption("--scheduler", action="store", default=config.SCHEDULER,
+                    choices=["xdist", "lpt"],
+                    help="xdist: default -n distribution, lpt: longest tests first from the duration history")
+    parser.addoption("--shard", action="store", default=config.SHARD,
+                    help="Run shard i of N (e.g. 2/3), balanced by the duration history")
+    parser.addoption("--timing-trace", action="store_true", default=config.TIMING_TRACE,
+                    help="Record step and wait timings to TRACE_DIR (JSONL + Chrome trace) and print the slowest")
+    parser.addoption("--command-trace", action="store_true", default=config.COMMAND_TRACE,
+                    help="Count WebDriver commands and driver I/O time per test, step and BaseAction method")
+    parser.addoption("--adaptive-timeouts", action="store", default=config.ADAPTIVE_TIMEOUTS,
+                    choices=["off", "learn", "on"],
+                    help="learn: record wait latencies per locator, on: also set each wait to a multiple of its p99")
+    parser.addoption("--scenario-budget", action="store", type=float, default=config.SCENARIO_BUDGET,
+                    help="Seconds a scenario may spend in total; every wait is capped by what is left (0 = off)")
+    parser.addoption("--failure-artifacts", action="store", default=config.FAILURE_ARTIFACTS,
+                    help=f"Artifacts written in the background for failed tests: {','.join(ARTIFACT_KINDS)} or none")
+    parser.addoption("--bdd-dry-run", action="store_true", default=False,
+                    help="Check that every step of every feature resolves to exactly one step definition, run nothing")
+    parser.addoption("--preflight-locators", action="store_true", default=config.PREFLIGHT_LOCATORS,
+                    help="Check every declared locator once per page before the run; stop if any is missing or ambiguous")
+    parser.addoption("--network", action="store", default=config.NETWORK_MODE,
+                    choices=["live", "record", "replay"],
+                    help="live, record (store traffic per test in NETWORK_STORE) or replay (serve it offline)")
 
 
 @pytest.fixture(scope="session")
 def device(request):
-    device_type = request.config.getoption("--device")
+    device_type = get_session_config(request.config).DEVICE_TYPE
     return get_device_class(device_type)
 
 
-def create_browser_options(browser_type: str, headless: bool, device: BaseDevice):
-    if browser_type == 'chrome':
-        options = ChromeOptions()
-        if headless:
-            options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument(f"--window-size={device.width},{device.height}")
-        options.add_argument(f"--user-agent={device.user_agent}")
-        options.add_argument("--disable-protocol-handler-prompt")
-        options.add_argument("--disable-external-protocol-handler")
-        return options
-    elif browser_type == 'safari':
-        return SafariOptions()
-    elif browser_type == 'firefox':
-        options = FirefoxOptions()
-        if headless:
-            options.add_argument("--headless")
-        options.add_argument(f"--width={device.width}")
-        options.add_argument(f"--height={device.height}")
-        options.add_argument(f"--user-agent={device.user_agent}")
-        
-        firefox_bin = os.getenv('FIREFOX_BIN')
-        if firefox_bin:
-            options.binary_location = firefox_bin
-        return options
-    raise ValueError(f"Unsupported browser type: {browser_type}")
+@pytest.fixture
+def matrix_device(request):
+    """
+    Device name of this test in the --devices matrix, None without a matrix
+    """
+    return getattr(request, "param", None)
+
+
+def pytest_generate_tests(metafunc):
+    devices = get_matrix_devices(metafunc.config)
+    if devices:
+        # Scenario functions get their step fixtures at run time, so the browser fixture
+        # does not show up in their closure; every test of this suite drives a browser
+        if "matrix_device" not in metafunc.fixturenames:
+            metafunc.fixturenames.append("matrix_device")
+        metafunc.parametrize("matrix_device", devices, ids=devices, indirect=True)
+
+
+@pytest.fixture(scope="session")
+def network_proxy(request):
+    """
+    Recording/replaying proxy for this worker, None with --network=live
+    """
+    mode = get_session_config(request.config).NETWORK_MODE
+    if mode == "live":
+        yield None
+        return
+
+    proxy = NetworkProxy(NetworkStore(get_session_config(request.config).NETWORK_STORE), mode)
+    proxy.start()
+    yield proxy
+    proxy.stop()
+    publish_report(request.config, "network", proxy.summary())
+
+
+@pytest.fixture(scope="session")
+def playwright_browser(request, network_proxy):
+    """
+    One Playwright browser process per worker, only started when --engine=playwright
+    """
+    from playwright.sync_api import sync_playwright
+
+    settings = get_session_config(request.config)
+    browser_type = settings.BROWSER
+    if browser_type not in PLAYWRIGHT_BROWSERS:
+        raise ValueError(f"Unsupported browser type: {browser_type}")
+
+    playwright = sync_playwright().start()
+    shared = request.config.pluginmanager.get_plugin(SharedChromiumWorker.name)
+    if shared:
+        # --contexts-per-worker: the Chromium started by the controller for this worker's group
+        browser = playwright.chromium.connect_over_cdp(shared.endpoint)
+    else:
+        launcher = getattr(playwright, PLAYWRIGHT_BROWSERS[browser_type])
+        proxy = {"server": f"http://{network_proxy.address}"} if network_proxy else None
+        browser = launcher.launch(headless=settings.HEADLESS, proxy=proxy)
+    yield browser
+    browser.close()
+    playwright.stop()
+
+
+@pytest.fixture(scope="session")
+def driver_pool(request, device, network_proxy):
+    """
+    Warm WebDriver for this worker, only created with --browser-reuse=worker or the --devices matrix
+    """
+    settings = get_session_config(request.config)
+    browser_type = settings.BROWSER
+    headless = settings.HEADLESS
+    resource_profile = get_resource_profile(settings.BLOCK_RESOURCES)
+    proxy_server = network_proxy.address if network_proxy else None
+    pool = DriverPool(lambda: create_driver(browser_type, headless, device, resource_profile, proxy_server))
+    yield pool
+    pool.close()
+    publish_report(request.config, "driver_pool", pool.summary())
+
+
+def get_test_resource_profile(request) -> ResourceProfile:
+    scenario = getattr(getattr(request.node, "function", None), "__scenario__", None)
+    feature_file = os.path.basename(scenario.feature.filename) if scenario else None
+    return get_resource_profile(get_session_config(request.config).BLOCK_RESOURCES, feature_file)
 
 
 @pytest.fixture(scope="function")
-def browser(request, device):
-    browser_type = request.config.getoption("--browser")
-    headless = request.config.getoption("--headless")
-    
-    options = create_browser_options(browser_type, headless, device)
-    
-    if browser_type == 'chrome':
-        service = Service()
-        driver = webdriver.Chrome(service=service, options=options)
-    elif browser_type == 'safari':
-        driver = webdriver.Safari(options=options)
-    elif browser_type == 'firefox':
-        service = FirefoxService()
-        driver = webdriver.Firefox(service=service, options=options)
+def browser(request, device, matrix_device, network_proxy):
+    settings = get_session_config(request.config)
+    resource_profile = get_test_resource_profile(request)
+    test_device = get_device_class(matrix_device) if matrix_device else device
+    if network_proxy:
+        network_proxy.begin_scenario(request.node.nodeid)
+        request.addfinalizer(network_proxy.end_scenario)
+
+    if settings.ENGINE == "playwright":
+        # An isolated BrowserContext per test instead of a new browser process
+        context = request.getfixturevalue("playwright_browser").new_context(
+            **create_playwright_context_options(test_device), ignore_https_errors=bool(network_proxy)
+        )
+        blocked = []
+        if resource_profile.enabled:
+            route_playwright_profile(context, resource_profile, blocked, settings.RESOURCE_BASELINE)
+        page = context.new_page()
+        if "console" in get_artifact_kinds(request.config):
+            attach_console_listener(page)
+        request.node.stash[TEST_DRIVER] = page
+        try:
+            yield page
+            collect_blocking_stats(request, page, resource_profile, blocked, 0)
+            collect_intercepted_clicks(request, page)
+        finally:
+            context.close()
+        return
+
+    # The device matrix switches devices in the warm driver instead of relaunching per device
+    if settings.BROWSER_REUSE == "worker" or matrix_device:
+        pool = request.getfixturevalue("driver_pool")
+        driver, launch_seconds = pool.acquire()
+        try:
+            switch_device(request, driver, matrix_device, test_device)
+            navigations_before = start_resource_blocking(request, driver, resource_profile)
+            start_command_trace(request, driver)
+            request.node.stash[TEST_DRIVER] = driver
+            yield driver
+            collect_test_stats(request, driver, resource_profile, navigations_before)
+        finally:
+            reset_seconds = pool.release(driver)
+            pool.record_test(request.node.nodeid, launch_seconds, reset_seconds)
+        return
+
+    browser_type = settings.BROWSER
+    headless = settings.HEADLESS
+
+    proxy_server = network_proxy.address if network_proxy else None
+    driver = create_driver(browser_type, headless, device, resource_profile, proxy_server)
+    try:
+        navigations_before = start_resource_blocking(request, driver, resource_profile)
+        start_command_trace(request, driver)
+        request.node.stash[TEST_DRIVER] = driver
+        yield driver
+        collect_test_stats(request, driver, resource_profile, navigations_before)
+    finally:
+        driver.quit()
+
+
+def collect_test_stats(request, driver, resource_profile, navigations_before):
+    """
+    Run the per-test collectors of a Selenium driver before it is released or quit
+    """
+    end_command_trace(request)
+    collect_blocking_stats(request, driver, resource_profile, None, navigations_before)
+    collect_driver_stats(request.config, driver)
+    collect_intercepted_clicks(request, driver)
+
+
+def switch_device(request, driver, matrix_device, test_device):
+    """
+    Emulate the test's device of the --devices matrix in a (possibly reused) Chrome session
+    """
+    if matrix_device:
+        request.config.stash[DEVICE_MATRIX].timed_switch(driver, matrix_device, test_device)
+
+
+def start_resource_blocking(request, driver, resource_profile) -> int:
+    """
+    Apply the test's resource profile to a (possibly reused) driver
+
+    Returns:
+        int: Number of navigations already recorded for the driver
+    """
+    settings = get_session_config(request.config)
+    if settings.BLOCK_RESOURCES != "off":
+        apply_selenium_profile(driver, resource_profile, settings.RESOURCE_BASELINE)
+    return len(get_driver_state(driver).navigations)
+
+
+def start_command_trace(request, driver):
+    """
+    Count the WebDriver commands of this test with --command-trace
+    """
+    tracer = request.config.stash.get(COMMAND_TRACER, None)
+    if tracer:
+        tracer.attach(driver)
+        tracer.begin_test(request.node.nodeid)
+
+
+def end_command_trace(request):
+    tracer = request.config.stash.get(COMMAND_TRACER, None)
+    if tracer:
+        tracer.end_test()
+
+
+def collect_blocking_stats(request, driver, resource_profile, blocked, navigations_before):
+    """
+    Record the requests blocked during the test and its navigation time
+    """
+    if get_session_config(request.config).BLOCK_RESOURCES == "off":
+        return
+    if blocked is not None:
+        method = "playwright"
     else:
-        raise ValueError(f"Unsupported browser type: {browser_type}")
-    
-    driver.implicitly_wait(0)
-    yield driver
-    driver.quit()
+        method, blocked = collect_selenium_blocked(driver)
+    request.config.stash[RESOURCE_BLOCKING].record(
+        request.node.nodeid, resource_profile, method, blocked,
+        get_driver_state(driver).navigations[navigations_before:],
+    )
+
+
+def collect_driver_stats(config, driver):
+    """
+    Add the per-test element cache counters to the session totals and reset them
+    """
+    cache = get_driver_state(driver).element_cache
+    totals = config.stash[ELEMENT_CACHE_STATS]
+    for key, value in cache.stats().items():
+        totals[key] += value
+    cache.reset()
+
+
+def collect_intercepted_clicks(request, driver):
+    """
+    Move the clicks an overlay intercepted during the test to the session list
+    """
+    clicks = get_driver_state(driver).intercepted_clicks
+    request.config.stash[INTERCEPTED_CLICKS].extend(dict(click, test=request.node.nodeid) for click in clicks)
+    clicks.clear()
 
 
 @pytest.fixture(scope="session")
-def test_config():
-    return Config()
+def test_config(request):
+    """
+    The session's immutable Config (page objects get the same one through Config.current())
+    """
+    return get_session_config(request.config)
 
 
 @pytest.fixture(scope="session")
@@ -129,18 +551,22 @@ def get_test_info(item):
         if feature_name:
             feature_file = f"{feature_name}.feature"
     
+    callspec = getattr(item, 'callspec', None)
+    matrix_device = callspec.params.get('matrix_device') if callspec else None
+
     if hasattr(item, 'function'):
         scenario_name = item.function.__name__
         if scenario_name.startswith('test_'):
             scenario_name = scenario_name[5:]
     
+    settings = get_session_config(item.config)
     return {
         "test_file": test_file,
         "feature_file": feature_file or "unknown",
         "scenario_name": scenario_name or item.name,
-        "env": item.config.getoption("--env"),
-        "browser": item.config.getoption("--browser"),
-        "device": item.config.getoption("--device")
+        "env": settings.ENV,
+        "browser": settings.BROWSER,
+        "device": matrix_device or settings.DEVICE_TYPE
     }
 
 
@@ -154,14 +580,16 @@ def pytest_runtest_makereport(item, call):
         duration = (datetime.now() - start_time).total_seconds()
         
         test_info = get_test_info(item)
-        screenshot_path = None
-        
-        if report.failed and hasattr(item, 'browser'):
-            scenario_name = test_info['scenario_name']
-            clean_name = ''.join(c if c.isalnum() else '_' for c in scenario_name)
-            config = Config()
-            screenshot_path = f"{config.SCREENSHOT_PATH}/{clean_name}.png"
-            item.browser.save_screenshot(screenshot_path)
+        artifacts_path = None
+
+        writer = item.config.stash.get(ARTIFACT_WRITER, None)
+        # pytest-bdd steps request the browser by name, so it is not in item.funcargs
+        driver = item.stash.get(TEST_DRIVER, None)
+        if report.failed and writer and driver is not None:
+            # Only the capture runs here, encoding and writing go to the writer's threads
+            raw = capture(driver, get_artifact_kinds(item.config))
+            artifacts_path = writer.submit(test_info['scenario_name'], raw)
+            report.user_properties.append(("artifacts", artifacts_path))
 
         tags = []
         if test_info['test_file'].startswith('test_'):
@@ -170,7 +598,344 @@ def pytest_runtest_makereport(item, call):
             if main_feature:
                 tags.append(main_feature)
 
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session, config, items):
+    config.stash[FEATURE_CACHE].save()
+    if config.getoption("--bdd-dry-run"):
+        config.stash[BDD_DRY_RUN] = dry_run(
+            StepIndex(session._fixturemanager), items, get_session_config(config).FEATURES_DIR
+        )
+        config.hook.pytest_deselected(items=list(items))
+        items[:] = []
+        return
+    shard = parse_shard(get_session_config(config).SHARD)
+    if not shard:
+        return
+    index, total = shard
+    selected = split_shards([item.nodeid for item in items], config.stash[DURATION_HISTORY], total)[index - 1]
+    deselected = [item for item in items if item.nodeid not in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if item.nodeid in selected]
+
+
+def pytest_sessionstart(session):
+    config = session.config
+    if not get_session_config(config).PREFLIGHT_LOCATORS or is_xdist_worker(config) or config.option.collectonly:
+        return
+    # Runs before xdist starts its workers, so broken locators stop the run within seconds
+    from utils.locator_health import failures, format_report
+
+    try:
+        preflight = run_locator_preflight(config)
+    except Exception as exc:
+        pytest.exit(f"Locator preflight could not load the pages: {exc}", returncode=pytest.ExitCode.TESTS_FAILED)
+    if failures(preflight):
+        pytest.exit(
+            "Locator preflight failed:\n" + "\n".join(format_report(preflight)),
+            returncode=pytest.ExitCode.TESTS_FAILED,
+        )
+    config.stash[LOCATOR_PREFLIGHT] = preflight
+
+
+def run_locator_preflight(config) -> dict:
+    """
+    Check the locators of utils.locator_health.PREFLIGHT_PAGES with a browser of its own
+    (live site, without resource blocking or the network proxy)
+    """
+    from utils.locator_health import run_preflight
+
+    settings = get_session_config(config)
+    browser_type = settings.BROWSER
+    headless = settings.HEADLESS
+    device = get_device_class(settings.DEVICE_TYPE)
+    if settings.ENGINE == "playwright":
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as playwright:
+            browser = getattr(playwright, PLAYWRIGHT_BROWSERS[browser_type]).launch(headless=headless)
+            try:
+                return run_preflight(browser.new_context(**create_playwright_context_options(device)).new_page())
+            finally:
+                browser.close()
+    driver = create_driver(browser_type, headless, device)
+    try:
+        return run_preflight(driver)
+    finally:
+        driver.quit()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    if get_session_config(config).SCHEDULER == "lpt":
+        return LPTScheduling(config, config.stash[DURATION_HISTORY], log)
+    return None
+
+
+def pytest_sessionfinish(session, exitstatus):
+    settings = get_session_config(session.config)
+    bdd_dry_run = session.config.stash.get(BDD_DRY_RUN, None)
+    if bdd_dry_run and bdd_dry_run["problems"]:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+    trace = session.config.stash.get(TIMING_TRACE, None)
+    if trace:
+        trace.export_chrome_trace()
+        publish_report(session.config, "timing", trace.summary())
+        trace.close()
+    tracer = session.config.stash.get(COMMAND_TRACER, None)
+    if tracer:
+        publish_report(session.config, "commands", tracer.summary())
+        tracer.close()
+    site = session.config.stash.get(LOCAL_SITE, None)
+    if site and (is_xdist_worker(session.config) or not getattr(session.config.option, "numprocesses", None)):
+        publish_report(session.config, "local_site", site.summary())
+    matrix = session.config.stash.get(DEVICE_MATRIX, None)
+    if matrix:
+        publish_report(session.config, "device_matrix", matrix.summary())
+    writer = session.config.stash.get(ARTIFACT_WRITER, None)
+    if writer:
+        writer.close()
+        publish_report(session.config, "artifacts", writer.summary())
+    timeouts = session.config.stash.get(WAIT_TIMEOUTS, None)
+    if timeouts:
+        publish_report(session.config, "wait_timeouts", timeouts.summary())
+        timeouts.deactivate()
+    if not is_xdist_worker(session.config) and not session.config.option.collectonly:
+        session.config.stash[DURATION_HISTORY].save()
+        if settings.ADAPTIVE_TIMEOUTS != "off":
+            save_history(settings.WAIT_HISTORY_FILE, get_reports(session.config, "wait_timeouts"))
+    if settings.ELEMENT_CACHE:
+        publish_report(session.config, "element_cache", session.config.stash[ELEMENT_CACHE_STATS])
+    if settings.CLICK_ENGINE == "overlay":
+        publish_report(session.config, "intercepted_clicks", session.config.stash[INTERCEPTED_CLICKS])
+    if settings.BLOCK_RESOURCES != "off":
+        publish_report(session.config, "resource_blocking", session.config.stash[RESOURCE_BLOCKING].summary())
+        if settings.RESOURCE_BASELINE and not is_xdist_worker(session.config) and not session.config.option.collectonly:
+            save_sizes(settings.RESOURCE_SIZES_FILE, get_reports(session.config, "resource_blocking"))
+    if settings.CHECKPOINTS:
+        publish_report(session.config, "checkpoints", get_checkpoint_store(session.config).summary())
+
+
+def pytest_unconfigure(config):
+    site = config.stash.get(LOCAL_SITE, None)
+    if site:
+        site.stop()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    collect_worker_output(node.config, getattr(node, "workeroutput", {}))
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    bdd_dry_run = config.stash.get(BDD_DRY_RUN, None)
+    if bdd_dry_run:
+        terminalreporter.write_sep("-", "bdd dry run")
+        for problem in bdd_dry_run["problems"]:
+            terminalreporter.write_line(
+                f"{problem['status']}: {problem['location']} {problem['step']} ({problem['scenario']})"
+            )
+            for definition in problem["definitions"]:
+                terminalreporter.write_line(f"    {definition}")
+        unbound = collections.Counter(problem["location"].rsplit(":", 1)[0] for problem in bdd_dry_run["unbound"])
+        for filename, count in sorted(unbound.items()):
+            terminalreporter.write_line(f"not bound to a test module: {filename} ({count} steps without a definition)")
+        terminalreporter.write_line(
+            f"{bdd_dry_run['steps']} steps of {bdd_dry_run['scenarios']} scenarios resolved in "
+            f"{bdd_dry_run['seconds']}s: {len(bdd_dry_run['problems'])} problems, "
+            f"{len(bdd_dry_run['unbound'])} unresolved steps in unbound features"
+        )
+
+    preflight = config.stash.get(LOCATOR_PREFLIGHT, None)
+    if preflight:
+        from utils.locator_health import format_report
+
+        terminalreporter.write_sep("-", "locator preflight")
+        terminalreporter.write_line(format_report(preflight)[-1])
+
+    cache_reports = get_reports(config, "element_cache")
+    if cache_reports:
+        hits = sum(report["hits"] for report in cache_reports)
+        misses = sum(report["misses"] for report in cache_reports)
+        stale = sum(report["stale"] for report in cache_reports)
+        terminalreporter.write_sep("-", "element cache")
+        terminalreporter.write_line(f"hits: {hits}  misses: {misses}  stale re-resolves: {stale}")
+
+    click_reports = get_reports(config, "intercepted_clicks")
+    if click_reports:
+        clicks = [click for report in click_reports for click in report]
+        terminalreporter.write_sep("-", f"intercepted clicks: {len(clicks)}")
+        for click in clicks:
+            terminalreporter.write_line(
+                f"{click['test']}: {click['locator']} covered by {click['covered_by']} -> "
+                f"{click['resolution']} ({click['policy']}) in {click['seconds']:.3f}s"
+            )
+
+    for summary in get_reports(config, "driver_pool"):
+        terminalreporter.write_sep("-", "browser reuse (launch vs reset)")
+        terminalreporter.write_line(
+            f"launched: {summary['launch_count']}  reused: {summary['reuse_count']}  "
+            f"discarded: {summary['discarded']}"
+        )
+        terminalreporter.write_line(
+            f"avg launch: {summary['avg_launch_seconds']:.3f}s  "
+            f"avg reset: {summary['avg_reset_seconds']:.3f}s  "
+            f"estimated saved: {summary['estimated_saved_seconds']:.3f}s"
+        )
+        for test in summary["tests"]:
+            source = "launch" if test["launched"] else "reuse"
+            terminalreporter.write_line(
+                f"  {test['test']}: {source} {test['launch_seconds']:.3f}s, "
+                f"reset {test['reset_seconds']:.3f}s"
+            )
+
+
+    for summary in get_reports(config, "resource_blocking"):
+        # A baseline run loads what the profile matches, to measure it
+        blocked = "matched" if summary["baseline"] else "blocked"
+        terminalreporter.write_sep("-", "resource blocking baseline" if summary["baseline"] else "resource blocking")
+        terminalreporter.write_line(
+            f"{blocked} requests: {summary['blocked']}  bytes saved: {summary['bytes_saved'] / 1024:.1f} KiB"
+            f"  unsized: {summary['unsized']}"
+        )
+        if summary["unsized"] and not summary["baseline"]:
+            terminalreporter.write_line("run once with --resource-baseline to record the sizes of unsized requests")
+        for method in summary["methods"]:
+            terminalreporter.write_line(f"{method}: {BLOCKING_METHODS[method]}")
+        for test in summary["tests"]:
+            by_type = ", ".join(f"{name} {count}" for name, count in sorted(test["blocked_by_type"].items()))
+            terminalreporter.write_line(
+                f"  {test['test']} [{test['profile']}]: {test['blocked']} {blocked} ({by_type or '-'}), "
+                f"{test['bytes_saved'] / 1024:.1f} KiB saved, navigation {test['navigation_seconds']:.3f}s"
+            )
+
+    timing_reports = get_reports(config, "timing")
+    if timing_reports:
+        slowest = merge_summaries(timing_reports)
+        terminalreporter.write_sep("-", "slowest steps and waits")
+        for kind in ("steps", "locators"):
+            terminalreporter.write_line(f"{kind} (total / count / max / failed):")
+            for name, count, total, longest, failures in slowest[kind]:
+                terminalreporter.write_line(f"  {total:8.3f}s  {count:4d}  {longest:7.3f}s  {failures:3d}  {name}")
+        for report in timing_reports:
+            terminalreporter.write_line(f"trace: {report['trace']}")
+
+    matrix_reports = [report for report in get_reports(config, "device_matrix") if report["switches"]]
+    if matrix_reports:
+        terminalreporter.write_sep("-", "device matrix (emulation switches)")
+        switches = {}
+        for report in matrix_reports:
+            for name, seconds in report["switches"].items():
+                switches.setdefault(name, []).extend(seconds)
+        for name, seconds in switches.items():
+            terminalreporter.write_line(
+                f"{name}: {len(seconds)} switches, avg {sum(seconds) / len(seconds):.3f}s"
+            )
+
+    site_reports = [report for report in get_reports(config, "local_site") if report["requests"]]
+    if site_reports:
+        terminalreporter.write_sep("-", "local site")
+        terminalreporter.write_line(
+            f"requests: {sum(report['requests'] for report in site_reports)}  "
+            f"injected failures: {sum(report['injected_failures'] for report in site_reports)}"
+        )
+
+    artifact_reports = [report for report in get_reports(config, "artifacts") if report["failures"]]
+    if artifact_reports:
+        terminalreporter.write_sep("-", "failure artifacts")
+        terminalreporter.write_line(
+            f"files: {sum(report['files'] for report in artifact_reports)}  "
+            f"size: {sum(report['bytes'] for report in artifact_reports) / 1024 / 1024:.1f} MB  "
+            f"skipped over budget: {sum(report['skipped'] for report in artifact_reports)}"
+        )
+        for report in artifact_reports:
+            for failure in report["failures"]:
+                terminalreporter.write_line(f"{failure['test']}: {failure['path']}")
+
+    timeout_reports = get_reports(config, "wait_timeouts")
+    if timeout_reports:
+        terminalreporter.write_sep("-", f"wait timeouts (adaptive: {timeout_reports[0]['mode']})")
+        terminalreporter.write_line(
+            f"adapted waits: {sum(report['adapted'] for report in timeout_reports)} "
+            f"(locators: {sum(report['adapted_waits'] for report in timeout_reports)})  "
+            f"recorded latencies: {sum(len(seconds) for report in timeout_reports for seconds in report['samples'].values())}"
+        )
+        for report in timeout_reports:
+            for test in report["out_of_budget"]:
+                terminalreporter.write_line(f"over the {report['budget']}s scenario budget: {test}")
+
+    command_reports = get_reports(config, "commands")
+    if command_reports:
+        terminalreporter.write_sep("-", "webdriver commands")
+        for summary in command_reports:
+            for test in summary["tests"]:
+                terminalreporter.write_line(
+                    f"{test['test']}: {test['commands']} commands, {test['seconds']:.3f}s driver I/O"
+                )
+        for key in ("by_method", "by_step"):
+            terminalreporter.write_line(f"most commands {key.replace('_', ' ')} (commands / seconds):")
+            for name, count, seconds in merge_command_counts(command_reports, key):
+                terminalreporter.write_line(f"  {count:6d}  {seconds:8.3f}s  {name}")
+        for summary in command_reports:
+            terminalreporter.write_line(f"command log: {summary['log']}")
+
+    for summary in get_reports(config, "network"):
+        terminalreporter.write_sep("-", f"network {summary['mode']} ({summary['store']})")
+        terminalreporter.write_line(f"requests: {summary['requests']}  unmatched: {summary['unmatched']}")
+        for test in summary["tests"]:
+            if test["unmatched"]:
+                terminalreporter.write_line(f"  {test['test']}: {len(test['unmatched'])} unmatched")
+                for request in test["unmatched"]:
+                    terminalreporter.write_line(f"    {request}")
+
+    for summary in get_reports(config, "checkpoints"):
+        terminalreporter.write_sep("-", "given-step checkpoints (restore vs replay)")
+        terminalreporter.write_line(f"estimated saved: {summary['estimated_saved_seconds']:.3f}s")
+        for record in summary["checkpoints"]:
+            terminalreporter.write_line(
+                f"  {' > '.join(record['steps'])}: replay {record['replay_seconds']:.3f}s, "
+                f"{record['restores']} restores avg {record['avg_restore_seconds']:.3f}s, "
+                f"{record['failures']} failed"
+            )
+
+    context_reports = sorted(get_reports(config, "multi_context"), key=lambda report: (report["chromium"], report["worker"]))
+    if context_reports:
+        terminalreporter.write_sep("-", "shared chromium (contexts per browser)")
+        for chromium in sorted({report["chromium"] for report in context_reports}):
+            reports = [report for report in context_reports if report["chromium"] == chromium]
+            terminalreporter.write_line(
+                f"chromium {chromium}: peak RSS {max(report['peak_browser_rss_mb'] for report in reports):.1f} MB, "
+                f"{len(reports)} contexts"
+            )
+            for report in reports:
+                terminalreporter.write_line(
+                    f"  {report['worker']}: {report['tests']} tests, "
+                    f"{report['tests_per_minute']:.2f} tests/min, busy {report['busy_seconds']:.2f}s, "
+                    f"~{report['avg_rss_mb']:.1f} MB browser RSS, runner {report['runner_rss_mb']:.1f} MB"
+                )
+
+
+def pytest_bdd_before_scenario(request, feature, scenario):
+    timeouts = request.config.stash.get(WAIT_TIMEOUTS, None)
+    if timeouts:
+        timeouts.start_scenario(request.node.nodeid)
+
+
+def pytest_bdd_after_scenario(request, feature, scenario):
+    timeouts = request.config.stash.get(WAIT_TIMEOUTS, None)
+    if timeouts:
+        timeouts.end_scenario()
+
+
 def pytest_bdd_before_step(request, feature, scenario, step, step_func):
+    record_step(request, step)
+    trace = request.config.stash.get(TIMING_TRACE, None)
+    if trace:
+        trace.step_started(request.node.nodeid, f"{step.keyword} {step.name}")
+    tracer = request.config.stash.get(COMMAND_TRACER, None)
+    if tracer:
+        tracer.step = f"{step.keyword} {step.name}"
+
     if not hasattr(request.node, 'feature_printed'):
         feature_file = os.path.basename(feature.filename)
         print(f"\n\033[36m{'─' * 70}\033[0m")
@@ -197,8 +962,23 @@ def pytest_bdd_before_step(request, feature, scenario, step, step_func):
     print(f"{color}{step.type.upper()}\033[0m \033[97m{step.name}\033[0m")
 
 
+def pytest_bdd_after_step(request, feature, scenario, step, step_func, step_func_args):
+    trace = request.config.stash.get(TIMING_TRACE, None)
+    if trace:
+        trace.step_finished("passed")
+    tracer = request.config.stash.get(COMMAND_TRACER, None)
+    if tracer:
+        tracer.step = None
+
+
 def pytest_bdd_step_error(request, feature, scenario, step, step_func, exception):
     """When a step fails, display detailed error information"""
+    trace = request.config.stash.get(TIMING_TRACE, None)
+    if trace:
+        trace.step_finished("failed")
+    tracer = request.config.stash.get(COMMAND_TRACER, None)
+    if tracer:
+        tracer.step = None
     print(f"\n\033[31m{'!' * 70}\033[0m")
     print(f"\033[31m❌ Step execution failed\033[0m")
     print(f"\033[31mStep:\033[0m \033[97m{step.type.upper()} {step.name}\033[0m")
@@ -18,3 +18,26 @@ class OrderPageLocators:
     DELIVERY_ADDRESS_TEXT = selector('page.locator("[data-cy=\\"delivery-address-order-page\\"]")')
     ADDRESS_EDIT_TEXT = selector('page.locator("[data-testid=\\"GeneralIndicator\\"] span[data-i18n-key=\\"takeoutOrderPage.edit\\"]")')
 
+    # Input strategy per field (send_keys_to_element); the address search fetches its
+    # suggestions from key events, so it needs real keystrokes
+    INPUT_STRATEGIES = {
+        ADDRESS_SEARCH_INPUT: "typed",
+    }
+
+    # Signals that the order page has finished rendering
+    PAGE_READY = (RESTAURANT_HEADING, DELIVERY_PROMPT, MENU_NAVIGATION)
+    # Company information checked once the page has loaded
+    PAGE_CONTENT = (RESTAURANT_HEADING, DELIVERY_PROMPT, MENU_NAVIGATION, BRANCH_ADDRESS)
+
+    # Locator preflight (utils/locator_health.py): elements that only exist after an
+    # interaction (address picker, chosen address) and locators meant to match a list
+    PREFLIGHT_DEFERRED = (
+        ADDRESS_PICKER_MODAL,
+        ADDRESS_CLEAR_BUTTON,
+        ADDRESS_SEARCH_INPUT,
+        ADDRESS_SUGGESTION_ITEMS,
+        ADDRESS_CONFIRM_BUTTON,
+        DELIVERY_ADDRESS_TEXT,
+        ADDRESS_EDIT_TEXT,
+    )
+    PREFLIGHT_MULTIPLE = (ADDRESS_SUGGESTION_ITEMS,)
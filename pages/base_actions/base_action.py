@@ -1,19 +1,94 @@
+import json
+import logging
 import time  
 
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException, ElementNotInteractableException
+from selenium.common.exceptions import (
+    TimeoutException,
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
 from config.config import Config
 from pages.base_actions.base_utils import BaseUtils
+from pages.base_actions.driver_state import get_driver_state
+from pages.base_actions.scripts import (
+    VISIBLE_ELEMENTS_JS,
+    OBSERVE_CONDITION_JS,
+    CLICK_PROBE_JS,
+    WAIT_UNCOVERED_JS,
+    DISMISS_OVERLAY_JS,
+    NETWORK_HOOK_JS,
+    PAGE_READINESS_JS,
+    STORAGE_SNAPSHOT_JS,
+    STORAGE_RESTORE_JS,
+    SET_NATIVE_VALUE_JS,
+    SNAPSHOT_JS,
+    MATCH_COUNTS_JS,
+)
+from utils.locator_converter import locator_index, selector
+from utils.tracing import traced_wait
+from utils.wait_timeouts import cap_timeout
+
+
+logger = logging.getLogger(__name__)
 
 
 class BaseAction:
-    def __init__(self, driver):
+    # Locators that must all be visible before the page counts as ready (override per page)
+    READY_LOCATORS = ()
+
+    # Fields read by snapshot() unless others are requested
+    SNAPSHOT_FIELDS = ('text', 'value', 'classes', 'visible', 'enabled', 'rect')
+
+    # Input strategy per field for send_keys_to_element, {(locator_type, locator_value): strategy};
+    # fields not listed use INPUT_STRATEGY (override per page, declared next to its locators)
+    INPUT_STRATEGIES = {}
+
+    # Dismiss controls looked up inside an overlay covering a click target (CLICK_ENGINE=overlay,
+    # OVERLAY_POLICY=dismiss); override per page for site-specific modals and toasts
+    # (CSS only: XPath locators would match outside the overlay)
+    OVERLAY_DISMISS_LOCATORS = (
+        selector('page.locator("[aria-label=\\"Close\\" i]")'),
+        selector('page.locator("[aria-label=\\"Dismiss\\" i]")'),
+        selector('page.locator("[data-dismiss]")'),
+        selector('page.locator("button.close")'),
+    )
+
+    # Cookie fields accepted by CDP Network.setCookies
+    CDP_COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+
+    def __new__(cls, driver, *args, **kwargs):
+        # A Playwright Page selects the Playwright implementation of the same page object
+        if type(driver).__module__.startswith('playwright.'):
+            from pages.base_actions.playwright_action import playwright_page_class
+            cls = playwright_page_class(cls)
+        return super().__new__(cls)
+
+    def __init__(self, driver, config=None):
         self.driver = driver
-        self.config = Config()
-        self.wait = WebDriverWait(driver, self.config.DEFAULT_TIMEOUT)
+        # the session's config unless the page object is built for another combination
+        self.config = config or Config.current()
         self.utils = BaseUtils()
 
+    @property
+    def wait(self):
+        """
+        WebDriverWait with DEFAULT_TIMEOUT, capped by the scenario budget (--scenario-budget)
+        and the time left in the enclosing wait
+        """
+        return self._wait()
+
+    def _wait(self, timeout=None, poll_frequency=None):
+        return WebDriverWait(
+            self.driver, self._wait_timeout(timeout), poll_frequency=poll_frequency or self.config.POLL_FREQUENCY
+        )
+
+    def _wait_timeout(self, timeout=None):
+        return cap_timeout(self.config.DEFAULT_TIMEOUT if timeout is None else timeout)
+
     def open_url(self, url=None, path=None):
         """
         Opens the specified URL in the browser.
@@ -26,24 +101,221 @@ class BaseAction:
             target_url = url
         else:
             target_url = self.config.get_page_url(path or '')
-            
+
+        self._install_network_hook()
+        self._invalidate_element_cache()
         self.driver.get(target_url)
-        self.driver.implicitly_wait(10)
+        self.wait_for_navigation_ready(target_url)
 
-    def find_element(self, locator_type, locator_value):
+    @traced_wait
+    def wait_for_navigation_ready(self, url='', timeout=None):
         """
-        Finds the element with explicit wait and returns it
+        Waits until the page is ready according to PAGE_READY_STRATEGY and records the time spent.
+
+        Strategies:
+            document: document.readyState is 'complete'
+            network-idle: document complete and in-flight fetch/XHR count stays at or below
+                          NETWORK_IDLE_THRESHOLD for NETWORK_IDLE_MS
+            locators: document complete and all READY_LOCATORS of the page object are visible
+
+        Args:
+            url: Navigated URL, used for the timing record
+            timeout: Maximum time to wait in seconds (default: DEFAULT_TIMEOUT)
+
+        Returns:
+            float: Seconds spent waiting for readiness
+
+        Raises:
+            TimeoutException: If the page does not become ready within timeout
         """
-        return self.wait.until(
-            expected_conditions.presence_of_element_located((locator_type, locator_value))
+        strategy = self.config.PAGE_READY_STRATEGY
+        timeout = self.config.DEFAULT_TIMEOUT if timeout is None else timeout
+        start = time.perf_counter()
+
+        if strategy == 'network-idle':
+            self._wait_for_network_idle(timeout)
+        else:
+            self._wait(timeout, poll_frequency=0.1).until(
+                lambda driver: driver.execute_script("return document.readyState;") == 'complete',
+                f"Page did not reach readyState 'complete' in {timeout} seconds: {url}"
+            )
+            if strategy == 'locators':
+                self.wait_for_page_ready(timeout)
+
+        seconds = time.perf_counter() - start
+        get_driver_state(self.driver).navigations.append(
+            {'url': url, 'strategy': strategy, 'seconds': round(seconds, 3)}
+        )
+        logger.info("Page ready (%s) in %.3fs: %s", strategy, seconds, url)
+        return seconds
+
+    def _wait_for_network_idle(self, timeout):
+        threshold = self.config.NETWORK_IDLE_THRESHOLD
+        idle_seconds = self.config.NETWORK_IDLE_MS / 1000
+        quiet_since = None
+
+        def _is_idle(driver):
+            nonlocal quiet_since
+            readiness = driver.execute_script(PAGE_READINESS_JS)
+            if readiness['readyState'] != 'complete' or readiness['inflight'] > threshold:
+                quiet_since = None
+                return False
+            quiet_since = quiet_since or time.monotonic()
+            return time.monotonic() - quiet_since >= idle_seconds
+
+        self._wait(timeout, poll_frequency=0.1).until(
+            _is_idle, f"Network did not become idle in {timeout} seconds"
+        )
+
+    def _install_network_hook(self):
+        """
+        Registers the fetch/XHR counter to run before page scripts (Chromium CDP only).
+        Without CDP the hook is injected on the first readiness check instead.
+        """
+        state = get_driver_state(self.driver)
+        if self.config.PAGE_READY_STRATEGY != 'network-idle' or state.network_hook_installed:
+            return
+        if hasattr(self.driver, 'execute_cdp_cmd'):
+            self.driver.execute_cdp_cmd(
+                'Page.addScriptToEvaluateOnNewDocument', {'source': NETWORK_HOOK_JS}
+            )
+        state.network_hook_installed = True
+
+    @traced_wait
+    def find_element(self, locator_type, locator_value, timeout=None):
+        """
+        Finds the element with explicit wait and returns it.
+        With ELEMENT_CACHE enabled a previously resolved element of the current page is returned,
+        unless it turned stale.
+        """
+        cache = self._element_cache()
+        if cache:
+            element = cache.get(locator_type, locator_value)
+            if element is not None:
+                try:
+                    # A single light command, raises if the page replaced the element
+                    element.is_enabled()
+                    return element
+                except StaleElementReferenceException:
+                    cache.mark_stale(locator_type, locator_value)
+
+        element = self._wait(timeout).until(self._presence_condition(locator_type, locator_value))
+        self._cache_element(locator_type, locator_value, element)
+        return element
+
+    @staticmethod
+    def _presence_condition(locator_type, locator_value):
+        """
+        Presence condition honouring the `.nth()` index a compiled locator could not fold into its selector
+        """
+        index = locator_index(locator_value)
+        if not index:
+            return expected_conditions.presence_of_element_located((locator_type, locator_value))
+
+        def _nth_present(driver):
+            elements = driver.find_elements(locator_type, locator_value)
+            return elements[index] if -len(elements) <= index < len(elements) else False
+
+        return _nth_present
+
+    @staticmethod
+    def _script_locator(locator_type, locator_value):
+        return [locator_type, str(locator_value), locator_index(locator_value)]
+
+    def find_elements(self, locator_type, locator_value):
+        """
+        Finds all matching elements immediately, without waiting
+
+        Returns:
+            list: Matching elements, empty if none are present
+        """
+        elements = self.driver.find_elements(locator_type, locator_value)
+        index = locator_index(locator_value)
+        if index is None:
+            return elements
+        return [elements[index]] if -len(elements) <= index < len(elements) else []
+
+    def get_element_attribute(self, locator_type, locator_value, name):
+        """
+        Gets an attribute of the element immediately, without waiting
+
+        Returns:
+            str: Attribute value, or None if the element or attribute is not present
+        """
+        elements = self.find_elements(locator_type, locator_value)
+        if not elements:
+            return None
+        return elements[0].get_attribute(name)
+
+    def snapshot(self, locators, fields=SNAPSHOT_FIELDS, attributes=()):
+        """
+        Reads the state of several elements immediately, without waiting, in a single script call
+
+        Args:
+            locators: (locator_type, locator_value) tuples
+            fields: Any of 'text' (visible text, like element.text), 'value', 'classes',
+                    'visible', 'enabled', 'rect' ({x, y, width, height})
+            attributes: Attribute names to read into an 'attributes' dict
+
+        Returns:
+            list: Dict of the requested fields, or None if the element is not present,
+                  for each locator, in the same order as the locators
+        """
+        return self._run_script(
+            SNAPSHOT_JS,
+            [self._script_locator(*locator) for locator in locators],
+            list(fields),
+            list(attributes),
         )
 
-    def is_element_visible(self, locator_type, locator_value):
+    def match_counts(self, locators):
+        """
+        Counts the matches of several locators immediately, without waiting, in a single script call
+
+        Returns:
+            list: {'count': int, 'found': bool, 'visible': bool} for each locator, in the same
+                  order as the locators ('found'/'visible' refer to the element the locator
+                  resolves to, e.g. its `.nth()` match)
+        """
+        return self._run_script(MATCH_COUNTS_JS, [self._script_locator(*locator) for locator in locators])
+
+    def _element_cache(self):
+        if not self.config.ELEMENT_CACHE:
+            return None
+        return get_driver_state(self.driver).element_cache
+
+    def _cache_element(self, locator_type, locator_value, element):
+        cache = self._element_cache()
+        if cache and element is not None:
+            cache.put(locator_type, locator_value, element)
+
+    def _invalidate_element_cache(self):
+        cache = self._element_cache()
+        if cache:
+            cache.invalidate()
+
+    def _with_element(self, locator_type, locator_value, action):
+        """
+        Runs action(element) on the (possibly cached) element.
+        A cached element that turned stale is re-resolved once and the action retried.
+        """
+        element = self.find_element(locator_type, locator_value)
+        try:
+            return action(element)
+        except StaleElementReferenceException:
+            cache = self._element_cache()
+            if not cache:
+                raise
+            cache.mark_stale(locator_type, locator_value)
+            return action(self.find_element(locator_type, locator_value))
+
+    @traced_wait
+    def is_element_visible(self, locator_type, locator_value, timeout=None):
         """
         Checks if the element is visible and returns the boolean value
         """
         try:
-            self.wait.until(
+            self._wait(timeout).until(
                 expected_conditions.visibility_of_element_located((locator_type, locator_value))
             )
             return True
@@ -54,16 +326,138 @@ class BaseAction:
             """
             Click on a clickable element with fallback to JavaScript click if standard click fails
             """
+            if self.config.CLICK_ENGINE == 'overlay' and self._overlay_click(locator_type, locator_value):
+                return
+            cache = self._element_cache()
+            cached = cache.get(locator_type, locator_value) if cache else None
             try:
                 # Try standard click first
                 element = self.wait.until(
-                    expected_conditions.element_to_be_clickable((locator_type, locator_value))
+                    expected_conditions.element_to_be_clickable(cached or (locator_type, locator_value))
                 )
+                self._cache_element(locator_type, locator_value, element)
                 element.click()
+            except StaleElementReferenceException:
+                if not cache:
+                    raise
+                cache.mark_stale(locator_type, locator_value)
+                self.click_element(locator_type, locator_value)
             except (TimeoutException, ElementClickInterceptedException, ElementNotInteractableException):
                 # If standard click fails, try JavaScript click
-                element = self.driver.find_element(locator_type, locator_value)
-                self.driver.execute_script("arguments[0].click();", element)
+                self._with_element(
+                    locator_type, locator_value,
+                    lambda element: self.driver.execute_script("arguments[0].click();", element)
+                )
+
+    def _overlay_click(self, locator_type, locator_value):
+        """
+        Overlay-aware click (CLICK_ENGINE=overlay): one in-page probe tells whether the element
+        is ready and, via elementFromPoint, which element covers it. A clear element is clicked
+        right away; a covered one is handled per OVERLAY_POLICY and recorded in the driver state:
+            wait      wait for the covering element to go away (observer, up to DEFAULT_TIMEOUT),
+                      then click; dispatch the click in the page if it never does
+            dismiss   click a visible OVERLAY_DISMISS_LOCATORS control inside the overlay, then wait
+            dispatch  dispatch the click on the element in the page right away
+
+        Returns:
+            bool: False if the element is not ready (missing, hidden, disabled) or the probe
+                  failed, so the waiting standard click has to handle it
+        """
+        try:
+            probe = self._click_probe(locator_type, locator_value)
+        except WebDriverException:
+            return False
+        if probe['status'] == 'clear' and self._native_click(locator_type, locator_value, probe):
+            return True
+        if probe['status'] not in ('clear', 'covered'):
+            return False
+
+        start = time.perf_counter()
+        policy = self.config.OVERLAY_POLICY
+        resolution = None
+        if policy == 'dismiss':
+            try:
+                dismissed = self._run_script(
+                    DISMISS_OVERLAY_JS,
+                    self._script_locator(locator_type, locator_value),
+                    [self._script_locator(*locator) for locator in self.OVERLAY_DISMISS_LOCATORS],
+                )
+            except WebDriverException:
+                dismissed = None
+            if dismissed:
+                resolution = 'dismissed'
+        if policy != 'dispatch' and self._wait_uncovered(locator_type, locator_value):
+            resolution = resolution or 'waited'
+            if not self._native_click(locator_type, locator_value, self._click_probe(locator_type, locator_value)):
+                resolution = None
+        if resolution is None:
+            self._dispatch_click(locator_type, locator_value)
+            resolution = 'dispatched' if policy == 'dispatch' else 'timeout-dispatched'
+
+        get_driver_state(self.driver).intercepted_clicks.append({
+            'locator': f"{locator_type}: {locator_value}",
+            'covered_by': probe.get('covered_by') or 'unknown',
+            'policy': policy,
+            'resolution': resolution,
+            'seconds': round(time.perf_counter() - start, 3),
+        })
+        return True
+
+    def _click_probe(self, locator_type, locator_value):
+        return self._run_script(CLICK_PROBE_JS, self._script_locator(locator_type, locator_value), True)
+
+    def _native_click(self, locator_type, locator_value, probe):
+        """
+        Click the probed element
+
+        Returns:
+            bool: False if the element was not clear or another element received the click
+        """
+        if probe.get('status') != 'clear':
+            return False
+        element = probe.get('element') or self.find_element(locator_type, locator_value)
+        try:
+            element.click()
+        except (ElementClickInterceptedException, StaleElementReferenceException):
+            return False
+        self._cache_element(locator_type, locator_value, element)
+        return True
+
+    def _dispatch_click(self, locator_type, locator_value):
+        self._with_element(
+            locator_type, locator_value,
+            lambda element: self.driver.execute_script("arguments[0].click();", element)
+        )
+
+    def _wait_uncovered(self, locator_type, locator_value):
+        """
+        Wait until nothing covers the element any more
+
+        Returns:
+            bool: True if the element became clickable within DEFAULT_TIMEOUT
+        """
+        timeout = self._wait_timeout()
+        try:
+            result = self._run_async_script(
+                WAIT_UNCOVERED_JS, timeout, self._script_locator(locator_type, locator_value), int(timeout * 1000)
+            )
+        except WebDriverException:
+            return False
+        return result is True
+
+    def _run_script(self, script, *args):
+        return self.driver.execute_script(script, *args)
+
+    def _run_async_script(self, script, timeout, *args):
+        """
+        Run an async script (callback as last argument) that settles within `timeout` seconds
+        """
+        state = get_driver_state(self.driver)
+        # Async scripts are bounded by the session script timeout, keep it above the wait
+        if state.script_timeout is None or state.script_timeout < timeout + 5:
+            self.driver.set_script_timeout(timeout + 5)
+            state.script_timeout = timeout + 5
+        return self.driver.execute_async_script(script, *args)
 
     def click_if_exists(self, locator_type, locator_value):
         """
@@ -76,12 +470,35 @@ class BaseAction:
 
     def send_keys_to_element(self, locator_type, locator_value, text):
         """
-        Sends keyboard input to the specified element.
-        Only clear the field if it has a value.
-        After clearing, verify that the field has been cleared.
+        Sends keyboard input to the specified element, with the field's input strategy
+        (INPUT_STRATEGIES of the page, else INPUT_STRATEGY):
+            typed          Only clear the field if it has a value, verify that the field has
+                           been cleared, then send the keystrokes.
+            native-setter  Set the value through the native property setter and dispatch
+                           input/change in one script call. Falls back to typing if the field
+                           ends up with another value (input masks) or is not a form control.
         """
-        element = self.find_element(locator_type, locator_value)
+        if self._input_strategy(locator_type, locator_value) == 'native-setter':
+            if self._with_element(locator_type, locator_value, lambda element: self._set_native_value(element, text)):
+                return
+        self._with_element(
+            locator_type, locator_value,
+            lambda element: self._clear_and_type(element, locator_type, locator_value, text)
+        )
+
+    def _input_strategy(self, locator_type, locator_value):
+        return self.INPUT_STRATEGIES.get((locator_type, locator_value), self.config.INPUT_STRATEGY)
+
+    def _set_native_value(self, element, text):
+        """
+        Returns:
+            bool: True if the field holds exactly `text` after the input/change events
+        """
+        text = str(text)
+        return self.driver.execute_script(SET_NATIVE_VALUE_JS, element, text) == text
 
+    @staticmethod
+    def _clear_and_type(element, locator_type, locator_value, text):
         # Get the current field value
         current_value = element.get_attribute('value')
 
@@ -114,18 +531,19 @@ class BaseAction:
         """
         Get element text
         """
-        element = self.find_element(locator_type, locator_value)
-        return element.text
+        return self._with_element(locator_type, locator_value, lambda element: element.text)
 
-    def wait_for_element_visible(self, locator_type, locator_value):
+    @traced_wait
+    def wait_for_element_visible(self, locator_type, locator_value, timeout=None):
         """
         Waits until the specified element becomes visible
         Raises TimeoutException with detailed error message if element not found
         """
         try:
-            self.wait.until(
+            element = self._wait(timeout).until(
                 expected_conditions.visibility_of_element_located((locator_type, locator_value))
             )
+            self._cache_element(locator_type, locator_value, element)
         except TimeoutException:
             raise TimeoutException(
                 f"Element not found or not visible:\n"
@@ -133,6 +551,76 @@ class BaseAction:
                 f"Locator value: {locator_value}\n"
             )
 
+    @traced_wait
+    def wait_for_all_visible(self, *locators, timeout=None):
+        """
+        Waits until every locator resolves to a visible element.
+        All locators are checked with a single execute_script call per poll.
+
+        Args:
+            *locators: Locator tuples, e.g. OrderPageLocators.RESTAURANT_HEADING
+            timeout: Maximum time to wait in seconds (default: DEFAULT_TIMEOUT)
+
+        Returns:
+            list: Visible WebElements in the same order as the locators
+
+        Raises:
+            TimeoutException: If any element is not visible within timeout
+        """
+        return self._wait_for_visible_batch(locators, all, timeout)
+
+    @traced_wait
+    def wait_for_any_visible(self, *locators, timeout=None):
+        """
+        Waits until at least one locator resolves to a visible element.
+        All locators are checked with a single execute_script call per poll.
+
+        Args:
+            *locators: Locator tuples
+            timeout: Maximum time to wait in seconds (default: DEFAULT_TIMEOUT)
+
+        Returns:
+            list: Visible WebElement or None for each locator, in the same order as the locators
+
+        Raises:
+            TimeoutException: If no element is visible within timeout
+        """
+        return self._wait_for_visible_batch(locators, any, timeout)
+
+    @traced_wait
+    def wait_for_page_ready(self, timeout=None):
+        """
+        Waits until all READY_LOCATORS declared by the page object are visible
+        """
+        if self.READY_LOCATORS:
+            self.wait_for_all_visible(*self.READY_LOCATORS, timeout=timeout)
+
+    def _wait_for_visible_batch(self, locators, condition, timeout=None):
+        timeout = self.config.DEFAULT_TIMEOUT if timeout is None else timeout
+        script_locators = [self._script_locator(*locator) for locator in locators]
+        last_result = [None] * len(locators)
+
+        def _check(driver):
+            nonlocal last_result
+            last_result = driver.execute_script(VISIBLE_ELEMENTS_JS, script_locators)
+            return last_result if condition(last_result) else False
+
+        try:
+            elements = self._wait(timeout).until(_check)
+            for (locator_type, locator_value), element in zip(locators, elements):
+                self._cache_element(locator_type, locator_value, element)
+            return elements
+        except TimeoutException:
+            missing = "\n".join(
+                f"  {locator_type}: {locator_value}"
+                for (locator_type, locator_value), element in zip(locators, last_result)
+                if element is None
+            )
+            raise TimeoutException(
+                f"Elements not visible in {timeout} seconds ({condition.__name__} expected):\n{missing}"
+            )
+
+    @traced_wait
     def wait_for_element_clickable(self, locator_type, locator_value, timeout=10):
         """
         Waits until the specified element becomes clickable
@@ -146,29 +634,35 @@ class BaseAction:
             bool: True if element becomes clickable within timeout, False otherwise
         """
         try:
-            wait = WebDriverWait(self.driver, timeout)
-            wait.until(
+            self._wait(timeout).until(
                 expected_conditions.element_to_be_clickable((locator_type, locator_value))
             )
             return True
         except TimeoutException:
             return False
 
+    @traced_wait
     def wait_for_element_not_clickable(self, locator_type, locator_value, timeout=5):
         """
-        Waits until the specified element becomes not clickable (disabled or covered)
+        Waits until the specified element is not clickable (missing, hidden or disabled)
+        and has stayed so for STABILITY_WINDOW_MS
         
         Returns:
             bool: True if element becomes not clickable within timeout, False otherwise
         """
-        try:
-            wait = WebDriverWait(self.driver, timeout)
-            wait.until_not(
-                expected_conditions.element_to_be_clickable((locator_type, locator_value))
-            )
-            return True
-        except TimeoutException:
-            return False
+        return self._wait_until_stable(locator_type, locator_value, 'not_clickable', timeout=timeout)
+
+    @traced_wait
+    def wait_for_element_not_visible(self, locator_type, locator_value, timeout=5):
+        """
+        Waits until the specified element is missing or hidden and has stayed so for
+        STABILITY_WINDOW_MS. Use instead of `not is_element_visible(...)`, which only
+        returns False after waiting out its whole timeout.
+
+        Returns:
+            bool: True if element is not visible within timeout, False otherwise
+        """
+        return self._wait_until_stable(locator_type, locator_value, 'not_visible', timeout=timeout)
 
     def is_element_clickable(self, locator_type, locator_value):
         """
@@ -182,12 +676,13 @@ class BaseAction:
             bool: True if element is clickable, False otherwise
         """
         try:
-            element = self.driver.find_element(locator_type, locator_value)
             # Immediately check if element is enabled and displayed (no waiting)
-            return element.is_enabled() and element.is_displayed()
-        except Exception:
+            state = self.snapshot([(locator_type, locator_value)], fields=('visible', 'enabled'))[0]
+        except WebDriverException:
             return False
+        return bool(state) and state['enabled'] and state['visible']
 
+    @traced_wait
     def verify_element_not_clickable(self, locator_type, locator_value, timeout=10):
         """
         Verifies that an element is not clickable (disabled or covered)
@@ -205,7 +700,7 @@ class BaseAction:
         """
         # First check if element exists
         try:
-            element = self.find_element(locator_type, locator_value)
+            element = self.find_element(locator_type, locator_value, timeout)
         except TimeoutException:
             raise AssertionError(f"Element not found: {locator_type}, {locator_value}")
         
@@ -215,8 +710,13 @@ class BaseAction:
                 f"Element is still clickable in {timeout} seconds: {locator_type}, {locator_value}"
             )
         
-        # Double check by verifying element is disabled or not clickable
-        if element.is_enabled():
+        # Double check by verifying element is disabled or not clickable;
+        # an element replaced in the meantime is no longer the clickable one
+        try:
+            enabled = element.is_enabled()
+        except StaleElementReferenceException:
+            enabled = False
+        if enabled:
             # Element is enabled but might be covered, check if it's actually clickable
             if self.is_element_clickable(locator_type, locator_value):
                 raise AssertionError(
@@ -225,11 +725,12 @@ class BaseAction:
         
         return True
 
+    @traced_wait
     def wait_for_element_present(self, locator_type, locator_value, timeout=3):
         """
         Wait for the element to be present, not necessarily visible
         """
-        WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+        self._wait(timeout, poll_frequency=0.1).until(
             expected_conditions.presence_of_element_located((locator_type, locator_value))
         )
         return True
@@ -266,26 +767,42 @@ class BaseAction:
         """
         Scrolls the page until the specified element is visible.
         """
-        element = self.find_element(locator_type, locator_value)
-        self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-        return element
+        def _scroll(element):
+            self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+            return element
+
+        return self._with_element(locator_type, locator_value, _scroll)
 
+    @traced_wait
     def wait_for_element_disappears(self, locator_type, locator_value, timeout=10):
+        deadline = time.monotonic() + timeout
+        observed = self._observe_condition(locator_type, locator_value, 'disappears', timeout=timeout)
         try:
-            WebDriverWait(self.driver, timeout).until_not(
-                expected_conditions.presence_of_element_located((locator_type, locator_value))
-            )
+            if observed is None:
+                self._wait(self._remaining(deadline)).until_not(
+                    expected_conditions.presence_of_element_located((locator_type, locator_value))
+                )
+            elif not observed:
+                raise TimeoutException()
             return True
         except TimeoutException:
             raise AssertionError(f"Element does not disappear in {timeout} seconds: {locator_type}, {locator_value}")
 
+    @traced_wait
     def wait_for_element_text_contains(self, locator_type, locator_value, expected_text, timeout=10):
+        deadline = time.monotonic() + timeout
+        observed = self._observe_condition(
+            locator_type, locator_value, 'text_contains', expected_text, timeout
+        )
         try:
-            WebDriverWait(self.driver, timeout).until(
-                expected_conditions.text_to_be_present_in_element(
-                    (locator_type, locator_value), expected_text
+            if observed is None:
+                self._wait(self._remaining(deadline)).until(
+                    expected_conditions.text_to_be_present_in_element(
+                        (locator_type, locator_value), expected_text
+                    )
                 )
-            )
+            elif not observed:
+                raise TimeoutException()
             return True
         except TimeoutException as exc:
             raise AssertionError(
@@ -293,25 +810,144 @@ class BaseAction:
                 f"Locator: ({locator_type}, {locator_value})"
             ) from exc
 
+    @traced_wait
     def wait_for_element_text_not_contains(self, locator_type, locator_value, unexpected_text, timeout=10):
-        wait = WebDriverWait(self.driver, timeout)
-        try:
-            wait.until_not(
-                expected_conditions.text_to_be_present_in_element(
-                    (locator_type, locator_value), unexpected_text
-                )
-            )
-            return True
-        except TimeoutException as exc:
+        """
+        Waits until the element is missing or its text does not contain `unexpected_text`,
+        and has stayed so for STABILITY_WINDOW_MS
+        """
+        if not self._wait_until_stable(locator_type, locator_value, 'text_not_contains', unexpected_text, timeout):
             raise AssertionError(
                 f"Element text still contains the unexpected text: {unexpected_text} in {timeout} seconds. "
                 f"Locator: ({locator_type}, {locator_value})"
-            ) from exc
+            )
+        return True
+
+    def _wait_until_stable(self, locator_type, locator_value, condition, expected_text='', timeout=10):
+        """
+        Waits until a negative condition has held continuously for STABILITY_WINDOW_MS, so the
+        check passes shortly after the page settles instead of on a transient state. The
+        timeout stays the upper bound: a condition that holds at the timeout but has not yet
+        held for the whole window is not met (logged as a warning, the timeout may be too short).
+        Evaluated by the in-page observer, polled from here if the script channel fails.
+
+        Args:
+            condition: 'not_visible', 'not_clickable' or 'text_not_contains'
+
+        Returns:
+            bool: True if the condition was met, False otherwise
+        """
+        deadline = time.monotonic() + timeout
+        check = self._negative_check(locator_type, locator_value, condition, expected_text)
+        observed = self._observe_condition(
+            locator_type, locator_value, condition, expected_text, timeout, self.config.STABILITY_WINDOW_MS
+        )
+        if observed is not None:
+            if not observed and self._check_holds(check):
+                self._log_unstable(locator_type, locator_value, condition, timeout)
+            return observed
+
+        window = self.config.STABILITY_WINDOW_MS / 1000
+        held_since = None
+        while True:
+            now = time.monotonic()
+            holds = self._check_holds(check)
+            if not holds:
+                held_since = None
+            elif held_since is None:
+                held_since = now
+            if holds and now - held_since >= window:
+                return True
+            if now >= deadline:
+                if holds:
+                    self._log_unstable(locator_type, locator_value, condition, timeout)
+                return False
+            time.sleep(0.1)
+
+    @staticmethod
+    def _check_holds(check):
+        try:
+            return check()
+        except (StaleElementReferenceException, WebDriverException):
+            return False
+
+    def _log_unstable(self, locator_type, locator_value, condition, timeout):
+        logger.warning(
+            "%s held at the %ss timeout but not for the %sms stability window: (%s, %s)",
+            condition, timeout, self.config.STABILITY_WINDOW_MS, locator_type, locator_value,
+        )
+
+    def _negative_check(self, locator_type, locator_value, condition, expected_text=''):
+        """
+        Immediate check of a _wait_until_stable condition, for the polling fallback
+        """
+        def _not_visible():
+            elements = self.find_elements(locator_type, locator_value)
+            return not elements or not elements[0].is_displayed()
+
+        def _not_clickable():
+            return not self.is_element_clickable(locator_type, locator_value)
+
+        def _text_not_contains():
+            elements = self.find_elements(locator_type, locator_value)
+            return not elements or expected_text not in elements[0].text
+
+        checks = {
+            'not_visible': _not_visible,
+            'not_clickable': _not_clickable,
+            'text_not_contains': _text_not_contains,
+        }
+        if condition not in checks:
+            raise ValueError(f"Unsupported condition: {condition}")
+        return checks[condition]
+
+    def _observe_condition(self, locator_type, locator_value, condition, expected_text='', timeout=10,
+                           stable_ms=0):
+        """
+        Waits for a condition inside the page with a MutationObserver (WAIT_ENGINE=observer,
+        always used with a stability window).
+        The script resolves as soon as the DOM change happens instead of on the next poll.
+
+        Args:
+            condition: 'text_contains', 'text_not_contains', 'disappears', 'has_value',
+                       'not_visible' or 'not_clickable'
+            expected_text: Text used by the text conditions
+            timeout: Maximum time to wait in seconds
+            stable_ms: How long the condition must hold before it counts, 0 for immediately
+
+        Returns:
+            bool: Condition result, or None when the observer engine is disabled or the
+                  script channel failed (callers then fall back to polling)
+        """
+        if self.config.WAIT_ENGINE != 'observer' and not stable_ms:
+            return None
+
+        try:
+            result = self._run_async_script(
+                OBSERVE_CONDITION_JS,
+                timeout,
+                self._script_locator(locator_type, locator_value),
+                condition,
+                expected_text,
+                int(timeout * 1000),
+                stable_ms,
+            )
+        except WebDriverException:
+            # e.g. navigation during the wait or a page blocking script execution
+            return None
+        return result if isinstance(result, bool) else None
+
+    @staticmethod
+    def _remaining(deadline):
+        return max(0.0, deadline - time.monotonic())
 
     def refresh_page(self):
+        self._install_network_hook()
+        self._invalidate_element_cache()
         self.driver.refresh()
-        self.driver.implicitly_wait(10)
+        self.wait_for_navigation_ready('refresh')
 
+    @traced_wait
     def refresh_and_wait_for_element(self, locator_type, locator_value, timeout=10):
         """
         Refresh the page and wait for the specified element to appear
@@ -321,12 +957,13 @@ class BaseAction:
             locator_value: Locator value
             timeout: Timeout in seconds
         """
+        self._invalidate_element_cache()
         self.driver.refresh()
-        wait = WebDriverWait(self.driver, timeout)
-        wait.until(
+        self._wait(timeout).until(
             expected_conditions.visibility_of_element_located((locator_type, locator_value))
         )
 
+    @traced_wait
     def wait_for_element_has_value(self, locator_type, locator_value, timeout=10):
         """
         Wait for the element to have a value, until the element's value attribute is not empty or timeout
@@ -342,23 +979,97 @@ class BaseAction:
         Raises:
             TimeoutException: If the timeout is exceeded and raise_exception is True
         """
-        # First ensure the element exists and is visible
-        self.wait_for_element_visible(locator_type, locator_value)
-
-        # Get the element
-        element = self.find_element(locator_type, locator_value)
+        deadline = time.monotonic() + timeout
+        # First ensure the element exists and is visible, within the same timeout
+        self.wait_for_element_visible(locator_type, locator_value, timeout)
 
-        # Set the timeout
-        end_time = time.time() + timeout
+        observed = self._observe_condition(locator_type, locator_value, 'has_value', timeout=self._remaining(deadline))
+        if observed:
+            return True
 
-        # Loop to check if the element has a value
-        while time.time() < end_time:
-            current_value = element.get_attribute('value')
-            if current_value and current_value.strip():
+        if observed is None:
+            # Polling fallback when the script channel is not available
+            element = self.find_element(locator_type, locator_value, self._remaining(deadline))
+            try:
+                self._wait(self._remaining(deadline)).until(
+                    lambda driver: (element.get_attribute('value') or '').strip()
+                )
                 return True
-
-            # Wait for a short period of time and check again
-            time.sleep(0.5)
+            except TimeoutException:
+                pass
 
         # Timeout still no value, raise an exception
         raise TimeoutException(f"Element in {timeout} seconds did not get a value: {locator_type}, {locator_value}")
+
+    def capture_checkpoint(self) -> dict:
+        """
+        Snapshot the browser state a later scenario can continue from:
+        current URL, cookies and the web storage of the current origin
+
+        Returns:
+            dict: Snapshot to pass to restore_checkpoint()
+        """
+        if hasattr(self.driver, 'execute_cdp_cmd'):
+            # Chromium: cookies of every domain, not only the current one
+            cookies = self.driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+        else:
+            cookies = self.driver.get_cookies()
+        return {
+            'url': self.driver.current_url,
+            'cookies': cookies,
+            'storage': self.driver.execute_script(STORAGE_SNAPSHOT_JS),
+        }
+
+    def restore_checkpoint(self, snapshot):
+        """
+        Restore a capture_checkpoint() snapshot and open its URL
+
+        Args:
+            snapshot: Snapshot returned by capture_checkpoint()
+
+        Raises:
+            WebDriverException: If a restore step fails or the page ends up on another URL
+        """
+        url = snapshot['url']
+        self._install_network_hook()
+        self._invalidate_element_cache()
+
+        if hasattr(self.driver, 'execute_cdp_cmd'):
+            cookies = [
+                {field: cookie[field] for field in self.CDP_COOKIE_FIELDS
+                 if field in cookie and not (field == 'expires' and cookie.get('session'))}
+                for cookie in snapshot['cookies']
+            ]
+            self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+            # Write web storage before any page script runs, then drop the one-shot script
+            source = f"({STORAGE_RESTORE_JS})({json.dumps(snapshot['storage'])});"
+            script = self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': source})
+            try:
+                self.driver.get(url)
+            finally:
+                self.driver.execute_cdp_cmd(
+                    'Page.removeScriptToEvaluateOnNewDocument', {'identifier': script['identifier']}
+                )
+        else:
+            # Cookies and storage can only be written on their origin, so load the page twice
+            self.driver.get(url)
+            self.driver.delete_all_cookies()
+            for cookie in snapshot['cookies']:
+                self.driver.add_cookie(cookie)
+            self.driver.execute_script(f"return ({STORAGE_RESTORE_JS})(arguments[0]);", snapshot['storage'])
+            self.driver.refresh()
+
+        self.wait_for_navigation_ready(url)
+        if self.driver.current_url != url:
+            raise WebDriverException(f"Checkpoint restore ended on {self.driver.current_url} instead of {url}")
+
+    def clear_browser_state(self):
+        """
+        Clear cookies and the web storage of the current origin
+        """
+        self.driver.execute_script(
+            "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+        )
+        if hasattr(self.driver, 'execute_cdp_cmd'):
+            self.driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        self.driver.delete_all_cookies()
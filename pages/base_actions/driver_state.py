@@ -0,0 +1,41 @@
+import collections
+import weakref
+
+from pages.base_actions.element_cache import ElementCache
+
+
+class DriverState:
+    """
+    Per-driver state shared by every page object built on the same WebDriver.
+
+    Page objects are created fresh in each step, so anything that has to outlive a
+    single page object (session timeouts already applied, caches, timings) lives here.
+    """
+
+    def __init__(self):
+        self.script_timeout = None
+        self.network_hook_installed = False
+        # one entry per navigation: {'url', 'strategy', 'seconds'}
+        self.navigations = []
+        # one entry per click intercepted by an overlay (CLICK_ENGINE=overlay):
+        # {'locator', 'covered_by', 'policy', 'resolution', 'seconds'}
+        self.intercepted_clicks = []
+        # recent console messages of a Playwright page (failure artifacts)
+        self.console_messages = collections.deque(maxlen=200)
+        self.element_cache = ElementCache()
+        # background request interceptor of a Selenium driver (utils/resource_blocking.py)
+        self.request_interceptor = None
+
+
+_states = weakref.WeakKeyDictionary()
+
+
+def get_driver_state(driver) -> DriverState:
+    """
+    Get the DriverState for the given driver, creating it on first use
+    """
+    state = _states.get(driver)
+    if state is None:
+        state = DriverState()
+        _states[driver] = state
+    return state
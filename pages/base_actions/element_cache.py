@@ -0,0 +1,56 @@
+class ElementCache:
+    """
+    WebElement cache keyed by (locator_type, locator_value) for the currently loaded page.
+
+    Entries are dropped on navigation/refresh. Pages also change without either (link
+    clicks, form posts, re-rendering scripts), so BaseAction checks a hit for staleness
+    before returning it; a stale entry is re-resolved and counted in `stale`.
+    """
+
+    def __init__(self):
+        self._elements = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, locator_type, locator_value):
+        """
+        Get the cached element or None, counting the hit or miss
+        """
+        element = self._elements.get((locator_type, locator_value))
+        if element is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return element
+
+    def put(self, locator_type, locator_value, element):
+        self._elements[(locator_type, locator_value)] = element
+
+    def mark_stale(self, locator_type, locator_value):
+        """
+        Drop an entry whose element turned stale, counting it
+        """
+        self.stale += 1
+        self.invalidate(locator_type, locator_value)
+
+    def invalidate(self, locator_type=None, locator_value=None):
+        """
+        Drop one entry, or every entry when no locator is given
+        """
+        if locator_type is None:
+            self._elements.clear()
+        else:
+            self._elements.pop((locator_type, locator_value), None)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "stale": self.stale}
+
+    def reset(self):
+        """
+        Clear every entry and the counters
+        """
+        self._elements.clear()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
@@ -0,0 +1,389 @@
+import re
+import time
+
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import expect
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from config.config import Config
+from pages.base_actions.base_action import BaseAction
+from pages.base_actions.base_utils import BaseUtils
+from pages.base_actions.driver_state import get_driver_state
+from pages.base_actions.scripts import (
+    CLICK_PROBE_JS,
+    STORAGE_SNAPSHOT_JS,
+    STORAGE_RESTORE_JS,
+    page_function,
+    page_promise,
+)
+from utils.locator_converter import locator_index, to_playwright_selector
+from utils.tracing import traced_wait
+
+
+class PlaywrightElement:
+    """
+    Minimal WebElement-like wrapper around a Playwright Locator, so page objects can keep
+    using `.text`, `.click()`, `.get_attribute()` etc. on elements returned by BaseAction.
+    """
+
+    def __init__(self, locator):
+        self.locator = locator
+
+    @property
+    def text(self) -> str:
+        return self.locator.inner_text()
+
+    def click(self):
+        self.locator.click()
+
+    def clear(self):
+        self.locator.fill('')
+
+    def send_keys(self, text):
+        self.locator.press_sequentially(str(text))
+
+    def get_attribute(self, name):
+        if name == 'value':
+            try:
+                return self.locator.input_value()
+            except PlaywrightError:
+                pass
+        return self.locator.get_attribute(name)
+
+    def is_enabled(self) -> bool:
+        return self.locator.is_enabled()
+
+    def is_displayed(self) -> bool:
+        return self.locator.is_visible()
+
+
+class PlaywrightAction(BaseAction):
+    """
+    BaseAction implemented on a Playwright sync `Page` (selected with --engine=playwright).
+
+    Keeps the BaseAction method contracts (return values, TimeoutException/AssertionError)
+    so page objects and step definitions run unchanged on either engine. Playwright
+    auto-waits on every action, so most helpers are a single call without a polling loop.
+    """
+
+    def __init__(self, driver, config=None):
+        self.driver = driver
+        self.page = driver
+        self.config = config or Config.current()
+        self.utils = BaseUtils()
+
+    def _locator(self, locator_type, locator_value):
+        locator = self.page.locator(to_playwright_selector(locator_type, locator_value))
+        index = locator_index(locator_value)
+        return locator.nth(index) if index else locator.first
+
+    def _timeout_ms(self, timeout=None):
+        # Playwright treats 0 as no timeout, a spent budget or deadline must still time out
+        return max(1, self._wait_timeout(timeout) * 1000)
+
+    def _wait_for_state(self, locator_type, locator_value, state, timeout=None):
+        self._locator(locator_type, locator_value).wait_for(state=state, timeout=self._timeout_ms(timeout))
+
+    def open_url(self, url=None, path=None):
+        """
+        Opens the specified URL in the browser.
+
+        Args:
+            url: Full URL to open. If None, uses BASE_URL from config
+            path: Path to append to BASE_URL, e.g. 'login' or 'products'
+        """
+        target_url = url or self.config.get_page_url(path or '')
+        self.page.goto(target_url, wait_until='commit', timeout=self._timeout_ms())
+        self.wait_for_navigation_ready(target_url)
+
+    @traced_wait
+    def wait_for_navigation_ready(self, url='', timeout=None):
+        """
+        Waits for readiness per PAGE_READY_STRATEGY ('network-idle' uses Playwright's
+        built-in networkidle: no requests for 500ms) and records the time spent.
+
+        Returns:
+            float: Seconds spent waiting for readiness
+        """
+        strategy = self.config.PAGE_READY_STRATEGY
+        start = time.perf_counter()
+        load_state = 'networkidle' if strategy == 'network-idle' else 'load'
+        try:
+            self.page.wait_for_load_state(load_state, timeout=self._timeout_ms(timeout))
+        except PlaywrightTimeoutError as exc:
+            raise TimeoutException(f"Page did not reach '{load_state}' in time: {url}") from exc
+        if strategy == 'locators':
+            self.wait_for_page_ready(timeout)
+
+        seconds = time.perf_counter() - start
+        get_driver_state(self.page).navigations.append(
+            {'url': url, 'strategy': strategy, 'seconds': round(seconds, 3)}
+        )
+        return seconds
+
+    @traced_wait
+    def find_element(self, locator_type, locator_value, timeout=None):
+        try:
+            self._wait_for_state(locator_type, locator_value, 'attached', timeout)
+        except PlaywrightTimeoutError as exc:
+            raise TimeoutException(f"Element not found: {locator_type}, {locator_value}") from exc
+        return PlaywrightElement(self._locator(locator_type, locator_value))
+
+    def find_elements(self, locator_type, locator_value):
+        locator = self.page.locator(to_playwright_selector(locator_type, locator_value))
+        elements = [PlaywrightElement(locator.nth(i)) for i in range(locator.count())]
+        index = locator_index(locator_value)
+        if index is None:
+            return elements
+        return [elements[index]] if -len(elements) <= index < len(elements) else []
+
+    def get_element_attribute(self, locator_type, locator_value, name):
+        locator = self._locator(locator_type, locator_value)
+        if not locator.count():
+            return None
+        return locator.get_attribute(name)
+
+    @traced_wait
+    def is_element_visible(self, locator_type, locator_value, timeout=None):
+        try:
+            self._wait_for_state(locator_type, locator_value, 'visible', timeout)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    def click_element(self, locator_type, locator_value):
+        if self.config.CLICK_ENGINE == 'overlay' and self._overlay_click(locator_type, locator_value):
+            return
+        locator = self._locator(locator_type, locator_value)
+        try:
+            locator.click(timeout=self._timeout_ms())
+        except PlaywrightError:
+            # Same fallback as the Selenium engine: dispatch the click in the page
+            locator.dispatch_event('click')
+
+    def send_keys_to_element(self, locator_type, locator_value, text):
+        locator = self._locator(locator_type, locator_value)
+        # fill() already sets the value and fires input events in one call (native-setter);
+        # fields or runs (--input-strategy) asking for 'typed' get real keystrokes
+        if self._input_strategy(locator_type, locator_value) == 'typed':
+            locator.fill('', timeout=self._timeout_ms())
+            locator.press_sequentially(str(text), timeout=self._timeout_ms())
+        else:
+            locator.fill(str(text), timeout=self._timeout_ms())
+
+    def get_element_text(self, locator_type, locator_value):
+        return self._locator(locator_type, locator_value).inner_text(timeout=self._timeout_ms())
+
+    @traced_wait
+    def wait_for_element_visible(self, locator_type, locator_value, timeout=None):
+        try:
+            self._wait_for_state(locator_type, locator_value, 'visible', timeout)
+        except PlaywrightTimeoutError:
+            raise TimeoutException(
+                f"Element not found or not visible:\n"
+                f"Locator type: {locator_type}\n"
+                f"Locator value: {locator_value}\n"
+            )
+
+    @traced_wait
+    def wait_for_all_visible(self, *locators, timeout=None):
+        timeout = self._wait_timeout(timeout)
+        deadline = time.monotonic() + timeout
+        elements = []
+        for locator_type, locator_value in locators:
+            try:
+                self._wait_for_state(
+                    locator_type, locator_value, 'visible', max(0.0, deadline - time.monotonic())
+                )
+            except PlaywrightTimeoutError:
+                raise TimeoutException(
+                    f"Elements not visible in {timeout} seconds (all expected):\n"
+                    f"  {locator_type}: {locator_value}"
+                )
+            elements.append(PlaywrightElement(self._locator(locator_type, locator_value)))
+        return elements
+
+    @traced_wait
+    def wait_for_any_visible(self, *locators, timeout=None):
+        timeout = self._wait_timeout(timeout)
+        playwright_locators = [self._locator(*locator) for locator in locators]
+        combined = playwright_locators[0]
+        for locator in playwright_locators[1:]:
+            combined = combined.or_(locator)
+        try:
+            combined.first.wait_for(state='visible', timeout=self._timeout_ms(timeout))
+        except PlaywrightTimeoutError:
+            missing = "\n".join(f"  {locator_type}: {locator_value}" for locator_type, locator_value in locators)
+            raise TimeoutException(f"Elements not visible in {timeout} seconds (any expected):\n{missing}")
+        return [PlaywrightElement(locator) if locator.is_visible() else None for locator in playwright_locators]
+
+    @traced_wait
+    def wait_for_element_clickable(self, locator_type, locator_value, timeout=10):
+        try:
+            self._wait_for_state(locator_type, locator_value, 'visible', timeout)
+            handle = self._locator(locator_type, locator_value).element_handle(timeout=self._timeout_ms(timeout))
+            handle.wait_for_element_state('enabled', timeout=self._timeout_ms(timeout))
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    def is_element_clickable(self, locator_type, locator_value):
+        locator = self._locator(locator_type, locator_value)
+        try:
+            return locator.count() > 0 and locator.is_visible() and locator.is_enabled()
+        except PlaywrightError:
+            return False
+
+    @traced_wait
+    def wait_for_element_present(self, locator_type, locator_value, timeout=3):
+        try:
+            self._wait_for_state(locator_type, locator_value, 'attached', timeout)
+        except PlaywrightTimeoutError as exc:
+            raise TimeoutException(f"Element not present: {locator_type}, {locator_value}") from exc
+        return True
+
+    def scroll_to_element(self, locator_type, locator_value):
+        locator = self._locator(locator_type, locator_value)
+        locator.scroll_into_view_if_needed(timeout=self._timeout_ms())
+        return PlaywrightElement(locator)
+
+    @traced_wait
+    def wait_for_element_disappears(self, locator_type, locator_value, timeout=10):
+        try:
+            self._wait_for_state(locator_type, locator_value, 'detached', timeout)
+            return True
+        except PlaywrightTimeoutError:
+            raise AssertionError(f"Element does not disappear in {timeout} seconds: {locator_type}, {locator_value}")
+
+    @traced_wait
+    def wait_for_element_text_contains(self, locator_type, locator_value, expected_text, timeout=10):
+        try:
+            expect(self._locator(locator_type, locator_value)).to_contain_text(
+                expected_text, timeout=self._timeout_ms(timeout)
+            )
+            return True
+        except AssertionError as exc:
+            raise AssertionError(
+                f"Element text does not contain the expected text: {expected_text} in {timeout} seconds. "
+                f"Locator: ({locator_type}, {locator_value})"
+            ) from exc
+
+    def _observe_condition(self, locator_type, locator_value, condition, expected_text='', timeout=10,
+                           stable_ms=0):
+        # Only needed for stability windows, the other waits are Playwright auto-waits
+        if not stable_ms:
+            return None
+        return super()._observe_condition(
+            locator_type, locator_value, condition, expected_text, timeout, stable_ms
+        )
+
+    def _run_script(self, script, *args):
+        try:
+            return self.page.evaluate(page_function(script), list(args))
+        except PlaywrightError as exc:
+            raise WebDriverException(str(exc)) from exc
+
+    def _run_async_script(self, script, timeout, *args):
+        try:
+            return self.page.evaluate(page_promise(script), list(args))
+        except PlaywrightError as exc:
+            raise WebDriverException(str(exc)) from exc
+
+    def _click_probe(self, locator_type, locator_value):
+        # Page elements cannot be returned to the test, clicks go through the Locator
+        return self._run_script(CLICK_PROBE_JS, self._script_locator(locator_type, locator_value), False)
+
+    def _native_click(self, locator_type, locator_value, probe):
+        if probe.get('status') != 'clear':
+            return False
+        try:
+            self._locator(locator_type, locator_value).click(timeout=self._timeout_ms())
+        except PlaywrightError:
+            return False
+        return True
+
+    def _dispatch_click(self, locator_type, locator_value):
+        self._locator(locator_type, locator_value).dispatch_event('click')
+
+    def refresh_page(self):
+        self.page.reload(wait_until='commit', timeout=self._timeout_ms())
+        self.wait_for_navigation_ready('refresh')
+
+    @traced_wait
+    def refresh_and_wait_for_element(self, locator_type, locator_value, timeout=10):
+        self.page.reload(timeout=self._timeout_ms(timeout))
+        try:
+            self._wait_for_state(locator_type, locator_value, 'visible', timeout)
+        except PlaywrightTimeoutError as exc:
+            raise TimeoutException(f"Element not visible after refresh: {locator_type}, {locator_value}") from exc
+
+    @traced_wait
+    def wait_for_element_has_value(self, locator_type, locator_value, timeout=10):
+        deadline = time.monotonic() + timeout
+        self.wait_for_element_visible(locator_type, locator_value, timeout)
+        try:
+            expect(self._locator(locator_type, locator_value)).to_have_value(
+                re.compile(r"\S"), timeout=self._timeout_ms(self._remaining(deadline))
+            )
+            return True
+        except AssertionError:
+            raise TimeoutException(f"Element in {timeout} seconds did not get a value: {locator_type}, {locator_value}")
+
+    def capture_checkpoint(self):
+        return {
+            'url': self.page.url,
+            'cookies': self.page.context.cookies(),
+            'storage': self.page.evaluate(f"() => {{{STORAGE_SNAPSHOT_JS}}}"),
+        }
+
+    def restore_checkpoint(self, snapshot):
+        url = snapshot['url']
+
+        def is_target(request_url):
+            return request_url == url
+
+        try:
+            self.page.context.clear_cookies()
+            self.page.context.add_cookies(snapshot['cookies'])
+            # Storage can only be written on its origin: serve an empty document for a
+            # first load of the URL, write the storage there, then load the real page
+            self.page.route(is_target, lambda route: route.fulfill(status=200, content_type='text/html', body=''))
+            try:
+                self.page.goto(url, wait_until='commit', timeout=self._timeout_ms())
+                self.page.evaluate(STORAGE_RESTORE_JS, snapshot['storage'])
+            finally:
+                self.page.unroute(is_target)
+            self.page.goto(url, wait_until='commit', timeout=self._timeout_ms())
+        except PlaywrightError as exc:
+            raise WebDriverException(f"Checkpoint restore failed: {exc}") from exc
+
+        self.wait_for_navigation_ready(url)
+        if self.page.url != url:
+            raise WebDriverException(f"Checkpoint restore ended on {self.page.url} instead of {url}")
+
+    def clear_browser_state(self):
+        self.page.context.clear_cookies()
+        self.page.evaluate("() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }")
+
+
+_page_classes = {}
+
+
+def playwright_page_class(page_class):
+    """
+    Get the Playwright variant of a page object class.
+
+    The variant puts PlaywrightAction between the page object and BaseAction in the MRO,
+    so page-specific methods stay the same while every BaseAction helper runs on Playwright.
+    """
+    if issubclass(page_class, PlaywrightAction):
+        return page_class
+    variant = _page_classes.get(page_class)
+    if variant is None:
+        variant = type(page_class.__name__, (page_class, PlaywrightAction), {
+            '__module__': page_class.__module__,
+            '__doc__': page_class.__doc__,
+        })
+        _page_classes[page_class] = variant
+    return variant
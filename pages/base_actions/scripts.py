@@ -0,0 +1,486 @@
+"""
+JavaScript snippets executed in the page by BaseAction.
+
+Locators are passed to the page as [locator_type, locator_value, index] lists using the
+Selenium `By` strings (index is the unfolded `.nth()` of a compiled locator, may be null), so the same tuples from the locator classes can be resolved
+in the browser without a findElement round-trip per locator.
+"""
+
+# Resolve a Selenium locator inside the page and check element visibility
+LOCATOR_HELPERS_JS = """
+function __findAll(by, value, root) {
+    root = root || document;
+    var quoted = '"' + String(value).replace(/\\\\/g, '\\\\\\\\').replace(/"/g, '\\\\"') + '"';
+    switch (by) {
+        case 'id':
+            return Array.from(root.querySelectorAll('[id=' + quoted + ']'));
+        case 'name':
+            return Array.from(root.querySelectorAll('[name=' + quoted + ']'));
+        case 'class name':
+            return Array.from(root.getElementsByClassName(value));
+        case 'tag name':
+            return Array.from(root.getElementsByTagName(value));
+        case 'css selector':
+            return Array.from(root.querySelectorAll(value));
+        case 'xpath':
+            var snapshot = document.evaluate(
+                value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+            );
+            var nodes = [];
+            for (var i = 0; i < snapshot.snapshotLength; i++) {
+                nodes.push(snapshot.snapshotItem(i));
+            }
+            return nodes;
+        case 'link text':
+        case 'partial link text':
+            return Array.from(root.querySelectorAll('a')).filter(function (a) {
+                var text = (a.innerText || a.textContent || '').trim();
+                return by === 'link text' ? text === value : text.indexOf(value) !== -1;
+            });
+    }
+    throw new Error('Unsupported locator type: ' + by);
+}
+
+function __find(locator) {
+    var elements = __findAll(locator[0], locator[1]);
+    var index = locator[2] || 0;
+    return elements[index < 0 ? elements.length + index : index] || null;
+}
+
+function __isVisible(el) {
+    if (!el || !el.isConnected) {
+        return false;
+    }
+    var style = window.getComputedStyle(el);
+    if (style.visibility === 'hidden' || style.visibility === 'collapse'
+            || style.display === 'none' || parseFloat(style.opacity) === 0) {
+        return false;
+    }
+    var rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+"""
+
+# arguments[0]: list of locators -> list with the visible element or null per locator
+VISIBLE_ELEMENTS_JS = LOCATOR_HELPERS_JS + """
+return arguments[0].map(function (locator) {
+    var el = __find(locator);
+    return __isVisible(el) ? el : null;
+});
+"""
+
+# Async script: resolve as soon as a condition on one element becomes true.
+# With a stability window (ms, 0 = none) the condition must hold that long without turning
+# false again; negative conditions use it so a transient state cannot pass the check.
+# arguments: locator, condition name, expected text, timeout in ms, stability window in ms, callback
+OBSERVE_CONDITION_JS = LOCATOR_HELPERS_JS + """
+var locator = arguments[0];
+var condition = arguments[1];
+var expected = arguments[2];
+var timeoutMs = arguments[3];
+var stableMs = arguments[4] || 0;
+var done = arguments[arguments.length - 1];
+
+function __text(el) {
+    return el.innerText || el.textContent || '';
+}
+
+function check() {
+    var el = __find(locator);
+    switch (condition) {
+        case 'text_contains':
+            return !!el && __text(el).indexOf(expected) !== -1;
+        case 'text_not_contains':
+            return !el || __text(el).indexOf(expected) === -1;
+        case 'disappears':
+            return !el;
+        case 'has_value':
+            return !!el && String(el.value || '').trim() !== '';
+        case 'not_visible':
+            return !__isVisible(el);
+        case 'not_clickable':
+            return !__isVisible(el) || el.disabled === true;
+    }
+    throw new Error('Unsupported condition: ' + condition);
+}
+
+var finished = false;
+var observer = null;
+var timer = null;
+var interval = null;
+var stableTimer = null;
+
+function finish(result) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    if (observer) {
+        observer.disconnect();
+    }
+    document.removeEventListener('input', onChange, true);
+    document.removeEventListener('change', onChange, true);
+    clearTimeout(timer);
+    clearTimeout(stableTimer);
+    clearInterval(interval);
+    done(result);
+}
+
+function onChange() {
+    try {
+        if (!check()) {
+            // The window restarts once the condition holds again
+            clearTimeout(stableTimer);
+            stableTimer = null;
+        } else if (!stableMs) {
+            finish(true);
+        } else if (stableTimer === null) {
+            stableTimer = setTimeout(function () {
+                stableTimer = null;
+                try {
+                    if (check()) {
+                        finish(true);
+                    }
+                } catch (e) {
+                    finish({error: String(e)});
+                }
+            }, stableMs);
+        }
+    } catch (e) {
+        finish({error: String(e)});
+    }
+}
+
+onChange();
+if (!finished) {
+    try {
+        observer = new MutationObserver(onChange);
+        observer.observe(document.documentElement, {
+            subtree: true, childList: true, attributes: true, characterData: true
+        });
+        document.addEventListener('input', onChange, true);
+        document.addEventListener('change', onChange, true);
+        if (condition === 'has_value' || stableMs) {
+            // Values set through the property setter and style transitions fire no mutations
+            interval = setInterval(onChange, 100);
+        }
+        timer = setTimeout(function () {
+            // With a stability window a condition that has not held long enough is not met
+            finish(!stableMs && check());
+        }, timeoutMs);
+    } catch (e) {
+        finish({error: String(e)});
+    }
+}
+"""
+
+# Counts in-flight fetch/XHR requests; installed before page scripts when CDP is available
+NETWORK_HOOK_JS = """
+(function () {
+    if (window.__inflightRequests !== undefined) {
+        return;
+    }
+    window.__inflightRequests = 0;
+    function start() {
+        window.__inflightRequests++;
+    }
+    function end() {
+        window.__inflightRequests = Math.max(0, window.__inflightRequests - 1);
+    }
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            start();
+            return originalFetch.apply(this, arguments).then(function (response) {
+                end();
+                return response;
+            }, function (error) {
+                end();
+                throw error;
+            });
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        start();
+        this.addEventListener('loadend', end);
+        return originalSend.apply(this, arguments);
+    };
+})();
+"""
+
+# Snapshot of document and network readiness; installs the network hook if it is missing
+PAGE_READINESS_JS = NETWORK_HOOK_JS + """
+return {
+    readyState: document.readyState,
+    inflight: window.__inflightRequests
+};
+"""
+
+# Web storage of the current origin (localStorage and sessionStorage as plain objects)
+STORAGE_SNAPSHOT_JS = """
+function __dump(storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        items[key] = storage.getItem(key);
+    }
+    return items;
+}
+return {
+    origin: location.origin,
+    local: __dump(window.localStorage),
+    session: __dump(window.sessionStorage)
+};
+"""
+
+# Function expression writing a STORAGE_SNAPSHOT_JS result back; only applies on the
+# snapshot's origin in the top frame. Returns whether the storage was written.
+STORAGE_RESTORE_JS = """
+function (snapshot) {
+    if (window.top !== window || location.origin !== snapshot.origin) {
+        return false;
+    }
+    window.localStorage.clear();
+    window.sessionStorage.clear();
+    Object.keys(snapshot.local).forEach(function (key) {
+        window.localStorage.setItem(key, snapshot.local[key]);
+    });
+    Object.keys(snapshot.session).forEach(function (key) {
+        window.sessionStorage.setItem(key, snapshot.session[key]);
+    });
+    return true;
+}
+"""
+
+# Element receiving a click at the centre of another element, like the browser hit test
+CLICK_HELPERS_JS = LOCATOR_HELPERS_JS + """
+function __coveringElement(el) {
+    var rect = el.getBoundingClientRect();
+    var hit = document.elementFromPoint(rect.left + rect.width / 2, rect.top + rect.height / 2);
+    if (!hit || hit === el || el.contains(hit)) {
+        return null;
+    }
+    return hit;
+}
+
+function __describe(el) {
+    var text = el.tagName.toLowerCase();
+    if (el.id) {
+        text += '#' + el.id;
+    }
+    if (typeof el.className === 'string' && el.className.trim()) {
+        text += '.' + el.className.trim().split(/\\s+/).slice(0, 3).join('.');
+    }
+    return text;
+}
+"""
+
+# arguments: locator, whether to return the element
+# -> {status: 'missing'|'hidden'|'disabled'|'covered'|'clear', covered_by, element}
+CLICK_PROBE_JS = CLICK_HELPERS_JS + """
+var el = __find(arguments[0]);
+if (!el) {
+    return {status: 'missing'};
+}
+if (!__isVisible(el)) {
+    return {status: 'hidden'};
+}
+if (el.disabled === true) {
+    return {status: 'disabled'};
+}
+var rect = el.getBoundingClientRect();
+if (rect.top < 0 || rect.left < 0 || rect.bottom > window.innerHeight || rect.right > window.innerWidth) {
+    el.scrollIntoView({block: 'center', inline: 'center'});
+}
+var cover = __coveringElement(el);
+return {
+    status: cover ? 'covered' : 'clear',
+    covered_by: cover ? __describe(cover) : null,
+    element: arguments[1] ? el : null
+};
+"""
+
+# Async script: resolve true once the element is visible and nothing covers its centre.
+# arguments: locator, timeout in ms, callback
+WAIT_UNCOVERED_JS = CLICK_HELPERS_JS + """
+var locator = arguments[0];
+var timeoutMs = arguments[1];
+var done = arguments[arguments.length - 1];
+var finished = false;
+var observer = null;
+var interval = null;
+var timer = null;
+
+function finish(result) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    if (observer) {
+        observer.disconnect();
+    }
+    clearInterval(interval);
+    clearTimeout(timer);
+    done(result);
+}
+
+function check() {
+    try {
+        var el = __find(locator);
+        if (el && __isVisible(el) && !__coveringElement(el)) {
+            finish(true);
+        }
+    } catch (e) {
+        finish({error: String(e)});
+    }
+}
+
+check();
+if (!finished) {
+    observer = new MutationObserver(check);
+    observer.observe(document.documentElement, {
+        subtree: true, childList: true, attributes: true
+    });
+    // Fade-out transitions change no attributes
+    interval = setInterval(check, 100);
+    timer = setTimeout(function () {
+        finish(false);
+    }, timeoutMs);
+}
+"""
+
+# Click the first visible dismiss control inside the overlay covering the element.
+# arguments: locator, dismiss locators -> dismiss locator value used, 'uncovered' or null
+DISMISS_OVERLAY_JS = CLICK_HELPERS_JS + """
+var el = __find(arguments[0]);
+var cover = el && __coveringElement(el);
+if (!cover) {
+    return 'uncovered';
+}
+for (var node = cover; node && node !== document.body; node = node.parentElement) {
+    for (var i = 0; i < arguments[1].length; i++) {
+        var dismiss = arguments[1][i];
+        var controls = __findAll(dismiss[0], dismiss[1], node).filter(__isVisible);
+        if (controls.length) {
+            controls[0].click();
+            return dismiss[1];
+        }
+    }
+}
+return null;
+"""
+
+
+# Read the state of many elements in one call.
+# arguments: list of locators, field names, attribute names -> per locator a
+# {field: value} object (plus 'attributes' when attribute names are given), or null if missing
+SNAPSHOT_JS = LOCATOR_HELPERS_JS + """
+var fields = arguments[1];
+var attributes = arguments[2];
+var readers = {
+    text: function (el) { return __isVisible(el) ? el.innerText : ''; },
+    value: function (el) { return 'value' in el ? el.value : null; },
+    classes: function (el) { return Array.from(el.classList); },
+    visible: function (el) { return __isVisible(el); },
+    enabled: function (el) { return !el.matches(':disabled'); },
+    rect: function (el) {
+        var rect = el.getBoundingClientRect();
+        return {x: rect.x, y: rect.y, width: rect.width, height: rect.height};
+    }
+};
+return arguments[0].map(function (locator) {
+    var el = __find(locator);
+    if (!el) {
+        return null;
+    }
+    var state = {};
+    fields.forEach(function (field) {
+        if (!readers[field]) {
+            throw new Error('Unsupported snapshot field: ' + field);
+        }
+        state[field] = readers[field](el);
+    });
+    if (attributes.length) {
+        state.attributes = {};
+        attributes.forEach(function (name) {
+            state.attributes[name] = el.getAttribute(name);
+        });
+    }
+    return state;
+});
+"""
+
+
+# arguments[0]: list of locators -> per locator {count: matches of the selector,
+# found: whether the (indexed) element exists, visible: whether it is visible}
+MATCH_COUNTS_JS = LOCATOR_HELPERS_JS + """
+return arguments[0].map(function (locator) {
+    var el = __find(locator);
+    return {
+        count: __findAll(locator[0], locator[1]).length,
+        found: !!el,
+        visible: __isVisible(el)
+    };
+});
+"""
+
+
+# arguments[0]: number of entries -> the most recent requests of the page from the
+# Resource Timing API (failure artifacts)
+RECENT_NETWORK_JS = """
+var entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+return entries.slice(-arguments[0]).map(function (entry) {
+    return {
+        url: entry.name,
+        type: entry.initiatorType,
+        start_ms: Math.round(entry.startTime),
+        duration_ms: Math.round(entry.duration),
+        transfer_bytes: entry.transferSize,
+        status: entry.responseStatus
+    };
+});
+"""
+
+
+# Set a form control's value through the native property setter (bypassing the value
+# tracking of React and similar frameworks) and fire input/change like a user edit.
+# arguments: element, value -> value after the events, or null for non form controls
+SET_NATIVE_VALUE_JS = """
+var el = arguments[0];
+var prototypes = [window.HTMLInputElement, window.HTMLTextAreaElement, window.HTMLSelectElement];
+var prototype = null;
+for (var i = 0; i < prototypes.length; i++) {
+    if (el instanceof prototypes[i]) {
+        prototype = prototypes[i].prototype;
+    }
+}
+if (!prototype) {
+    return null;
+}
+el.focus();
+Object.getOwnPropertyDescriptor(prototype, 'value').set.call(el, arguments[1]);
+el.dispatchEvent(new Event('input', {bubbles: true}));
+el.dispatchEvent(new Event('change', {bubbles: true}));
+return el.value;
+"""
+
+
+def page_function(script: str) -> str:
+    """
+    Wrap a Selenium execute_script body as a function for Playwright page.evaluate,
+    called with the script arguments as one list
+    """
+    return "function (args) { return (function () {\n" + script + "\n}).apply(null, args); }"
+
+
+def page_promise(script: str) -> str:
+    """
+    Wrap a Selenium execute_async_script body as a function returning a Promise for
+    Playwright page.evaluate, called with the script arguments (without the callback) as one list
+    """
+    return (
+        "function (args) { return new Promise(function (resolve) { (function () {\n"
+        + script
+        + "\n}).apply(null, args.concat([resolve])); }); }"
+    )
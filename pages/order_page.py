@@ -1,18 +1,38 @@
-from selenium.common.exceptions import NoSuchElementException  # type: ignore
-
 from pages.base_actions.base_action import BaseAction
-from url import BASE_URL
 from locators.order_page_locators import OrderPageLocators
 
 
 class OrderPage(BaseAction):
+    READY_LOCATORS = OrderPageLocators.PAGE_READY
+    INPUT_STRATEGIES = OrderPageLocators.INPUT_STRATEGIES
+
     def open(self):
-        self.open_url(url=BASE_URL)
+        self.open_url(url=self.config.BASE_URL)
 
     def wait_for_page_loaded(self):
-        self.wait_for_element_visible(*OrderPageLocators.RESTAURANT_HEADING)
-        self.wait_for_element_visible(*OrderPageLocators.DELIVERY_PROMPT)
-        self.wait_for_element_visible(*OrderPageLocators.MENU_NAVIGATION)
+        self.wait_for_page_ready()
+
+    def get_page_content(self) -> dict:
+        """
+        Restaurant name, delivery prompt, menu navigation and branch address read in one round-trip
+
+        Returns:
+            dict: {'restaurant_name', 'branch_address': str, 'delivery_prompt_visible',
+                   'menu_navigation_visible': bool}
+
+        Raises:
+            TimeoutException: If any of them is not visible in time, naming the missing ones
+        """
+        self.wait_for_all_visible(*OrderPageLocators.PAGE_CONTENT)
+        heading, prompt, navigation, address = (
+            state or {} for state in self.snapshot(OrderPageLocators.PAGE_CONTENT, fields=('text', 'visible'))
+        )
+        return {
+            'restaurant_name': heading.get('text', ''),
+            'delivery_prompt_visible': prompt.get('visible', False),
+            'menu_navigation_visible': navigation.get('visible', False),
+            'branch_address': address.get('text', ''),
+        }
 
     def get_restaurant_name(self) -> str:
         return self.get_element_text(*OrderPageLocators.RESTAURANT_HEADING)
@@ -77,13 +97,16 @@ class OrderPage(BaseAction):
         else:
             raise ValueError(f"Unsupported service type: {option}")
 
+    def is_service_type_selected(self, option: str) -> bool:
+        if option.strip().lower() == "delivery":
+            return self.is_delivery_prompt_message_visible()
+        return self.is_delivery_prompt_message_hidden()
+
     def is_delivery_option_selected(self) -> bool:
-        try:
-            element = self.driver.find_element(*OrderPageLocators.DELIVERY_SWITCHER_BUTTON)
-        except NoSuchElementException:
+        state = self.snapshot([OrderPageLocators.DELIVERY_SWITCHER_BUTTON], fields=("classes",))[0]
+        if state is None:
             return False
-        classes = element.get_attribute("class") or ""
-        return "border-orange" in classes or "shadow-xl" in classes
+        return "border-orange" in state["classes"] or "shadow-xl" in state["classes"]
 
     def open_address_picker(self):
         self.wait_for_element_clickable(*OrderPageLocators.ADDRESS_PICKER_TRIGGER)
@@ -98,13 +121,13 @@ class OrderPage(BaseAction):
         self.wait_for_element_visible(*OrderPageLocators.ADDRESS_SUGGESTION_ITEMS)
 
     def select_first_address_suggestion(self):
-        suggestions = self.driver.find_elements(*OrderPageLocators.ADDRESS_SUGGESTION_ITEMS)
+        suggestions = self.find_elements(*OrderPageLocators.ADDRESS_SUGGESTION_ITEMS)
         if not suggestions:
             raise AssertionError("No address suggestions are available to select.")
         suggestions[0].click()
 
     def get_first_address_suggestion_text(self):
-        suggestions = self.driver.find_elements(*OrderPageLocators.ADDRESS_SUGGESTION_ITEMS)
+        suggestions = self.find_elements(*OrderPageLocators.ADDRESS_SUGGESTION_ITEMS)
         if not suggestions:
             raise AssertionError("No address suggestions are available to read.")
         return suggestions[0].text.strip()
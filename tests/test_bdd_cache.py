@@ -0,0 +1,118 @@
+import os
+
+import pytest
+from pytest_bdd import feature as bdd_feature
+from pytest_bdd import given, parsers
+
+from utils.bdd_cache import FeatureCache, StepIndex
+
+FEATURE = """Feature: Cache
+    Scenario: Cached
+        Given a cached step
+"""
+
+
+# Step definitions resolved by the StepIndex tests below
+@given("an exact step")
+def exact_step():
+    pass
+
+
+@given(parsers.parse("I have {count:d} items"))
+def parsed_step(count):
+    pass
+
+
+@given("an ambiguous step")
+def ambiguous_first():
+    pass
+
+
+@given("an ambiguous step")
+def ambiguous_second():
+    pass
+
+
+@pytest.fixture
+def features(monkeypatch):
+    # pytest-bdd's per-process cache of parsed features, isolated per test
+    parsed = {}
+    monkeypatch.setattr(bdd_feature, "features", parsed)
+    return parsed
+
+
+@pytest.fixture
+def feature_file(tmp_path):
+    path = tmp_path / "cache.feature"
+    path.write_text(FEATURE)
+    return path
+
+
+def parse_and_save(cache_path, feature_file):
+    bdd_feature.get_feature(str(feature_file.parent), feature_file.name)
+    FeatureCache(cache_path).save()
+
+
+def test_unchanged_feature_is_primed_from_the_cache(tmp_path, features, feature_file):
+    cache_path = str(tmp_path / "bdd.pickle")
+    parse_and_save(cache_path, feature_file)
+    features.clear()
+
+    cache = FeatureCache(cache_path)
+    cache.prime()
+
+    assert cache.hits == 1
+    assert features[str(feature_file)].name == "Cache"
+
+
+def test_changed_feature_is_parsed_again(tmp_path, features, feature_file):
+    cache_path = str(tmp_path / "bdd.pickle")
+    parse_and_save(cache_path, feature_file)
+    features.clear()
+    feature_file.write_text(FEATURE.replace("Cache", "Changed cache"))
+
+    cache = FeatureCache(cache_path)
+    cache.prime()
+
+    assert cache.hits == 0
+    assert features == {}
+
+
+def test_save_skips_the_write_when_nothing_changed(tmp_path, features, feature_file):
+    cache_path = tmp_path / "bdd.pickle"
+    parse_and_save(str(cache_path), feature_file)
+    os.utime(cache_path, ns=(0, 0))
+
+    FeatureCache(str(cache_path)).save()
+
+    assert cache_path.stat().st_mtime_ns == 0
+
+
+def test_unreadable_cache_is_ignored(tmp_path):
+    cache_path = tmp_path / "bdd.pickle"
+    cache_path.write_bytes(b"not a pickle")
+    assert FeatureCache(str(cache_path)).entries == {}
+
+
+@pytest.fixture
+def index(request):
+    return StepIndex(request.session._fixturemanager)
+
+
+@pytest.mark.parametrize("text, status, definitions", [
+    ("an exact step", "ok", 1),
+    ("I have 3 items", "ok", 1),
+    ("an ambiguous step", "ambiguous", 2),
+    ("an undefined step", "missing", 0),
+])
+def test_step_resolution(request, index, text, status, definitions):
+    resolved_status, resolved = index.resolve("given", text, request.node.nodeid)
+    assert (resolved_status, len(resolved)) == (status, definitions)
+
+
+def test_steps_of_another_module_are_not_visible(index):
+    assert index.resolve("given", "an exact step", "tests/test_order_page.py::test_other")[0] == "missing"
+
+
+def test_step_type_must_match(request, index):
+    assert index.resolve("when", "an exact step", request.node.nodeid)[0] == "missing"
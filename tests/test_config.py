@@ -0,0 +1,67 @@
+import pytest
+
+from config.config import Config
+
+
+@pytest.fixture(autouse=True)
+def clean_environment(monkeypatch):
+    for name in ("ENV", "BROWSER", "DEVICE_TYPE", "DEFAULT_TIMEOUT", "LOCAL_SITE_PORT", "BASE_PATH"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_defaults():
+    config = Config()
+    assert config.BROWSER == "chrome"
+    assert config.DEVICE_TYPE == "desktop"
+    assert config.DEFAULT_TIMEOUT == 20
+
+
+def test_environment_overrides_defaults(monkeypatch):
+    monkeypatch.setenv("BROWSER", "firefox")
+    monkeypatch.setenv("DEVICE_TYPE", "iphone17")
+    config = Config()
+    assert config.BROWSER == "firefox"
+    assert config.DEVICE_TYPE == "iphone17"
+
+
+def test_overrides_win_over_the_environment(monkeypatch):
+    monkeypatch.setenv("BROWSER", "firefox")
+    monkeypatch.setenv("DEFAULT_TIMEOUT", "5")
+    config = Config({"BROWSER": "safari"})
+    assert config.BROWSER == "safari"
+    assert config.DEFAULT_TIMEOUT == 5
+
+
+def test_overrides_are_converted_like_environment_values():
+    config = Config({"DEFAULT_TIMEOUT": 7, "HEADLESS": True})
+    assert config.DEFAULT_TIMEOUT == 7
+    assert config.HEADLESS is True
+
+
+def test_replace_keeps_the_other_overrides():
+    config = Config({"BROWSER": "firefox", "DEFAULT_TIMEOUT": 7})
+    replaced = config.replace(BROWSER="safari")
+    assert (replaced.BROWSER, replaced.DEFAULT_TIMEOUT) == ("safari", 7)
+    assert config.BROWSER == "firefox"
+
+
+def test_config_is_immutable():
+    with pytest.raises(AttributeError):
+        Config().BROWSER = "firefox"
+
+
+@pytest.mark.parametrize("overrides", [
+    {"ENV": "bogus"},
+    {"BROWSER": "edge"},
+    {"DEFAULT_TIMEOUT": 0},
+    {"LOCAL_SITE_FLAKINESS": 1.5},
+    {"NOT_A_SETTING": 1},
+])
+def test_invalid_settings_are_rejected(overrides):
+    with pytest.raises(ValueError):
+        Config(overrides)
+
+
+def test_base_url():
+    assert Config({"ENV": "staging", "BASE_PATH": "order"}).BASE_URL == "https://staging.inline.app/order"
+    assert Config({"ENV": "local", "LOCAL_SITE_PORT": 8123, "BASE_PATH": ""}).BASE_URL == "http://127.0.0.1:8123"
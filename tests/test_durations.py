@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from utils.durations import DEFAULT_SECONDS, HISTORY_RUNS, DurationHistory, LPTScheduling, parse_shard, split_shards
+
+
+def write_history(path, durations):
+    path.write_text(json.dumps({"durations": durations}))
+    return str(path)
+
+
+@pytest.fixture
+def history(tmp_path):
+    return DurationHistory(
+        write_history(tmp_path / "durations.json", {
+            "chrome|desktop|slow": [9.0, 10.0, 30.0],
+            "chrome|desktop|medium": [4.0],
+            "chrome|desktop|fast": [1.0],
+            "firefox|desktop|fast": [100.0],
+        }),
+        "chrome",
+        "desktop",
+    )
+
+
+def test_estimate_is_the_median_of_the_recorded_runs(history):
+    assert history.estimate("slow") == 10.0
+    assert history.estimate("fast") == 1.0
+
+
+def test_unknown_test_gets_the_mean_estimate_of_its_browser_and_device(history):
+    assert history.estimate("new") == pytest.approx((10.0 + 4.0 + 1.0) / 3)
+
+
+def test_missing_history_file_falls_back_to_the_default(tmp_path):
+    history = DurationHistory(str(tmp_path / "missing.json"), "chrome", "desktop")
+    assert history.estimate("any") == DEFAULT_SECONDS
+
+
+def test_save_keeps_only_the_recent_runs(tmp_path):
+    path = write_history(tmp_path / "durations.json", {"chrome|desktop|test": [1.0] * HISTORY_RUNS})
+    history = DurationHistory(path, "chrome", "desktop")
+    for duration in (0.5, 1.5, 0.25):  # setup, call, teardown
+        history.pytest_runtest_logreport(type("Report", (), {"nodeid": "test", "duration": duration}))
+    history.save()
+
+    runs = json.loads((tmp_path / "durations.json").read_text())["durations"]["chrome|desktop|test"]
+    assert len(runs) == HISTORY_RUNS
+    assert runs[-1] == 2.25
+
+
+@pytest.mark.parametrize("value, expected", [("", None), ("1/3", (1, 3)), ("3/3", (3, 3))])
+def test_parse_shard(value, expected):
+    assert parse_shard(value) == expected
+
+
+@pytest.mark.parametrize("value", ["0/3", "4/3", "1", "a/b"])
+def test_parse_shard_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        parse_shard(value)
+
+
+def test_split_shards_balances_the_estimated_duration(history):
+    shards = split_shards(["fast", "medium", "slow", "new"], history, 2)
+
+    assert shards == [{"slow"}, {"medium", "new", "fast"}]
+
+
+def test_split_shards_is_deterministic(history):
+    nodeids = ["fast", "medium", "slow", "new", "other"]
+    assert split_shards(nodeids, history, 3) == split_shards(list(reversed(nodeids)), history, 3)
+
+
+class FakeNode:
+    def __init__(self, name):
+        self.gateway = type("Gateway", (), {"id": name})
+        self.sent = []
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def shutdown(self):
+        pass
+
+
+class FakeConfig:
+    def __init__(self, workers):
+        self.values = {"tx": [f"{workers}*popen"], "maxschedchunk": None}
+
+    def getvalue(self, name):
+        return self.values[name]
+
+    getoption = getvalue
+
+
+def test_lpt_scheduling_sends_the_longest_tests_first(history):
+    collection = ["fast", "new", "slow", "medium"]
+    scheduler = LPTScheduling(FakeConfig(2), history)
+    nodes = [FakeNode("gw0"), FakeNode("gw1")]
+    for node in nodes:
+        scheduler.add_node(node)
+        scheduler.add_node_collection(node, collection)
+
+    scheduler.schedule()
+
+    # Round robin over the workers, longest first: slow 10s, new 5s (mean estimate), medium 4s, fast 1s
+    assert [[collection[index] for index in node.sent] for node in nodes] == [["slow", "medium"], ["new", "fast"]]
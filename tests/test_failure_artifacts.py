@@ -0,0 +1,62 @@
+import gzip
+import sys
+
+import pytest
+
+from config import config as config_module
+from utils import wait_timeouts
+
+pytest_plugins = ["pytester"]
+
+FEATURE = """Feature: Failure artifacts
+    Scenario: Failing scenario
+        Given the order page is open
+        Then the order is shown
+"""
+
+TEST_MODULE = """
+from pytest_bdd import given, scenarios, then
+
+scenarios("artifacts.feature")
+
+
+@given("the order page is open")
+def order_page_is_open(request):
+    # Requested by name like the repo's steps, so it is not in item.funcargs
+    request.getfixturevalue("browser")
+
+
+@then("the order is shown")
+def order_is_shown():
+    assert False, "order missing"
+"""
+
+
+class FakeDriver:
+    page_source = "<html><body>order page</body></html>"
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def repo_conftest(monkeypatch, tmp_path):
+    module = sys.modules["conftest"]
+    monkeypatch.setattr(module, "create_driver", lambda *args, **kwargs: FakeDriver())
+    monkeypatch.setenv("SCREENSHOT_PATH", str(tmp_path / "artifacts"))
+    # The inner session activates its own Config and wait policy
+    monkeypatch.setattr(config_module, "_current", config_module._current)
+    monkeypatch.setattr(wait_timeouts, "active", wait_timeouts.active)
+    return module
+
+
+def test_failing_scenario_writes_artifacts(pytester, repo_conftest, tmp_path):
+    pytester.makefile(".feature", artifacts=FEATURE)
+    pytester.makepyfile(test_artifacts=TEST_MODULE)
+
+    result = pytester.inline_run("--failure-artifacts=dom", "-p", "no:cacheprovider", plugins=[repo_conftest])
+
+    result.assertoutcome(failed=1)
+    dom_files = list((tmp_path / "artifacts").rglob("dom.html.gz"))
+    assert len(dom_files) == 1
+    assert b"order page" in gzip.decompress(dom_files[0].read_bytes())
@@ -0,0 +1,58 @@
+import pytest
+from selenium.webdriver.common.by import By
+
+from pages.base_actions.base_action import BaseAction
+from utils.locator_converter import LocatorCompileError, LocatorValue, compile_locator, locator_index
+
+
+@pytest.mark.parametrize("source, expected", [
+    ('page.locator("#submit")', (By.ID, "submit", None)),
+    ('page.locator("li").nth(2)', (By.CSS_SELECTOR, "li", 2)),
+    ('page.locator("#menu").locator("li").last', (By.CSS_SELECTOR, "#menu li", -1)),
+    ('page.locator("//li").nth(2)', (By.XPATH, "(//li)[3]", None)),
+    ('page.locator("li").nth(1).locator("a")', (By.XPATH, "(//li)[2]//a", None)),
+    ("page.get_by_test_id('a\"b')", (By.CSS_SELECTOR, '[data-testid="a\\"b"]', None)),
+    ("page.get_by_placeholder('a\\\\b', exact=True)", (By.CSS_SELECTOR, '[placeholder="a\\\\b"]', None)),
+    ("page.get_by_test_id('a\"b').locator('//span')", (By.XPATH, "//*[@data-testid='a\"b']//span", None)),
+])
+def test_compile_locator(source, expected):
+    locator_type, locator_value = compile_locator(source)
+    assert (locator_type, str(locator_value), locator_index(locator_value)) == expected
+
+
+def test_playwright_only_css_is_rejected():
+    with pytest.raises(LocatorCompileError):
+        compile_locator('page.locator("button:has-text(\\"Save\\")")')
+
+
+def test_locator_value_without_index_behaves_like_str():
+    assert LocatorValue("a") == "a"
+    assert "a" == LocatorValue("a")
+    assert "a" in {LocatorValue("a")}
+    assert LocatorValue("a") in {"a"}
+
+
+def test_locator_value_index_is_part_of_equality():
+    assert LocatorValue("a", 2) != "a"
+    assert "a" != LocatorValue("a", 2)
+    assert LocatorValue("a", 2) == LocatorValue("a", 2)
+    assert LocatorValue("a", 2) != LocatorValue("a", 1)
+
+
+def test_locator_index_of_a_plain_string_is_none():
+    assert locator_index("div") is None
+
+
+class FakeDriver:
+    def find_elements(self, locator_type, locator_value):
+        return ["first", "second", "third"]
+
+
+def test_plain_string_locators_are_not_indexed():
+    action = object.__new__(BaseAction)
+    action.driver = FakeDriver()
+
+    assert action.find_elements(By.CSS_SELECTOR, "li") == ["first", "second", "third"]
+    assert action.find_elements(By.CSS_SELECTOR, LocatorValue("li", 1)) == ["second"]
+    assert BaseAction._script_locator(By.CSS_SELECTOR, "li") == [By.CSS_SELECTOR, "li", None]
+    assert BaseAction._presence_condition(By.CSS_SELECTOR, LocatorValue("li", -1))(FakeDriver()) == "third"
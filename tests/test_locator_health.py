@@ -0,0 +1,79 @@
+import argparse
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+
+from config.config import Config
+from utils.drivers import add_browser_arguments, browser_config
+from utils.locator_health import check_page, run_preflight
+
+HEADING = (By.CSS_SELECTOR, "h1")
+MENU = (By.CSS_SELECTOR, "#menu")
+ITEMS = (By.CSS_SELECTOR, "li")
+PICKER = (By.CSS_SELECTOR, ".picker")
+BANNER = (By.CSS_SELECTOR, ".banner")
+
+
+class FakeLocators:
+    HEADING = HEADING
+    MENU = MENU
+    ITEMS = ITEMS
+    PICKER = PICKER
+    PAGE_READY = (HEADING, MENU)
+    PREFLIGHT_DEFERRED = (PICKER, MENU)
+
+
+class FakePage:
+    READY_LOCATORS = (HEADING, MENU, BANNER)
+    COUNTS = {
+        HEADING: {"found": True, "count": 1, "visible": False},
+        MENU: {"found": False, "count": 0, "visible": False},
+        ITEMS: {"found": True, "count": 3, "visible": True},
+        PICKER: {"found": False, "count": 0, "visible": False},
+        BANNER: {"found": True, "count": 1, "visible": True},
+    }
+
+    def __init__(self, driver, config=None):
+        self.config = config
+        self.ready_timeout = None
+
+    def open(self):
+        pass
+
+    def wait_for_page_ready(self, timeout=None):
+        self.ready_timeout = timeout
+        raise TimeoutException("Elements not visible")
+
+    def match_counts(self, locators):
+        return [self.COUNTS[locator] for locator in locators]
+
+
+def test_check_page_reports_ready_locators():
+    statuses = {result["name"]: result["status"] for result in check_page(FakePage(None), FakeLocators)}
+
+    assert statuses == {
+        "FakeLocators.HEADING": "hidden",
+        # Deferred does not apply to a locator the page waits for
+        "FakeLocators.MENU": "missing",
+        "FakeLocators.ITEMS": "ambiguous",
+        "FakeLocators.PICKER": "deferred",
+        "FakeLocators.READY_LOCATORS[2]": "ok",
+    }
+
+
+def test_run_preflight_reports_instead_of_raising_on_ready_timeout():
+    report = run_preflight(None, pages=((FakePage, FakeLocators),))
+
+    assert [result["status"] for result in report["results"]].count("missing") == 1
+
+
+def test_browser_arguments_default_to_config():
+    config = Config({"BROWSER": "firefox", "HEADLESS": True})
+    parser = argparse.ArgumentParser()
+    add_browser_arguments(parser, config)
+
+    settings = browser_config(parser.parse_args([]), config)
+    assert (settings.BROWSER, settings.HEADLESS) == ("firefox", True)
+
+    settings = browser_config(parser.parse_args(["--browser", "chrome", "--device", "iphone17"]), config)
+    assert (settings.BROWSER, settings.DEVICE_TYPE) == ("chrome", "iphone17")
@@ -2,6 +2,7 @@ import pytest
 from pytest_bdd import given, scenarios, when, then, parsers  # type: ignore
 
 from pages.order_page import OrderPage
+from utils.checkpoints import checkpoint
 
 
 scenarios("../features/order_page.feature")
@@ -17,6 +18,7 @@ def order_context():
 
 # Scenario: Open Food Ordering company page @successful_order_page_load @order_page
 @given("I open the Food Ordering company page")
+@checkpoint(OrderPage)
 def open_food_ordering_page(browser):
     page = OrderPage(browser)
     page.open()
@@ -31,17 +33,18 @@ def verify_order_page_loaded(browser):
 
 @then("the page should display the company's food ordering options and relevant information")
 def verify_order_page_content(browser):
-    page = OrderPage(browser)
-    assert page.get_restaurant_name().strip(), "Restaurant name heading is empty."
-    assert page.is_delivery_prompt_visible(), "Delivery prompt card is not visible."
-    assert page.is_menu_navigation_visible(), "Menu navigation is not visible."
-    assert page.get_branch_address_text().strip(), "Branch address text is empty."
+    content = OrderPage(browser).get_page_content()
+    assert content["restaurant_name"].strip(), "Restaurant name heading is empty."
+    assert content["delivery_prompt_visible"], "Delivery prompt card is not visible."
+    assert content["menu_navigation_visible"], "Menu navigation is not visible."
+    assert content["branch_address"].strip(), "Branch address text is empty."
 
 
 
 
 # Scenario: Select delivery option from Delivery/Takeout switcher @successful_delivery_selection @order_page
 @given("I have opened the Food Ordering page")
+@checkpoint(OrderPage)
 def have_opened_food_ordering_page(browser):
     page = OrderPage(browser)
     page.open()
@@ -70,12 +73,6 @@ def select_delivery_service_type(browser, option: str):
 def verify_delivery_prompt_visible(browser):
     page = OrderPage(browser)
     assert page.is_delivery_prompt_message_visible(), "Delivery prompt message is visible after selecting Delivery."
-    
-    
-@when(parsers.parse('I select "{option}"'))
-def select_delivery_service_type(browser, option: str):
-    page = OrderPage(browser)
-    page.select_service_type(option)
 
 
 @then("the delivery prompt message should not be visible")
@@ -89,6 +86,7 @@ def verify_delivery_prompt_not_visible(browser):
 
 # Scenario: Input postal code and confirm delivery address @successful_postal_code_confirmation @order_page
 @given(parsers.parse('I have selected "{option}" option'))
+@checkpoint(OrderPage, validate=lambda page, option: page.is_service_type_selected(option))
 def have_selected_service_option(browser, option: str):
     page = OrderPage(browser)
     page.open()
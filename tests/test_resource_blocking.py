@@ -0,0 +1,238 @@
+import json
+import queue
+import threading
+import time
+
+import pytest
+import trio
+from trio_websocket import serve_websocket
+
+from config.resource_profiles import ResourceProfile, guess_resource_type
+from utils.resource_blocking import (
+    BidiRequestInterceptor,
+    CdpRequestInterceptor,
+    ResourceBlockingStats,
+    ResourceSizes,
+    bidi_resource_type,
+    load_sizes,
+    save_sizes,
+)
+
+PROFILE = ResourceProfile(
+    name="test",
+    block_types=("image",),
+    block_patterns=("*tracker.io*",),
+    allow_patterns=("*/logo.png",),
+)
+
+# (request id, url, destination, initiator type) sent by the fake Firefox
+REQUESTS = (
+    ("1", "https://shop.test/banner.png", "image", None),
+    ("2", "https://shop.test/logo.png", "image", None),
+    ("3", "https://tracker.io/t.js", "script", None),
+    ("4", "https://shop.test/api/menu", "", "fetch"),
+)
+
+
+def test_profile_matches_type_pattern_and_allow_list():
+    assert PROFILE.blocks("https://shop.test/banner", "image")
+    assert PROFILE.blocks("https://tracker.io/t.js", "script")
+    assert not PROFILE.blocks("https://shop.test/logo.png", "image")
+    assert not PROFILE.blocks("https://shop.test/app.js", "script")
+
+
+@pytest.mark.parametrize("request_data, expected", [
+    ({"url": "https://a.test/x", "destination": "video"}, "media"),
+    ({"url": "https://a.test/x", "destination": "style"}, "stylesheet"),
+    ({"url": "https://a.test/x", "destination": "", "initiatorType": "xmlhttprequest"}, "xhr"),
+    ({"url": "https://a.test/x.woff2?v=1"}, "font"),
+    ({"url": "https://a.test/x"}, "other"),
+])
+def test_bidi_resource_type(request_data, expected):
+    assert bidi_resource_type(request_data) == expected
+
+
+def test_guess_resource_type_ignores_the_query():
+    assert guess_resource_type("https://a.test/photo.JPG?w=200") == "image"
+    assert guess_resource_type("https://a.test/photo?format=png") == "other"
+
+
+def test_blocked_bytes_come_from_the_recorded_sizes():
+    stats = ResourceBlockingStats(ResourceSizes({"https://a.test/x.png?v=1": 1000}))
+    blocked = [
+        {"url": "https://a.test/x.png?v=2", "type": "image"},
+        {"url": "https://a.test/y.png", "type": "image"},
+    ]
+    stats.record("test_a", PROFILE, "chromium", blocked, [{"seconds": 0.5}])
+
+    summary = stats.summary()
+    assert (summary["blocked"], summary["bytes_saved"], summary["unsized"]) == (2, 1000, 1)
+    assert summary["sizes"] == {}
+
+
+def test_baseline_sizes_are_saved_for_later_runs(tmp_path):
+    path = str(tmp_path / "sizes.json")
+    save_sizes(path, [{"sizes": {"https://a.test/x.png": 10}}])
+    stats = ResourceBlockingStats(load_sizes(path), baseline=True)
+    stats.record("test_a", PROFILE, "playwright", [
+        {"url": "https://a.test/y.png", "type": "image", "bytes": 20},
+        {"url": "https://a.test/z.png", "type": "image"},
+    ], [])
+
+    save_sizes(path, [stats.summary()])
+
+    assert stats.summary()["bytes_saved"] == 20
+    assert load_sizes(path).sizes == {"https://a.test/x.png": 10, "https://a.test/y.png": 20}
+
+
+class FakeFirefox:
+    """
+    WebDriver BiDi endpoint that pauses REQUESTS once an intercept is added
+    """
+
+    def __init__(self, baseline_bytes=None):
+        self.baseline_bytes = baseline_bytes
+        self.decisions = {}
+        self.done = threading.Event()
+        ports = queue.Queue()
+        threading.Thread(target=trio.run, args=(self._serve, ports), daemon=True).start()
+        self.url = f"ws://127.0.0.1:{ports.get(timeout=5)}/session/1"
+
+    async def _serve(self, ports):
+        async with trio.open_nursery() as nursery:
+            server = await nursery.start(serve_websocket, self._handle, "127.0.0.1", 0, None)
+            ports.put(server.port)
+
+    async def _handle(self, websocket_request):
+        socket = await websocket_request.accept()
+        while True:
+            message = json.loads(await socket.get_message())
+            result = {"intercept": "intercept-1"} if message["method"] == "network.addIntercept" else {}
+            await socket.send_message(json.dumps({"type": "success", "id": message["id"], "result": result}))
+            if message["method"] == "network.addIntercept":
+                for request_id, url, destination, initiator_type in REQUESTS:
+                    request = {"request": request_id, "url": url, "destination": destination,
+                               "initiatorType": initiator_type}
+                    await socket.send_message(json.dumps({
+                        "type": "event",
+                        "method": "network.beforeRequestSent",
+                        "params": {"isBlocked": True, "request": request},
+                    }))
+            elif message["method"] in ("network.failRequest", "network.continueRequest"):
+                request_id = message["params"]["request"]
+                self.decisions[request_id] = message["method"]
+                if self.baseline_bytes and message["method"] == "network.continueRequest":
+                    await socket.send_message(json.dumps({
+                        "type": "event",
+                        "method": "network.responseCompleted",
+                        "params": {"request": {"request": request_id}, "response": {"bytesReceived": self.baseline_bytes}},
+                    }))
+                if len(self.decisions) == len(REQUESTS):
+                    self.done.set()
+
+
+class FakeChromium(FakeFirefox):
+    """
+    CDP endpoint that pauses the requests of REQUESTS matching the Fetch.enable patterns
+    """
+
+    def __init__(self):
+        self.patterns = None
+        super().__init__()
+
+    async def _handle(self, websocket_request):
+        socket = await websocket_request.accept()
+        while True:
+            message = json.loads(await socket.get_message())
+            method, session = message["method"], message.get("sessionId")
+            result = {}
+            if method == "Target.getTargets":
+                result = {"targetInfos": [{
+                    "targetId": "page-1", "type": "page", "title": "", "url": "about:blank",
+                    "attached": True, "canAccessOpener": False,
+                }]}
+            elif method == "Target.attachToTarget":
+                result = {"sessionId": "session-1"}
+            reply = {"id": message["id"], "result": result}
+            if session:
+                reply["sessionId"] = session
+            await socket.send_message(json.dumps(reply))
+            if method == "Fetch.enable":
+                self.patterns = message["params"]["patterns"]
+                for request_id, url, destination, _ in REQUESTS[:3]:
+                    await socket.send_message(json.dumps({"sessionId": session, "method": "Fetch.requestPaused", "params": {
+                        "requestId": request_id,
+                        "request": {"url": url, "method": "GET", "headers": {}, "initialPriority": "Low",
+                                    "referrerPolicy": "no-referrer"},
+                        "frameId": "frame-1",
+                        "resourceType": "Image" if destination == "image" else "Script",
+                        "networkId": f"network-{request_id}",
+                    }}))
+            elif method in ("Fetch.failRequest", "Fetch.continueRequest"):
+                self.decisions[message["params"]["requestId"]] = method
+                if len(self.decisions) == 3:
+                    self.done.set()
+
+
+class FakeDriver:
+
+    def __init__(self, url):
+        self.caps = {"webSocketUrl": url, "se:cdp": url, "se:cdpVersion": "122.0.6261.57"}
+
+
+def test_cdp_interceptor_pauses_by_resource_type_and_honours_the_allow_list():
+    chromium = FakeChromium()
+    interceptor = CdpRequestInterceptor(FakeDriver(chromium.url))
+    interceptor.start()
+
+    interceptor.apply(PROFILE)
+
+    assert chromium.done.wait(5)
+    assert chromium.patterns == [
+        {"urlPattern": "*", "resourceType": "Image"},
+        {"urlPattern": "*tracker.io*"},
+    ]
+    assert chromium.decisions == {
+        "1": "Fetch.failRequest",
+        "2": "Fetch.continueRequest",
+        "3": "Fetch.failRequest",
+    }
+    assert [request["type"] for request in interceptor.collect()] == ["image", "script"]
+
+
+def test_bidi_interceptor_blocks_by_destination_and_allow_list():
+    firefox = FakeFirefox()
+    interceptor = BidiRequestInterceptor(FakeDriver(firefox.url))
+    interceptor.start()
+
+    interceptor.apply(PROFILE)
+
+    assert firefox.done.wait(5)
+    assert firefox.decisions == {
+        "1": "network.failRequest",
+        "2": "network.continueRequest",
+        "3": "network.failRequest",
+        "4": "network.continueRequest",
+    }
+    assert interceptor.collect() == [
+        {"url": "https://shop.test/banner.png", "type": "image"},
+        {"url": "https://tracker.io/t.js", "type": "script"},
+    ]
+
+
+def test_bidi_interceptor_baseline_loads_and_sizes_matched_requests():
+    firefox = FakeFirefox(baseline_bytes=512)
+    interceptor = BidiRequestInterceptor(FakeDriver(firefox.url))
+    interceptor.start()
+
+    interceptor.apply(PROFILE, baseline=True)
+
+    assert firefox.done.wait(5)
+    assert set(firefox.decisions.values()) == {"network.continueRequest"}
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and len(interceptor._loading):
+        time.sleep(0.01)
+    assert [(request["url"], request.get("bytes")) for request in interceptor.collect()] == [
+        ("https://shop.test/banner.png", 512),
+        ("https://tracker.io/t.js", 512),
+    ]
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from utils import wait_timeouts
+from utils.wait_timeouts import MIN_SAMPLES, WaitTimeouts, cap_timeout, p99, save_history
+
+WAIT = "wait_for_element_clickable(id: submit)"
+
+
+def make_timeouts(tmp_path, samples=(), mode="on", budget=0):
+    path = tmp_path / "latencies.json"
+    path.write_text(json.dumps({"latencies": {f"chrome|desktop|{WAIT}": list(samples)}}))
+    return WaitTimeouts(str(path), "chrome", "desktop", mode=mode, multiplier=3, floor=1, ceiling=20, budget=budget)
+
+
+@pytest.fixture(autouse=True)
+def no_active_policy(monkeypatch):
+    # activate() sets the module-level policy; restored after each test
+    monkeypatch.setattr(wait_timeouts, "active", None)
+
+
+def test_p99_is_nearest_rank():
+    assert p99(range(1, 101)) == 99
+    assert p99([0.5]) == 0.5
+
+
+def test_timeout_is_adapted_from_the_p99_latency(tmp_path):
+    timeouts = make_timeouts(tmp_path, [0.5] * MIN_SAMPLES)
+    assert timeouts.timeout_for(WAIT, 10) == 1.5
+
+
+def test_timeout_is_kept_without_enough_samples(tmp_path):
+    timeouts = make_timeouts(tmp_path, [0.5] * (MIN_SAMPLES - 1))
+    assert timeouts.timeout_for(WAIT, 10) == 10
+
+
+@pytest.mark.parametrize("latency, expected", [(0.01, 1), (60, 20)])
+def test_adapted_timeout_stays_within_floor_and_ceiling(tmp_path, latency, expected):
+    timeouts = make_timeouts(tmp_path, [latency] * MIN_SAMPLES)
+    assert timeouts.timeout_for(WAIT, 10) == expected
+
+
+def test_learn_mode_records_without_adapting(tmp_path):
+    timeouts = make_timeouts(tmp_path, [0.5] * MIN_SAMPLES, mode="learn")
+    assert timeouts.begin(WAIT, 10) == 10
+    timeouts.end(WAIT, 0.25, succeeded=True)
+    assert timeouts.summary()["samples"] == {f"chrome|desktop|{WAIT}": [0.25]}
+
+
+def test_only_the_outermost_successful_wait_is_recorded(tmp_path):
+    timeouts = make_timeouts(tmp_path, mode="learn")
+    timeouts.begin(WAIT, 10)
+    timeouts.begin("find_element(id: submit)", 10)
+    timeouts.end("find_element(id: submit)", 0.1, succeeded=True)
+    timeouts.end(WAIT, 0.2, succeeded=False)
+    assert timeouts.summary()["samples"] == {}
+
+
+def test_nested_wait_is_clamped_to_the_enclosing_deadline(tmp_path):
+    timeouts = make_timeouts(tmp_path, [0.5] * MIN_SAMPLES)
+    timeouts.activate()
+
+    assert timeouts.begin(WAIT, 10) == 1.5
+    assert timeouts.begin("find_element(id: submit)", 10) <= 1.5
+    assert cap_timeout(10) <= 1.5
+    timeouts.end("find_element(id: submit)", 0.1, succeeded=True)
+    timeouts.end(WAIT, 0.1, succeeded=True)
+
+    assert timeouts.remaining() is None
+    assert cap_timeout(10) == 10
+
+
+def test_cap_timeout_is_a_no_op_without_a_policy():
+    assert cap_timeout(10) == 10
+
+
+def test_spent_scenario_budget_fails_the_next_wait(tmp_path):
+    timeouts = make_timeouts(tmp_path, budget=0.01)
+    timeouts.start_scenario("test_order")
+    timeouts._context().deadline -= 1
+
+    with pytest.raises(TimeoutException):
+        timeouts.begin(WAIT, 10)
+    assert timeouts.summary()["out_of_budget"] == ["test_order"]
+
+
+def test_save_history_appends_the_samples_of_every_worker(tmp_path):
+    path = tmp_path / "latencies.json"
+    path.write_text(json.dumps({"latencies": {WAIT: [1.0]}}))
+
+    save_history(str(path), [{"samples": {WAIT: [2.0]}}, {"samples": {}}, {"samples": {WAIT: [3.0]}}])
+
+    assert json.loads(path.read_text())["latencies"] == {WAIT: [1.0, 2.0, 3.0]}
@@ -1,13 +1,6 @@
 from config.config import Config
 
 
-########## URL Path Settings ##########
-config = Config()
-BASE_URL = config.BASE_URL
-###############################
-
-
-
 ########## Path Settings ##########
 ADDRESS_AND_DATE_PICKER_FRAGMENT = "#address-and-date-picker"
 ###############################
@@ -15,5 +8,12 @@ ADDRESS_AND_DATE_PICKER_FRAGMENT = "#address-and-date-picker"
 
 
 ########## URL Settings ##########
-ADDRESS_AND_DATE_PICKER_URL = f"{BASE_URL}{ADDRESS_AND_DATE_PICKER_FRAGMENT}"
-###############################
\ No newline at end of file
+# BASE_URL and the URLs built on it are read from the session's config on access,
+# the --env option is only known once pytest is configured
+def __getattr__(name):
+    if name == "BASE_URL":
+        return Config.current().BASE_URL
+    if name == "ADDRESS_AND_DATE_PICKER_URL":
+        return f"{Config.current().BASE_URL}{ADDRESS_AND_DATE_PICKER_FRAGMENT}"
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+###############################
@@ -0,0 +1,193 @@
+"""
+Failure artifacts (--failure-artifacts).
+
+When a test fails, the browser state is captured on the test thread (screenshot, DOM,
+console log, the most recent network requests from the Resource Timing API); decoding,
+compression and writing run on a background thread pool so the test teardown does not
+wait for disk I/O:
+
+    SCREENSHOT_PATH/<run>/<worker>/<scenario>-<n>/
+        screenshot.png      re-deflated at the highest zlib level
+        dom.html.gz
+        console.json.gz
+        network.json.gz
+
+<run> is shared by the xdist workers of one run and <n> counts the failures of the worker,
+so neither parallel workers nor reruns overwrite each other. Every worker may write its
+share of ARTIFACT_BUDGET_MB; artifacts past the budget are skipped (the screenshot is
+written first) and counted in the terminal summary.
+"""
+import base64
+import gzip
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from pages.base_actions.driver_state import get_driver_state
+from pages.base_actions.scripts import RECENT_NETWORK_JS, page_function
+
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_KINDS = ("screenshot", "dom", "console", "network")
+# Resource Timing entries kept in network.json
+NETWORK_ENTRIES = 100
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def run_id() -> str:
+    """
+    Id shared by the xdist workers of one run (the controller's testrunuid), else a timestamp
+    """
+    return os.getenv("PYTEST_XDIST_TESTRUNUID", "")[:12] or time.strftime("%Y%m%d-%H%M%S")
+
+
+def recompress_png(data: bytes) -> bytes:
+    """
+    Re-deflate the image data of a PNG at zlib level 9 (browsers encode screenshots for speed).
+    Lossless; the input is returned unchanged if it is not a PNG or does not get smaller.
+    """
+    if not data.startswith(_PNG_SIGNATURE):
+        return data
+    chunks, image_data, offset = [], [], len(_PNG_SIGNATURE)
+    while offset < len(data):
+        length, chunk_type = struct.unpack(">I4s", data[offset:offset + 8])
+        body = data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+        if chunk_type == b"IDAT":
+            if not image_data:
+                chunks.append(None)  # position of the merged IDAT chunk
+            image_data.append(body)
+        else:
+            chunks.append((chunk_type, body))
+    compressed = zlib.compress(zlib.decompress(b"".join(image_data)), 9)
+    output = [_PNG_SIGNATURE]
+    for chunk in chunks:
+        chunk_type, body = chunk or (b"IDAT", compressed)
+        output.append(struct.pack(">I4s", len(body), chunk_type) + body
+                      + struct.pack(">I", zlib.crc32(chunk_type + body)))
+    result = b"".join(output)
+    return result if len(result) < len(data) else data
+
+
+def attach_console_listener(page):
+    """
+    Keep the recent console messages of a Playwright page (Selenium reads the browser log instead)
+    """
+    messages = get_driver_state(page).console_messages
+    page.on("console", lambda message: messages.append({
+        "level": message.type,
+        "message": message.text,
+        "timestamp": round(time.time() * 1000),
+    }))
+
+
+def capture(driver, kinds) -> dict:
+    """
+    Read the raw artifacts from a Selenium driver or Playwright page (on the test thread)
+
+    Returns:
+        dict: {kind: raw data}, kinds that could not be read are left out
+    """
+    is_playwright = type(driver).__module__.startswith("playwright.")
+    readers = {
+        "screenshot": lambda: driver.screenshot() if is_playwright else driver.get_screenshot_as_base64(),
+        "dom": lambda: driver.content() if is_playwright else driver.page_source,
+        "console": lambda: list(get_driver_state(driver).console_messages) if is_playwright
+                           else driver.get_log("browser"),
+        "network": lambda: driver.evaluate(page_function(RECENT_NETWORK_JS), [NETWORK_ENTRIES]) if is_playwright
+                           else driver.execute_script(RECENT_NETWORK_JS, NETWORK_ENTRIES),
+    }
+    raw = {}
+    for kind in kinds:
+        try:
+            raw[kind] = readers[kind]()
+        except Exception as exc:  # a broken session must not hide the test failure
+            logger.debug("Could not capture %s: %s", kind, exc)
+    return raw
+
+
+def _encode(kind: str, data):
+    """
+    Returns:
+        tuple: (file name, bytes)
+    """
+    if kind == "screenshot":
+        png = base64.b64decode(data) if isinstance(data, str) else data
+        return "screenshot.png", recompress_png(png)
+    if kind == "dom":
+        return "dom.html.gz", gzip.compress(data.encode("utf-8"))
+    return f"{kind}.json.gz", gzip.compress(json.dumps(data, indent=1, default=str).encode("utf-8"))
+
+
+class ArtifactWriter:
+    """
+    Background writer for the failure artifacts of one pytest process
+    """
+
+    def __init__(self, directory: str, worker: str, budget_bytes: int, threads: int = 2):
+        self.directory = os.path.join(directory, run_id(), worker)
+        self.budget_bytes = budget_bytes
+        self.written_bytes = 0
+        self.files = 0
+        self.skipped = 0
+        self.failures = []
+        self._count = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="artifacts")
+
+    def submit(self, name: str, raw: dict) -> str:
+        """
+        Queue the encoding and writing of the artifacts of one failed test
+
+        Returns:
+            str: Directory the artifacts are written to
+        """
+        clean_name = "".join(c if c.isalnum() else "_" for c in name)
+        with self._lock:
+            self._count += 1
+            path = os.path.join(self.directory, f"{clean_name}-{self._count}")
+            self.failures.append({"test": name, "path": path})
+        # screenshot first, it is the artifact most worth its bytes
+        for kind in (kind for kind in ARTIFACT_KINDS if kind in raw):
+            self._pool.submit(self._write, path, kind, raw[kind])
+        return path
+
+    def _write(self, path: str, kind: str, data):
+        try:
+            file_name, payload = _encode(kind, data)
+            with self._lock:
+                if self.budget_bytes and self.written_bytes + len(payload) > self.budget_bytes:
+                    self.skipped += 1
+                    return
+                self.written_bytes += len(payload)
+                self.files += 1
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, file_name), "wb") as artifact:
+                artifact.write(payload)
+        except Exception:
+            logger.exception("Could not write the %s artifact to %s", kind, path)
+
+    def close(self):
+        """
+        Wait for the queued artifacts (once, at the end of the session)
+        """
+        self._pool.shutdown(wait=True)
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: JSON-serializable artifact counts and the directory of every failed test
+        """
+        return {
+            "failures": self.failures,
+            "files": self.files,
+            "bytes": self.written_bytes,
+            "skipped": self.skipped,
+        }
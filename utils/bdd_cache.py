@@ -0,0 +1,210 @@
+"""
+Parsed-feature cache and step index for pytest-bdd.
+
+FeatureCache
+    Keeps the parsed Feature objects in BDD_CACHE_FILE keyed by path, mtime and size,
+    and fills pytest-bdd's own per-process feature cache (pytest_bdd.feature.features)
+    with them before the test modules call scenarios(), so unchanged .feature files are
+    not parsed again.
+
+StepIndex (--bdd-dry-run)
+    Built once from the step definitions pytest has collected: plain string steps are
+    looked up by their exact text, only parse/re steps are matched one by one. Every step
+    of every feature in FEATURES_DIR is resolved the way pytest-bdd resolves it at run
+    time, without a browser:
+
+        missing     no step definition matches
+        ambiguous   several definitions on the same level (module or conftest) match;
+                    pytest-bdd would silently use one of them
+
+    Scenarios of features that no test module binds with scenarios() are resolved against
+    the conftest steps and reported separately.
+"""
+import logging
+import os
+import pickle
+import time
+
+from pytest_bdd import feature as bdd_feature
+from pytest_bdd import parsers
+from pytest_bdd.feature import get_features
+
+
+logger = logging.getLogger(__name__)
+
+
+class FeatureCache:
+    """
+    mtime-keyed on-disk cache of parsed feature files
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        try:
+            with open(path, "rb") as cache:
+                self.entries = pickle.load(cache)
+        except FileNotFoundError:
+            pass
+        except Exception as exc:  # stale format or pytest-bdd upgrade: parse again
+            logger.warning("Ignoring unreadable feature cache %s: %s", path, exc)
+
+    @staticmethod
+    def _stamp(filename: str):
+        stat = os.stat(filename)
+        return stat.st_mtime_ns, stat.st_size
+
+    def prime(self):
+        """
+        Hand the parsed features of unchanged files to pytest-bdd
+        """
+        for filename, (stamp, parsed) in self.entries.items():
+            try:
+                current = self._stamp(filename)
+            except OSError:
+                continue
+            if current == stamp and filename not in bdd_feature.features:
+                bdd_feature.features[filename] = parsed
+                self.hits += 1
+
+    def save(self):
+        """
+        Store the features pytest-bdd has parsed in this process (atomically, workers may race)
+        """
+        entries = {}
+        for filename, parsed in bdd_feature.features.items():
+            try:
+                entries[filename] = (self._stamp(filename), parsed)
+            except OSError:
+                continue
+        stamps = {filename: stamp for filename, (stamp, _) in entries.items()}
+        if not entries or stamps == {filename: stamp for filename, (stamp, _) in self.entries.items()}:
+            return
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "wb") as cache:
+                pickle.dump(entries, cache, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.path)
+        except (OSError, pickle.PicklingError) as exc:
+            logger.warning("Could not write the feature cache %s: %s", self.path, exc)
+
+
+def _describe(fixturedef) -> str:
+    step_func = fixturedef.func._pytest_bdd_step_context.step_func
+    code = step_func.__code__
+    return f"{step_func.__name__} ({os.path.relpath(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StepIndex:
+    """
+    Step text -> step definition lookup over the collected step fixtures
+    """
+
+    def __init__(self, fixturemanager):
+        self.fixturemanager = fixturemanager
+        self.exact = {}
+        self.patterns = {}
+        for fixturename, fixturedefs in list(fixturemanager._arg2fixturedefs.items()):
+            for fixturedef in fixturedefs:
+                context = getattr(fixturedef.func, "_pytest_bdd_step_context", None)
+                if context is None:
+                    continue
+                entry = (context, fixturename, fixturedef)
+                if isinstance(context.parser, parsers.string):
+                    self.exact.setdefault((context.type, context.parser.name), []).append(entry)
+                else:
+                    self.patterns.setdefault(context.type, []).append(entry)
+        self._resolved = {}
+
+    def resolve(self, step_type: str, text: str, nodeid: str) -> tuple:
+        """
+        Step definitions a step resolves to from a test (nodeid, "" for the conftest level)
+
+        Returns:
+            tuple: ('ok' | 'missing' | 'ambiguous', [matching definitions, closest level first])
+        """
+        key = (step_type, text, nodeid)
+        if key not in self._resolved:
+            # `None` type: definitions registered with @step for any type
+            candidates = (
+                self.exact.get((step_type, text), []) + self.exact.get((None, text), [])
+                + [entry for entry in self.patterns.get(step_type, []) + self.patterns.get(None, [])
+                   if entry[0].parser.is_matching(text)]
+            )
+            visible = [
+                fixturedef for _, fixturename, fixturedef in candidates
+                if fixturedef in (self.fixturemanager.getfixturedefs(fixturename, nodeid) or ())
+            ]
+            # A closer level (test module over conftest) overrides, only one per level may match
+            visible.sort(key=lambda fixturedef: -len(fixturedef.baseid))
+            closest = [fixturedef for fixturedef in visible if fixturedef.baseid == visible[0].baseid]
+            status = "missing" if not visible else "ambiguous" if len(closest) > 1 else "ok"
+            self._resolved[key] = (status, visible)
+        return self._resolved[key]
+
+
+def _scenarios(template, examples=None):
+    """
+    Rendered scenarios of a template (one per example row for outlines)
+    """
+    if examples is not None:
+        return [template.render(examples)]
+    if template.templated:
+        return [template.render(context) for context in template.examples.as_contexts()]
+    return [template.render({})]
+
+
+def dry_run(index: StepIndex, items, features_dir: str) -> dict:
+    """
+    Resolve every step of the collected scenarios and of the features nobody binds
+
+    Returns:
+        dict: {'problems': [...], 'unbound': [...], 'steps': int, 'scenarios': int, 'seconds': float}
+    """
+    start = time.perf_counter()
+    checked, problems, unbound = set(), [], []
+    steps = 0
+
+    def check(scenario, nodeid, into):
+        nonlocal steps
+        for step in scenario.steps:
+            steps += 1
+            status, definitions = index.resolve(step.type, step.name, nodeid)
+            if status != "ok":
+                into.append({
+                    "status": status,
+                    "location": f"{scenario.feature.rel_filename}:{step.line_number}",
+                    "scenario": scenario.name,
+                    "step": f"{step.keyword} {step.name}".splitlines()[0],
+                    "definitions": [_describe(fixturedef) for fixturedef in definitions],
+                })
+
+    for item in items:
+        template = getattr(getattr(item, "function", None), "__scenario__", None)
+        if template is None:
+            continue
+        callspec = getattr(item, "callspec", None)
+        examples = callspec.params.get("_pytest_bdd_example") if callspec else None
+        key = (template.feature.filename, template.name, repr(examples))
+        if key in checked:
+            continue  # the same scenario parametrized by other fixtures (device matrix)
+        checked.add(key)
+        for scenario in _scenarios(template, examples):
+            check(scenario, item.nodeid, problems)
+
+    bound = {(filename, name) for filename, name, _ in checked}
+    for parsed in get_features([features_dir]):
+        for template in parsed.scenarios.values():
+            if (parsed.filename, template.name) not in bound:
+                checked.add((parsed.filename, template.name, None))
+                for scenario in _scenarios(template):
+                    check(scenario, "", unbound)
+
+    return {
+        "problems": problems,
+        "unbound": unbound,
+        "steps": steps,
+        "scenarios": len(checked),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
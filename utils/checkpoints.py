@@ -0,0 +1,187 @@
+"""
+Given-step checkpoints: restore the browser state left by a sequence of Given steps
+instead of replaying the UI steps in every scenario (enabled with --checkpoints).
+
+A checkpoint is keyed by the texts of the Given steps run so far in the scenario, plus the
+environment, browser, device and engine. The first scenario that reaches a key runs the
+step and snapshots URL, cookies and web storage; later scenarios restore the snapshot and
+validate it. A failed restore or validation rolls back to the state of the earlier Given
+steps (or clears it for the first one) and replays the step.
+
+Only browser state is checkpointed: steps that also fill scenario fixtures (other than
+their target_fixture return value) or rely on in-memory page state must not be decorated.
+"""
+import functools
+import inspect
+import logging
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from config.config import Config
+from pages.base_actions.base_action import BaseAction
+
+
+logger = logging.getLogger(__name__)
+
+GIVEN_STEPS = pytest.StashKey[list]()
+CHECKPOINT_STORE = pytest.StashKey["CheckpointStore"]()
+
+
+class CheckpointStore:
+    """
+    In-memory checkpoints of one pytest process, with restore statistics
+    """
+
+    def __init__(self):
+        self._checkpoints = {}
+        self._lock = threading.Lock()
+        self.records = {}
+
+    def get(self, key):
+        with self._lock:
+            return self._checkpoints.get(key)
+
+    def put(self, key, snapshot, result, seconds: float):
+        with self._lock:
+            self._checkpoints[key] = (snapshot, result)
+            self._record(key)["replay_seconds"] = round(seconds, 3)
+
+    def discard(self, key):
+        with self._lock:
+            self._checkpoints.pop(key, None)
+            self._record(key)["failures"] += 1
+
+    def record_restore(self, key, seconds: float):
+        with self._lock:
+            self._record(key)["restores"].append(round(seconds, 3))
+
+    def _record(self, key):
+        return self.records.setdefault(
+            key, {"steps": list(key[1]), "replay_seconds": 0.0, "restores": [], "failures": 0}
+        )
+
+    def summary(self) -> dict:
+        """
+        Restore vs replay time per checkpoint for the run report
+
+        Returns:
+            dict: JSON-serializable checkpoint summary
+        """
+        checkpoints = []
+        saved = 0.0
+        for record in self.records.values():
+            restores = record["restores"]
+            saved += len(restores) * record["replay_seconds"] - sum(restores)
+            checkpoints.append({
+                "steps": record["steps"],
+                "replay_seconds": record["replay_seconds"],
+                "restores": len(restores),
+                "avg_restore_seconds": round(sum(restores) / len(restores), 3) if restores else 0.0,
+                "failures": record["failures"],
+            })
+        return {"checkpoints": checkpoints, "estimated_saved_seconds": round(saved, 3)}
+
+
+def get_checkpoint_store(config) -> CheckpointStore:
+    if CHECKPOINT_STORE not in config.stash:
+        config.stash[CHECKPOINT_STORE] = CheckpointStore()
+    return config.stash[CHECKPOINT_STORE]
+
+
+def record_step(request, step):
+    """
+    Track the Given steps of the running scenario (call from pytest_bdd_before_step)
+    """
+    steps = request.node.stash.setdefault(GIVEN_STEPS, [])
+    if step.type == "given":
+        steps.append(step.name)
+
+
+def checkpoint_key(request) -> tuple:
+    settings = Config.current()
+    environment = (settings.ENV, settings.BROWSER, settings.DEVICE_TYPE, settings.ENGINE)
+    callspec = getattr(request.node, "callspec", None)
+    matrix_device = callspec.params.get("matrix_device") if callspec else None
+    return environment + (matrix_device,), tuple(request.node.stash.get(GIVEN_STEPS, []))
+
+
+def checkpoint(page_class=BaseAction, validate=None):
+    """
+    Decorator for a Given step function whose browser state can be restored from a checkpoint.
+
+    Args:
+        page_class: Page object used to restore the snapshot; its READY_LOCATORS must be
+                    visible after the restore
+        validate: Optional callable (page, **step_args) returning True if the restored
+                  state is what the step would have produced
+
+    Usage:
+        @given("I have opened the Food Ordering page")
+        @checkpoint(OrderPage)
+        def have_opened_food_ordering_page(browser):
+            ...
+    """
+    def decorator(step_func):
+        if inspect.isgeneratorfunction(step_func):
+            raise TypeError(f"Checkpointed steps cannot be generators: {step_func.__name__}")
+
+        signature = inspect.signature(step_func)
+        # pytest-bdd passes the arguments named in the signature; make sure we get the request
+        needs_request = "request" not in signature.parameters
+        parameters = list(signature.parameters.values())
+        if needs_request:
+            # pytest-bdd only resolves positional-or-keyword arguments without a default
+            position = next(
+                (index for index, parameter in enumerate(parameters)
+                 if parameter.kind != parameter.POSITIONAL_OR_KEYWORD or parameter.default is not parameter.empty),
+                len(parameters),
+            )
+            parameters.insert(position, inspect.Parameter("request", inspect.Parameter.POSITIONAL_OR_KEYWORD))
+
+        @functools.wraps(step_func)
+        def wrapper(**kwargs):
+            request = kwargs.pop("request") if needs_request else kwargs["request"]
+            if not Config.current().CHECKPOINTS:
+                return step_func(**kwargs)
+
+            store = get_checkpoint_store(request.config)
+            key = checkpoint_key(request)
+            page = page_class(request.getfixturevalue("browser"))
+            step_args = {name: value for name, value in kwargs.items() if name not in ("browser", "request")}
+
+            stored = store.get(key)
+            if stored is not None:
+                snapshot, result = stored
+                start = time.perf_counter()
+                # State of the earlier Given steps, to replay this step on if the restore fails
+                previous = page.capture_checkpoint() if len(key[1]) > 1 else None
+                try:
+                    page.restore_checkpoint(snapshot)
+                    if page.READY_LOCATORS:
+                        page.wait_for_page_ready()
+                    if validate and not validate(page, **step_args):
+                        raise WebDriverException("Checkpoint validation returned False")
+                    seconds = time.perf_counter() - start
+                    store.record_restore(key, seconds)
+                    logger.info("Restored checkpoint in %.3fs: %s", seconds, " > ".join(key[1]))
+                    return result
+                except WebDriverException as exc:
+                    logger.warning("Checkpoint restore failed, replaying steps: %s", exc.msg)
+                    store.discard(key)
+                    if previous:
+                        page.restore_checkpoint(previous)
+                    else:
+                        page.clear_browser_state()
+
+            start = time.perf_counter()
+            result = step_func(**kwargs)
+            store.put(key, page.capture_checkpoint(), result, time.perf_counter() - start)
+            return result
+
+        wrapper.__signature__ = signature.replace(parameters=parameters)
+        return wrapper
+
+    return decorator
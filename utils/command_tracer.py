@@ -0,0 +1,148 @@
+"""
+WebDriver command tracer (--command-trace).
+
+Every WebDriver command is an HTTP round-trip to chromedriver/geckodriver, including
+element.text, get_attribute, is_displayed and find_element. The tracer wraps the driver's
+command executor and records each command with its latency, the BDD step being run and
+the BaseAction method that issued it:
+
+    TRACE_DIR/commands-<worker>.jsonl   one JSON line per command
+
+Per-test counts and driver I/O time are published as the "commands" run report.
+"""
+import json
+import os
+import sys
+import time
+
+from pages.base_actions import base_action
+
+
+# Frames of this file belong to BaseAction methods
+_BASE_ACTION_FILE = base_action.__file__
+
+
+def _issuing_method() -> str:
+    """
+    Outermost BaseAction method on the calling stack, e.g. 'is_element_clickable'
+    (helpers such as wait_for called from it are counted as part of it)
+    """
+    method = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code.co_filename == _BASE_ACTION_FILE:
+            method = frame.f_code.co_name
+        frame = frame.f_back
+    return method or "(outside BaseAction)"
+
+
+def _add(totals: dict, key: str, seconds: float):
+    count, total = totals.get(key, (0, 0.0))
+    totals[key] = (count + 1, total + seconds)
+
+
+class CommandTracer:
+    """
+    Round-trip counter for the WebDriver sessions of one pytest process
+    """
+
+    def __init__(self, directory: str, worker: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"commands-{worker}.jsonl")
+        self._file = open(self.path, "w", buffering=1)
+        self.tests = []
+        self.step = None
+        self._current = None
+
+    def attach(self, driver):
+        """
+        Wrap the command executor of the driver (once; pooled drivers come back already wrapped)
+        """
+        executor = driver.command_executor
+        if getattr(executor, "command_tracer", None) is self:
+            return
+        execute = executor.execute
+
+        def traced_execute(command, params):
+            start = time.perf_counter()
+            try:
+                return execute(command, params)
+            finally:
+                self.record(command, time.perf_counter() - start)
+
+        executor.execute = traced_execute
+        executor.command_tracer = self
+
+    def begin_test(self, nodeid: str):
+        self.step = None
+        self._current = {
+            "test": nodeid,
+            "commands": 0,
+            "seconds": 0.0,
+            "by_command": {},
+            "by_step": {},
+            "by_method": {},
+        }
+
+    def end_test(self):
+        """
+        Stop counting; commands of the fixture teardown (pool reset, logs) are not attributed to the test
+        """
+        test, self._current = self._current, None
+        if test is None:
+            return
+        test["seconds"] = round(test["seconds"], 4)
+        for key in ("by_command", "by_step", "by_method"):
+            test[key] = {name: [count, round(seconds, 4)] for name, (count, seconds) in test[key].items()}
+        self.tests.append(test)
+
+    def record(self, command: str, seconds: float):
+        test = self._current
+        if test is None:
+            return
+        step = self.step or "(fixture)"
+        method = _issuing_method()
+        test["commands"] += 1
+        test["seconds"] += seconds
+        _add(test["by_command"], command, seconds)
+        _add(test["by_step"], step, seconds)
+        _add(test["by_method"], method, seconds)
+        self._file.write(json.dumps({
+            "test": test["test"],
+            "step": step,
+            "method": method,
+            "command": command,
+            "seconds": round(seconds, 5),
+        }) + "\n")
+
+    def close(self):
+        self._file.close()
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: JSON-serializable per-test command counts and driver I/O time
+        """
+        return {
+            "tests": self.tests,
+            "commands": sum(test["commands"] for test in self.tests),
+            "seconds": round(sum(test["seconds"] for test in self.tests), 3),
+            "log": self.path,
+        }
+
+
+def merge_command_counts(summaries: list, key: str, limit: int = 10) -> list:
+    """
+    Combine the `key` ("by_method", "by_step" or "by_command") counts of every test and worker
+
+    Returns:
+        list: (name, count, seconds) rows, most commands first
+    """
+    totals = {}
+    for summary in summaries:
+        for test in summary["tests"]:
+            for name, (count, seconds) in test[key].items():
+                current = totals.get(name, (0, 0.0))
+                totals[name] = (current[0] + count, current[1] + seconds)
+    rows = sorted(((name, count, seconds) for name, (count, seconds) in totals.items()), key=lambda row: -row[1])
+    return rows[:limit]
@@ -0,0 +1,67 @@
+"""
+Device matrix (--devices=all or --devices=iphone17,pixel9pro).
+
+Every test is parametrized with the devices of the matrix. Instead of launching a browser
+per device, the device is emulated in the browser the test gets:
+
+    Selenium (Chrome)   CDP Emulation.setDeviceMetricsOverride (viewport, pixel ratio,
+                        mobile), setTouchEmulationEnabled and setUserAgentOverride on the
+                        existing (possibly pooled) session
+    Playwright          the test's BrowserContext is created with the device options
+
+so one warm browser per worker runs each scenario across the whole device list.
+"""
+import threading
+import time
+
+from config.devices import BaseDevice
+
+
+# Touch points reported by emulated touch devices
+MAX_TOUCH_POINTS = 5
+
+
+def emulate_device(driver, device: BaseDevice):
+    """
+    Switch a Chrome WebDriver session to the device, using every BaseDevice field
+    """
+    touch = device.is_mobile or device.is_tablet
+    driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+        "width": device.width,
+        "height": device.height,
+        "deviceScaleFactor": device.pixel_ratio,
+        "mobile": device.is_mobile,
+        "screenWidth": device.width,
+        "screenHeight": device.height,
+    })
+    touch_params = {"enabled": touch}
+    if touch:
+        touch_params["maxTouchPoints"] = MAX_TOUCH_POINTS
+    driver.execute_cdp_cmd("Emulation.setTouchEmulationEnabled", touch_params)
+    driver.execute_cdp_cmd("Emulation.setUserAgentOverride", {"userAgent": device.user_agent})
+
+
+class DeviceMatrixStats:
+    """
+    Device switch times of one pytest process
+    """
+
+    def __init__(self):
+        self.switches = {}
+        self._lock = threading.Lock()
+
+    def timed_switch(self, driver, device_name: str, device: BaseDevice):
+        start = time.perf_counter()
+        emulate_device(driver, device)
+        self.record(device_name, time.perf_counter() - start)
+
+    def record(self, device_name: str, seconds: float):
+        with self._lock:
+            self.switches.setdefault(device_name, []).append(round(seconds, 4))
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: JSON-serializable switch times per device
+        """
+        return {"switches": self.switches}
@@ -0,0 +1,156 @@
+import logging
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+
+logger = logging.getLogger(__name__)
+
+
+class DriverPool:
+    """
+    Keeps a warm WebDriver for one xdist worker and hands it out per test.
+
+    Instead of launching a new browser for every scenario, a released driver is reset
+    (extra windows closed, cookies and web storage cleared, navigated to about:blank)
+    and kept for the next test. A driver that fails the health check after reset is quit
+    and replaced by a fresh launch on the next acquire.
+
+    A worker runs one test at a time, so a single warm driver is all it can use; run more
+    workers (-n) for more browsers at once.
+    """
+
+    def __init__(self, factory):
+        """
+        Args:
+            factory: Callable returning a new WebDriver instance
+        """
+        self.factory = factory
+        self._idle = None
+        self.launches = []
+        self.resets = []
+        self.discarded = 0
+        self.tests = []
+
+    def acquire(self):
+        """
+        Get the warm driver, launching a new one if none is available
+
+        Returns:
+            tuple: (driver, launch_seconds) where launch_seconds is 0.0 for a reused driver
+        """
+        if self._idle:
+            driver, self._idle = self._idle, None
+            return driver, 0.0
+
+        start = time.perf_counter()
+        driver = self.factory()
+        launch_seconds = time.perf_counter() - start
+        self.launches.append(launch_seconds)
+        return driver, launch_seconds
+
+    def release(self, driver) -> float:
+        """
+        Reset the driver state and put it back into the pool
+
+        Returns:
+            float: Seconds spent on reset and health check
+        """
+        start = time.perf_counter()
+        healthy = self.reset_state(driver) and self.is_healthy(driver)
+        reset_seconds = time.perf_counter() - start
+
+        if healthy and self._idle is None:
+            self.resets.append(reset_seconds)
+            self._idle = driver
+        else:
+            if not healthy:
+                self.discarded += 1
+                logger.warning("Discarding WebDriver that failed the health check after reset")
+            self._quit(driver)
+        return reset_seconds
+
+    def record_test(self, nodeid: str, launch_seconds: float, reset_seconds: float):
+        """
+        Record how long the given test spent getting a usable browser
+        """
+        self.tests.append({
+            "test": nodeid,
+            "launched": launch_seconds > 0,
+            "launch_seconds": round(launch_seconds, 3),
+            "reset_seconds": round(reset_seconds, 3),
+        })
+
+    @staticmethod
+    def reset_state(driver) -> bool:
+        """
+        Close extra windows, clear cookies, localStorage, sessionStorage and go to about:blank
+
+        Returns:
+            bool: True if every reset step succeeded
+        """
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            # Web storage is per origin, so clear it before leaving the current page
+            driver.execute_script(
+                "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+            )
+            if hasattr(driver, "execute_cdp_cmd"):
+                # Chromium: clears cookies of every domain, not only the current one
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except WebDriverException as exc:
+            logger.warning("WebDriver reset failed: %s", exc.msg)
+            return False
+
+    @staticmethod
+    def is_healthy(driver) -> bool:
+        """
+        Check the driver still answers commands and is left with exactly one window
+        """
+        try:
+            return driver.execute_script("return 1;") == 1 and len(driver.window_handles) == 1
+        except WebDriverException:
+            return False
+
+    def close(self):
+        """
+        Quit the idle driver
+        """
+        if self._idle:
+            self._quit(self._idle)
+            self._idle = None
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def summary(self) -> dict:
+        """
+        Summarize launch vs reset time for the run report
+
+        Returns:
+            dict: JSON-serializable timing summary
+        """
+        avg_launch = sum(self.launches) / len(self.launches) if self.launches else 0.0
+        avg_reset = sum(self.resets) / len(self.resets) if self.resets else 0.0
+        reused = sum(1 for test in self.tests if not test["launched"])
+        return {
+            "tests": self.tests,
+            "launch_count": len(self.launches),
+            "reuse_count": reused,
+            "discarded": self.discarded,
+            "avg_launch_seconds": round(avg_launch, 3),
+            "avg_reset_seconds": round(avg_reset, 3),
+            "estimated_saved_seconds": round(reused * avg_launch - sum(self.resets), 3),
+        }
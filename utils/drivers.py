@@ -0,0 +1,144 @@
+"""
+Browser and device factory shared by conftest.py and the command-line tools.
+
+The tools (python -m utils.locator_health, benchmarks) take the same browser settings
+as pytest through add_browser_arguments(), with their defaults from the layered Config.
+"""
+import argparse
+import os
+import socket
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.webdriver.safari.options import Options as SafariOptions
+from selenium.webdriver.firefox.service import Service as FirefoxService
+
+from config.config import Config
+from config.devices import BaseDevice, IPhone17ProMax, IPhone17, IPadPro, Pixel9Pro
+from config.resource_profiles import ResourceProfile
+
+
+DEVICE_CLASSES = {
+    "desktop": BaseDevice,
+    "iphone17promax": IPhone17ProMax,
+    "iphone17": IPhone17,
+    "ipadpro": IPadPro,
+    "pixel9pro": Pixel9Pro
+}
+
+
+def get_device_class(device_type: str) -> BaseDevice:
+    device_class = DEVICE_CLASSES.get(device_type.lower())
+    if not device_class:
+        raise ValueError(f"Unsupported device type: {device_type}")
+    return device_class()
+
+
+def create_browser_options(browser_type: str, headless: bool, device: BaseDevice,
+                           resource_profile: ResourceProfile = None, proxy_server: str = None):
+    if browser_type == 'chrome':
+        options = ChromeOptions()
+        if headless:
+            options.add_argument("--headless")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument(f"--window-size={device.width},{device.height}")
+        options.add_argument(f"--user-agent={device.user_agent}")
+        options.add_argument("--disable-protocol-handler-prompt")
+        options.add_argument("--disable-external-protocol-handler")
+        # browser (console) log for the failure artifacts
+        options.set_capability("goog:loggingPrefs", {"browser": "ALL"})
+        if proxy_server:
+            options.add_argument(f"--proxy-server=http://{proxy_server}")
+            options.add_argument("--ignore-certificate-errors")
+            # Keep Chrome's own background traffic out of the recordings
+            options.add_argument("--disable-background-networking")
+        return options
+    elif browser_type == 'safari':
+        return SafariOptions()
+    elif browser_type == 'firefox':
+        options = FirefoxOptions()
+        if headless:
+            options.add_argument("--headless")
+        options.add_argument(f"--width={device.width}")
+        options.add_argument(f"--height={device.height}")
+        options.add_argument(f"--user-agent={device.user_agent}")
+        
+        firefox_bin = os.getenv('FIREFOX_BIN')
+        if firefox_bin:
+            options.binary_location = firefox_bin
+        if resource_profile and resource_profile.enabled:
+            # WebDriver BiDi for the request interceptor of utils/resource_blocking.py
+            options.set_capability("webSocketUrl", True)
+        if proxy_server:
+            host, port = proxy_server.split(":")
+            options.set_preference("network.proxy.type", 1)
+            for scheme in ("http", "ssl"):
+                options.set_preference(f"network.proxy.{scheme}", host)
+                options.set_preference(f"network.proxy.{scheme}_port", int(port))
+            options.accept_insecure_certs = True
+        return options
+    raise ValueError(f"Unsupported browser type: {browser_type}")
+
+
+def create_driver(browser_type: str, headless: bool, device: BaseDevice,
+                  resource_profile: ResourceProfile = None, proxy_server: str = None):
+    options = create_browser_options(browser_type, headless, device, resource_profile, proxy_server)
+
+    if browser_type == 'chrome':
+        service = Service()
+        driver = webdriver.Chrome(service=service, options=options)
+    elif browser_type == 'safari':
+        driver = webdriver.Safari(options=options)
+    elif browser_type == 'firefox':
+        # Every Firefox gets its own BiDi port, geckodriver defaults to 9222 for all of them
+        service_args = ["--websocket-port", str(_free_port())] if options.capabilities.get("webSocketUrl") else None
+        service = FirefoxService(service_args=service_args)
+        driver = webdriver.Firefox(service=service, options=options)
+    else:
+        raise ValueError(f"Unsupported browser type: {browser_type}")
+
+    driver.implicitly_wait(0)
+    return driver
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+# Playwright browser engine per --browser value
+PLAYWRIGHT_BROWSERS = {
+    "chrome": "chromium",
+    "firefox": "firefox",
+    "safari": "webkit",
+}
+
+
+def create_playwright_context_options(device: BaseDevice) -> dict:
+    return {
+        "viewport": device.get_viewport_size(),
+        "user_agent": device.user_agent,
+        "device_scale_factor": device.pixel_ratio,
+        "is_mobile": device.is_mobile,
+        "has_touch": device.is_mobile or device.is_tablet,
+    }
+
+
+def add_browser_arguments(parser: argparse.ArgumentParser, config: Config):
+    """
+    --browser, --device and --headless of the command-line tools, defaults from the Config
+    """
+    parser.add_argument("--browser", default=config.BROWSER, choices=Config.CHOICES["BROWSER"])
+    parser.add_argument("--device", default=config.DEVICE_TYPE, choices=list(DEVICE_CLASSES))
+    parser.add_argument("--headless", action="store_true", default=config.HEADLESS)
+
+
+def browser_config(args: argparse.Namespace, config: Config) -> Config:
+    """
+    The Config with the browser arguments of add_browser_arguments() applied
+    """
+    return config.replace(BROWSER=args.browser, DEVICE_TYPE=args.device, HEADLESS=args.headless)
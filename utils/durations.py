@@ -0,0 +1,161 @@
+"""
+Test duration history and duration-aware scheduling.
+
+Durations (setup + call + teardown) are kept per browser, device and test id in a local
+JSON file (DURATIONS_FILE). They drive:
+    --scheduler=lpt   xdist hands the longest remaining test to whichever worker frees up
+                      first (longest-processing-time-first), so a slow scenario cannot
+                      start last and set the wall-clock time
+    --shard=i/N       the suite is split into N shards of about equal estimated duration;
+                      every CI machine computes the same split from the same history file
+"""
+import json
+import logging
+import os
+import statistics
+
+from xdist.scheduler import LoadScheduling
+
+
+logger = logging.getLogger(__name__)
+
+# Recent runs kept per test; the estimate is their median
+HISTORY_RUNS = 5
+# Estimate for tests without history when nothing else is known
+DEFAULT_SECONDS = 1.0
+
+
+class DurationHistory:
+    """
+    Recent durations per (browser, device, test id), persisted as JSON.
+    Registered as a plugin on the controller to collect the durations of the current run.
+    """
+
+    def __init__(self, path: str, browser: str, device: str):
+        self.path = path
+        self.prefix = f"{browser}|{device}|"
+        self.runs = {}
+        self._current = {}
+        try:
+            with open(path) as history:
+                self.runs = json.load(history).get("durations", {})
+        except FileNotFoundError:
+            pass
+        except (ValueError, OSError) as exc:
+            logger.warning("Ignoring unreadable duration history %s: %s", path, exc)
+
+        # Mean of the known estimates for this browser and device, for tests without history
+        known = [statistics.median(runs) for key, runs in self.runs.items() if key.startswith(self.prefix) and runs]
+        self.default_seconds = statistics.mean(known) if known else DEFAULT_SECONDS
+
+    def pytest_runtest_logreport(self, report):
+        # Sum setup, call and teardown of every test in the current run
+        self._current[report.nodeid] = self._current.get(report.nodeid, 0.0) + report.duration
+
+    def estimate(self, nodeid: str) -> float:
+        runs = self.runs.get(self.prefix + nodeid)
+        if runs:
+            return statistics.median(runs)
+        return self.default_seconds
+
+    def save(self):
+        """
+        Append the current run to the history and write it atomically
+        """
+        if not self._current:
+            return
+        for nodeid, seconds in self._current.items():
+            runs = self.runs.setdefault(self.prefix + nodeid, [])
+            runs.append(round(seconds, 3))
+            del runs[:-HISTORY_RUNS]
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as history:
+            json.dump({"durations": self.runs}, history, indent=1, sort_keys=True)
+        os.replace(temporary, self.path)
+
+
+def parse_shard(value: str):
+    """
+    Parse --shard=i/N (1-based)
+
+    Returns:
+        tuple: (index, total), or None when the value is empty
+    """
+    if not value:
+        return None
+    try:
+        index, total = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/N, e.g. 1/3")
+    if not 1 <= index <= total:
+        raise ValueError(f"Invalid shard '{value}', i must be between 1 and N")
+    return index, total
+
+
+def split_shards(nodeids, history: DurationHistory, total: int) -> list:
+    """
+    Greedy longest-first split of test ids into `total` shards of balanced estimated duration.
+    Deterministic for the same test ids and history.
+
+    Returns:
+        list: One set of test ids per shard
+    """
+    shards = [set() for _ in range(total)]
+    loads = [0.0] * total
+    for nodeid in sorted(nodeids, key=lambda nodeid: (-history.estimate(nodeid), nodeid)):
+        target = loads.index(min(loads))
+        shards[target].add(nodeid)
+        loads[target] += history.estimate(nodeid)
+    return shards
+
+
+class LPTScheduling(LoadScheduling):
+    """
+    xdist scheduler sending tests longest-estimated-first, one at a time per free worker.
+
+    Every worker keeps two tests queued (it needs to know the next item to run one), so
+    the initial round gives the two longest tests per worker and each finished test is
+    replaced by the longest test still pending.
+    """
+
+    def __init__(self, config, history: DurationHistory, log=None):
+        super().__init__(config, log)
+        self.history = history
+
+    def schedule(self):
+        assert self.collection_is_completed
+
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = list(self.node2collection.values())[0]
+        self.pending[:] = sorted(
+            range(len(self.collection)), key=lambda index: -self.history.estimate(self.collection[index])
+        )
+        if not self.collection:
+            return
+
+        for _ in range(2):
+            for node in self.nodes:
+                self._send_tests(node, 1)
+
+        if not self.pending:
+            for node in self.nodes:
+                node.shutdown()
+
+    def check_schedule(self, node, duration=0):
+        if node.shutting_down:
+            return
+
+        if self.pending:
+            queued = len(self.node2pending[node])
+            if queued < 2:
+                self._send_tests(node, 2 - queued)
+        else:
+            node.shutdown()
@@ -0,0 +1,356 @@
+"""
+Local stand-in for the Inline ordering site (--env=local).
+
+A single-page app served by an in-process HTTP server, reproducing the DOM contract of
+OrderPageLocators: the data-cy hooks, the GeneralIndicator prompt, the delivery/takeout
+switcher and the AddressTimePicker modal with postal-code suggestions. Every path
+except the API serves the order page, so BASE_PATH works unchanged.
+
+    GET /api/addresses?q=<query>    address suggestions, {"addresses": [...]}
+
+Timing and failures are configurable, so runs are reproducible and need no network:
+
+    latency_ms          server delay before every response (page and API)
+    render_delay_ms     client delay before the page, the modal, a service switch and
+                        the suggestions render
+    flakiness           probability that an address lookup fails with a 503 (the page
+                        retries it) and that the suggestion list renders twice, which
+                        leaves stale element references behind
+    seed                seeds both, the same seed gives the same sequence of failures
+
+Without pytest:
+    python -m utils.local_site --port 8000 --latency-ms 150 --flakiness 0.1
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+logger = logging.getLogger(__name__)
+
+RESTAURANT_NAME = "Inline Local Kitchen"
+BRANCH_ADDRESS = "1 Raffles Place, Singapore 048616"
+# Known streets; any other 6-digit postal code resolves to a generated address
+ADDRESSES = (
+    "1 Raffles Place, Singapore 048616",
+    "10 Anson Road, International Plaza, Singapore 079903",
+    "80 Robinson Road, Singapore 068898",
+    "3 Temasek Boulevard, Suntec City Mall, Singapore 038983",
+    "2 Orchard Turn, ION Orchard, Singapore 238801",
+)
+MAX_SUGGESTIONS = 5
+
+PAGE_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>__RESTAURANT__ - Online Order</title>
+<style>
+  body { margin: 0; font-family: sans-serif; color: #222; }
+  main { max-width: 720px; margin: 0 auto; padding: 16px; }
+  .switcher { display: flex; gap: 8px; margin: 16px 0; }
+  .switcher button { flex: 1; padding: 10px; border: 2px solid #ddd; border-radius: 8px; background: #fff; }
+  .switcher button.border-orange { border-color: #f60; }
+  .switcher button.shadow-xl { box-shadow: 0 8px 16px rgba(0, 0, 0, .2); }
+  [data-testid="GeneralIndicator"] { padding: 12px; border-radius: 8px; background: #f5f5f5; }
+  [data-testid="GeneralIndicator"] button { width: 100%; display: flex; justify-content: space-between;
+                                           border: 0; background: none; font: inherit; text-align: left; }
+  [data-i18n-key="takeoutOrderPage.edit"] { color: #f60; }
+  #category-navbar { display: flex; gap: 16px; margin: 16px 0; }
+  .backdrop { position: fixed; inset: 0; background: rgba(0, 0, 0, .4); }
+  .picker { position: fixed; left: 50%; top: 10%; width: 90%; max-width: 480px; transform: translateX(-50%);
+            padding: 16px; border-radius: 8px; background: #fff; }
+  .picker input { width: 80%; padding: 8px; }
+  .picker ul { list-style: none; padding: 0; }
+  .picker li { padding: 8px; border-bottom: 1px solid #eee; }
+  .picker li.selected { background: #fff3e8; }
+</style>
+</head>
+<body>
+<main id="app"><p>Loading...</p></main>
+<script>window.__LOCAL_SITE__ = __SETTINGS__;</script>
+<script>
+(function () {
+  var settings = window.__LOCAL_SITE__;
+  var seed = settings.seed >>> 0;
+  var state = {mode: "takeout", address: null, selected: null, lookup: 0};
+
+  // mulberry32, seeded by the server so a run's flakiness is reproducible
+  function random() {
+    seed = (seed + 0x6D2B79F5) >>> 0;
+    var t = seed;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  }
+  function later(callback) { setTimeout(callback, settings.renderDelayMs); }
+  function $(selector) { return document.querySelector(selector); }
+  function escape(text) {
+    var node = document.createElement("span");
+    node.textContent = text;
+    return node.innerHTML;
+  }
+
+  function renderIndicator() {
+    var text = state.mode === "takeout" ? "<span>Takeout - Today, as soon as possible</span>"
+      : state.address ? '<span data-cy="delivery-address-order-page">' + escape(state.address) + "</span>"
+      : "<span>Please enter your delivery address.</span>";
+    $('[data-testid="GeneralIndicator"]').innerHTML =
+      '<button type="button" data-cy="go-to-address-and-date-picker">' + text +
+      ' <span data-i18n-key="takeoutOrderPage.edit">Edit</span></button>';
+  }
+  function renderSwitcher() {
+    [["delivery", '[data-cy="bt-delivery"]'], ["takeout", '[data-cy="bt-takeout"]']].forEach(function (entry) {
+      $(entry[1]).className = state.mode === entry[0] ? "border-orange shadow-xl" : "";
+    });
+  }
+  function renderSuggestions(addresses) {
+    var list = $('[class*="AddressTimePicker__AddressPickerBlock"] ul');
+    if (!list) return;
+    list.innerHTML = addresses.map(function (address) {
+      return '<li class="cursor-pointer">' + escape(address) + "</li>";
+    }).join("");
+  }
+  function lookup(query, attempt) {
+    var id = ++state.lookup;
+    fetch("/api/addresses?q=" + encodeURIComponent(query)).then(function (response) {
+      if (!response.ok) throw new Error("HTTP " + response.status);
+      return response.json();
+    }).then(function (data) {
+      if (id !== state.lookup) return;
+      later(function () {
+        renderSuggestions(data.addresses);
+        if (random() < settings.flakiness) setTimeout(function () { renderSuggestions(data.addresses); }, 50);
+      });
+    }).catch(function () {
+      if (id === state.lookup && attempt < 3) setTimeout(function () { lookup(query, attempt + 1); }, 100);
+    });
+  }
+  function openPicker() {
+    if ($(".backdrop")) return;
+    later(function () {
+      var backdrop = document.createElement("div");
+      backdrop.className = "backdrop";
+      backdrop.innerHTML =
+        '<div class="picker AddressTimePicker__Picker-sc-local" role="dialog">' +
+        '<div class="AddressTimePicker__AddressPickerBlock-sc-local">' +
+        '<input type="text" placeholder="Please ONLY enter the street address." autocomplete="off">' +
+        '<button type="button" data-cy="address-clear-button">Clear</button><ul></ul></div>' +
+        '<button type="button" data-cy="bt-confirm-date-address" disabled>Confirm</button></div>';
+      document.body.appendChild(backdrop);
+      state.selected = null;
+    });
+  }
+  function closePicker() {
+    later(function () {
+      state.mode = "delivery";
+      state.address = state.selected;
+      renderSwitcher();
+      renderIndicator();
+      var backdrop = $(".backdrop");
+      if (backdrop) backdrop.remove();
+    });
+  }
+
+  document.addEventListener("click", function (event) {
+    var target = event.target;
+    if (target.closest('[data-cy="bt-delivery"]')) {
+      later(function () { state.mode = "delivery"; renderSwitcher(); renderIndicator(); });
+    } else if (target.closest('[data-cy="bt-takeout"]')) {
+      later(function () { state.mode = "takeout"; renderSwitcher(); renderIndicator(); });
+    } else if (target.closest('[data-cy="go-to-address-and-date-picker"]')) {
+      openPicker();
+    } else if (target.closest('[data-cy="address-clear-button"]')) {
+      $(".picker input").value = "";
+      state.selected = null;
+      state.lookup++;
+      renderSuggestions([]);
+      $('[data-cy="bt-confirm-date-address"]').disabled = true;
+    } else if (target.closest(".picker li")) {
+      var item = target.closest(".picker li");
+      Array.prototype.forEach.call(document.querySelectorAll(".picker li"), function (other) {
+        other.classList.remove("selected");
+      });
+      item.classList.add("selected");
+      state.selected = item.textContent;
+      $(".picker input").value = item.textContent;
+      $('[data-cy="bt-confirm-date-address"]').disabled = false;
+    } else if (target.closest('[data-cy="bt-confirm-date-address"]') && state.selected) {
+      closePicker();
+    }
+  });
+  // Like the real picker, suggestions are fetched on key events (see INPUT_STRATEGIES)
+  document.addEventListener("keyup", function (event) {
+    if (!event.target.matches(".picker input")) return;
+    var query = event.target.value.trim();
+    if (query) lookup(query, 0); else renderSuggestions([]);
+  });
+
+  later(function () {
+    $("#app").innerHTML =
+      '<h1 data-cy="branch-name-order-page">' + escape(settings.restaurant) + "</h1>" +
+      '<p data-cy="branch-address-order-page">' + escape(settings.branchAddress) + "</p>" +
+      '<div data-cy="online-order-switch" class="switcher">' +
+      '<button type="button" data-cy="bt-delivery">Delivery</button>' +
+      '<button type="button" data-cy="bt-takeout">Takeout</button></div>' +
+      '<div data-testid="GeneralIndicator"></div>' +
+      '<nav id="category-navbar"><a href="#mains">Mains</a><a href="#sides">Sides</a><a href="#drinks">Drinks</a></nav>' +
+      '<section id="mains"><h2>Mains</h2></section><section id="sides"><h2>Sides</h2></section>' +
+      '<section id="drinks"><h2>Drinks</h2></section>';
+    renderSwitcher();
+    renderIndicator();
+  });
+})();
+</script>
+</body>
+</html>
+"""
+
+
+def find_addresses(query: str) -> list:
+    """
+    Address suggestions for a street or postal code query
+    """
+    query = query.strip().lower()
+    if not query:
+        return []
+    matches = [address for address in ADDRESSES if query in address.lower()]
+    if not matches and query.isdigit() and len(query) == 6:
+        matches = [f"{int(query[:3]) % 200 + 1} Market Street, Singapore {query}"]
+    return matches[:MAX_SUGGESTIONS]
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status, content_type, body = self.server.site.handle(self.path)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+class _SiteServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class LocalSite:
+    """
+    In-process ordering site for one pytest process
+    """
+
+    def __init__(self, port: int = 0, latency_ms: int = 0, render_delay_ms: int = 0,
+                 flakiness: float = 0.0, seed: int = 0):
+        if not 0 <= flakiness <= 1:
+            raise ValueError(f"flakiness must be between 0 and 1, got {flakiness}")
+        self.latency_ms = latency_ms
+        self.render_delay_ms = render_delay_ms
+        self.flakiness = flakiness
+        self.server = _SiteServer(("127.0.0.1", port), _SiteHandler)
+        self.server.site = self
+        self.requests = 0
+        self.injected_failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="local-site", daemon=True).start()
+        logger.info("Local ordering site listening on %s", self.url)
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, path: str) -> tuple:
+        """
+        Returns:
+            tuple: (status, content type, body)
+        """
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        url = urlsplit(path)
+        with self._lock:
+            self.requests += 1
+            if url.path == "/api/addresses" and self._random.random() < self.flakiness:
+                self.injected_failures += 1
+                return 503, "application/json", b'{"error": "unavailable"}'
+            # every page load gets its own seed for the client-side flakiness
+            page_seed = self._random.getrandbits(32) if url.path != "/api/addresses" else 0
+        if url.path == "/api/addresses":
+            query = parse_qs(url.query).get("q", [""])[0]
+            return 200, "application/json", json.dumps({"addresses": find_addresses(query)}).encode("utf-8")
+        if url.path == "/favicon.ico":
+            return 404, "text/plain", b""
+        settings = {
+            "restaurant": RESTAURANT_NAME,
+            "branchAddress": BRANCH_ADDRESS,
+            "renderDelayMs": self.render_delay_ms,
+            "flakiness": self.flakiness,
+            "seed": page_seed,
+        }
+        html = PAGE_HTML.replace("__RESTAURANT__", RESTAURANT_NAME).replace("__SETTINGS__", json.dumps(settings))
+        return 200, "text/html; charset=utf-8", html.encode("utf-8")
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: JSON-serializable request and injected failure counts
+        """
+        return {"requests": self.requests, "injected_failures": self.injected_failures}
+
+
+def start_local_site(settings) -> tuple:
+    """
+    Start the site with the LOCAL_SITE_* settings of a Config with ENV='local'
+
+    Returns:
+        tuple: (LocalSite, the Config with LOCAL_SITE_PORT set to the port it listens on)
+    """
+    site = LocalSite(
+        port=settings.LOCAL_SITE_PORT,
+        latency_ms=settings.LOCAL_SITE_LATENCY_MS,
+        render_delay_ms=settings.LOCAL_SITE_RENDER_DELAY_MS,
+        flakiness=settings.LOCAL_SITE_FLAKINESS,
+        seed=settings.LOCAL_SITE_SEED,
+    )
+    site.start()
+    return site, settings.replace(LOCAL_SITE_PORT=site.port)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--render-delay-ms", type=int, default=0)
+    parser.add_argument("--flakiness", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    site = LocalSite(args.port, args.latency_ms, args.render_delay_ms, args.flakiness, args.seed)
+    print(f"Serving the local ordering site on {site.url} (Ctrl+C to stop)")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.server.server_close()
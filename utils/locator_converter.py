@@ -1,90 +1,533 @@
+import ast
+import re
+
 from selenium.webdriver.common.by import By
 
+
+class LocatorCompileError(ValueError):
+    """Raised when a Playwright locator string cannot be compiled to a Selenium locator"""
+
+
+class LocatorValue(str):
+    """
+    Selenium locator value that remembers the Playwright source and the `.nth()` index.
+
+    A trailing `.nth()` on an ID/CSS selector is kept as `index` instead of turning the
+    selector into XPath; BaseAction applies it when resolving the element. It stays a
+    plain `str` for Selenium, and without an index it compares and hashes like one.
+    """
+
+    def __new__(cls, value: str, index=None, source=None):
+        obj = super().__new__(cls, value)
+        obj.index = index
+        obj.source = source
+        return obj
+
+    def __eq__(self, other):
+        if not isinstance(other, str):
+            return NotImplemented
+        return str.__eq__(self, other) and self.index == locator_index(other)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return str.__hash__(self) if self.index is None else hash((str(self), self.index))
+
+    def __reduce__(self):
+        return LocatorValue, (str(self), self.index, self.source)
+
+
+def locator_index(locator_value):
+    """
+    The `.nth()` index of a compiled locator value, None for plain strings
+    """
+    return locator_value.index if isinstance(locator_value, LocatorValue) else None
+
+
+# Selectors are compiled to one of these parts, then chained
+_CSS = "css"
+_XPATH = "xpath"
+
+_CSS_ID_ONLY = re.compile(r"^#(-?[_a-zA-Z][\w-]*)$")
+_CSS_UNSUPPORTED = (":has-text(", ":text(", ":text-is(", ":text-matches(", ":visible", ":nth-match(")
+
+# Implicit ARIA roles of native elements for get_by_role
+_IMPLICIT_ROLES = {
+    "button": "self::button or (self::input and (@type='button' or @type='submit' or @type='reset'))",
+    "link": "(self::a or self::area) and @href",
+    "textbox": (
+        "self::textarea or (self::input and (not(@type) or @type='text' or @type='email' "
+        "or @type='tel' or @type='url' or @type='password'))"
+    ),
+    "searchbox": "self::input and @type='search'",
+    "checkbox": "self::input and @type='checkbox'",
+    "radio": "self::input and @type='radio'",
+    "combobox": "self::select",
+    "heading": "self::h1 or self::h2 or self::h3 or self::h4 or self::h5 or self::h6",
+    "list": "self::ul or self::ol",
+    "listitem": "self::li",
+    "img": "self::img and @alt",
+    "dialog": "self::dialog",
+    "navigation": "self::nav",
+    "table": "self::table",
+    "row": "self::tr",
+    "option": "self::option",
+}
+
+_UPPER = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_LOWER = "abcdefghijklmnopqrstuvwxyz"
+
+
+def _xpath_literal(text: str) -> str:
+    """Quote a string for XPath 1.0 (which has no escape sequences)"""
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+    parts = text.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+
+def _css_string(text: str) -> str:
+    """Quote a string for a CSS attribute selector"""
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _css_unescape(text: str) -> str:
+    return re.sub(r"\\(.)", r"\1", text)
+
+
+def _xpath_text_match(expression: str, text: str, exact: bool) -> str:
+    """Playwright text semantics: exact match, or case-insensitive substring"""
+    if exact:
+        return f"normalize-space({expression})={_xpath_literal(text)}"
+    lowered = f"translate(normalize-space({expression}), '{_UPPER}', '{_LOWER}')"
+    return f"contains({lowered}, {_xpath_literal(text.lower())})"
+
+
+_CSS_TOKEN = re.compile(
+    r"""
+    (?P<combinator>\s*>\s*|\s+)
+    | (?P<tag>\*|[a-zA-Z][\w-]*)
+    | \#(?P<id>[\w-]+)
+    | \.(?P<cls>[\w-]+)
+    | \[\s*(?P<attr>[\w:-]+)\s*
+        (?:(?P<op>[*^$~]?=)\s*(?:"(?P<dq>(?:[^"\\]|\\.)*)"|'(?P<sq>(?:[^'\\]|\\.)*)'|(?P<bare>[^\]\s]+)))?\s*\]
+    """,
+    re.VERBOSE,
+)
+
+
+def _css_condition(match) -> str:
+    if match.group("id"):
+        return f"@id={_xpath_literal(match.group('id'))}"
+    if match.group("cls"):
+        return f"contains(concat(' ', normalize-space(@class), ' '), ' {match.group('cls')} ')"
+
+    attr = match.group("attr")
+    op = match.group("op")
+    if not op:
+        return f"@{attr}"
+    value = next(v for v in (match.group("dq"), match.group("sq"), match.group("bare")) if v is not None)
+    value = _css_unescape(value)
+    literal = _xpath_literal(value)
+    if op == "=":
+        return f"@{attr}={literal}"
+    if op == "*=":
+        return f"contains(@{attr}, {literal})"
+    if op == "^=":
+        return f"starts-with(@{attr}, {literal})"
+    if op == "$=":
+        return f"substring(@{attr}, string-length(@{attr}) - string-length({literal}) + 1)={literal}"
+    return f"contains(concat(' ', normalize-space(@{attr}), ' '), {_xpath_literal(' ' + value + ' ')})"
+
+
+def css_to_xpath(css: str):
+    """
+    Convert a simple CSS selector (tags, #id, .class, attribute selectors, descendant and
+    child combinators) to an XPath expression.
+
+    Returns:
+        str: XPath expression starting with '//', or None when the selector uses features
+             without an XPath equivalent here (pseudo-classes, selector lists, siblings)
+    """
+    css = css.strip()
+    position = 0
+    axis = "//"
+    steps = []
+    tag = None
+    conditions = []
+
+    def _close_step():
+        if tag is None and not conditions:
+            return
+        predicate = "".join(f"[{condition}]" for condition in conditions)
+        steps.append(f"{axis}{tag or '*'}{predicate}")
+
+    while position < len(css):
+        match = _CSS_TOKEN.match(css, position)
+        if not match:
+            return None
+        position = match.end()
+        if match.group("combinator") is not None:
+            _close_step()
+            axis = "/" if ">" in match.group("combinator") else "//"
+            tag, conditions = None, []
+        elif match.group("tag"):
+            if tag is not None or conditions:
+                return None
+            tag = match.group("tag")
+        else:
+            conditions.append(_css_condition(match))
+
+    _close_step()
+    return "".join(steps) or None
+
+
+class _Part:
+    def __init__(self, strategy: str, value: str):
+        self.strategy = strategy
+        self.value = value
+
+    def as_xpath(self) -> str:
+        if self.strategy == _XPATH:
+            return self.value
+        xpath = css_to_xpath(self.value)
+        if xpath is None:
+            raise LocatorCompileError(f"CSS selector cannot be combined with XPath: {self.value}")
+        return xpath
+
+
+def _relative_xpath(xpath: str) -> str:
+    """Make an XPath usable after another step (Playwright evaluates chained XPath relative)"""
+    if xpath.startswith(".//"):
+        return xpath[1:]
+    if xpath.startswith("//"):
+        return xpath
+    if xpath.startswith("./"):
+        return xpath[1:]
+    if xpath.startswith("/") or xpath.startswith("("):
+        raise LocatorCompileError(f"Absolute XPath cannot be chained: {xpath}")
+    return "/" + xpath
+
+
+def _chain(parent: _Part, child: _Part) -> _Part:
+    if parent.strategy == _CSS and child.strategy == _CSS:
+        outer = f":is({parent.value})" if "," in parent.value else parent.value
+        inner = f":is({child.value})" if "," in child.value else child.value
+        return _Part(_CSS, f"{outer} {inner}")
+    return _Part(_XPATH, parent.as_xpath() + _relative_xpath(child.as_xpath()))
+
+
+def _fold_index(part: _Part, index: int) -> _Part:
+    if index >= 0:
+        position = str(index + 1)
+    elif index == -1:
+        position = "last()"
+    else:
+        position = f"last(){index + 1}"
+    return _Part(_XPATH, f"({part.as_xpath()})[{position}]")
+
+
+def _split_chain(selector_str: str) -> list:
+    """Split a Playwright selector on '>>' outside quotes and brackets"""
+    parts, depth, quote, start = [], 0, None, 0
+    position = 0
+    while position < len(selector_str):
+        char = selector_str[position]
+        if quote:
+            if char == "\\":
+                position += 1
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "[(":
+            depth += 1
+        elif char in "])":
+            depth -= 1
+        elif selector_str.startswith(">>", position) and depth == 0:
+            parts.append(selector_str[start:position].strip())
+            start = position + 2
+            position += 1
+        position += 1
+    parts.append(selector_str[start:].strip())
+    return [part for part in parts if part]
+
+
+def _unquote(text: str) -> str:
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'`":
+        return text[1:-1]
+    return text
+
+
+def _selector_operations(selector_str: str) -> list:
+    """Translate a Playwright selector string (engines and '>>' chains) to operations"""
+    operations = []
+    for part in _split_chain(selector_str):
+        engine, _, body = part.partition("=")
+        engine = engine.strip()
+        if engine == "css" and body:
+            operations.append(("css", body.strip()))
+        elif engine == "xpath" and body:
+            operations.append(("xpath", body.strip()))
+        elif engine == "text" and body:
+            body = body.strip()
+            operations.append(("text", _unquote(body), body[:1] in "\"'"))
+        elif engine == "id" and body:
+            operations.append(("css", f"[id={_css_string(_unquote(body.strip()))}]"))
+        elif engine in ("data-testid", "data-test-id", "data-cy") and body:
+            operations.append(("css", f"[{engine}={_css_string(_unquote(body.strip()))}]"))
+        elif engine == "nth" and body:
+            operations.append(("nth", int(body)))
+        elif part.startswith(("//", "..", "(//")):
+            operations.append(("xpath", part))
+        else:
+            operations.append(("css", part))
+    return operations
+
+
+def _literal_arg(node):
+    try:
+        return ast.literal_eval(node)
+    except ValueError as exc:
+        raise LocatorCompileError(f"Unsupported locator argument: {ast.dump(node)}") from exc
+
+
+def _keywords(call) -> dict:
+    return {keyword.arg: _literal_arg(keyword.value) for keyword in call.keywords}
+
+
+def _call_operations(name: str, call) -> list:
+    args = [_literal_arg(arg) for arg in call.args]
+    options = _keywords(call)
+    exact = bool(options.get("exact", False))
+    if name == "locator":
+        if call.keywords:
+            raise LocatorCompileError("locator() options such as has_text are not supported")
+        return _selector_operations(args[0])
+    if name == "nth":
+        return [("nth", int(args[0]))]
+    if name == "get_by_test_id":
+        return [("css", f"[data-testid={_css_string(args[0])}]")]
+    if name == "get_by_text":
+        return [("text", args[0], exact)]
+    if name == "get_by_role":
+        return [("role", args[0], options.get("name"), exact)]
+    if name == "get_by_placeholder":
+        flag = "" if exact else " i"
+        operator = "=" if exact else "*="
+        return [("css", f"[placeholder{operator}{_css_string(args[0])}{flag}]")]
+    if name == "get_by_label":
+        return [("xpath", f"//*[@aria-label and {_xpath_text_match('@aria-label', args[0], exact)}]")]
+    raise LocatorCompileError(f"Unsupported locator method: {name}()")
+
+
+def _page_operations(source: str) -> list:
+    """Parse a `page.xxx(...).yyy` expression into operations, innermost first"""
+    # JavaScript template strings are not Python, turn `...` into a Python string literal
+    source = re.sub(r"`([^`]*)`", lambda match: repr(match.group(1)), source)
+    try:
+        node = ast.parse(source, mode="eval").body
+    except SyntaxError as exc:
+        raise LocatorCompileError(f"Invalid locator expression: {source}") from exc
+
+    operations = []
+    while not (isinstance(node, ast.Name) and node.id == "page"):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            operations[:0] = _call_operations(node.func.attr, node)
+            node = node.func.value
+        elif isinstance(node, ast.Attribute) and node.attr in ("first", "last"):
+            operations.insert(0, ("nth", 0 if node.attr == "first" else -1))
+            node = node.value
+        else:
+            raise LocatorCompileError(f"Unsupported locator expression: {source}")
+    return operations
+
+
+def _operation_part(operation) -> _Part:
+    kind = operation[0]
+    if kind == "css":
+        if any(pseudo in operation[1] for pseudo in _CSS_UNSUPPORTED):
+            raise LocatorCompileError(f"Playwright-only CSS extension in selector: {operation[1]}")
+        return _Part(_CSS, operation[1])
+    if kind == "xpath":
+        return _Part(_XPATH, operation[1])
+    if kind == "text":
+        _, text, exact = operation
+        return _Part(_XPATH, f"//*[text()[{_xpath_text_match('.', text, exact)}]]")
+
+    _, role, name, exact = operation
+    role_condition = f"@role={_xpath_literal(role)}"
+    if role in _IMPLICIT_ROLES:
+        role_condition = f"{role_condition} or (not(@role) and ({_IMPLICIT_ROLES[role]}))"
+    xpath = f"//*[{role_condition}]"
+    if name is not None:
+        name_condition = " or ".join(
+            _xpath_text_match(expression, name, exact) for expression in (".", "@aria-label", "@value")
+        )
+        xpath += f"[{name_condition}]"
+    return _Part(_XPATH, xpath)
+
+
+def compile_locator(source: str) -> tuple:
+    """
+    Compile a Playwright locator string to the cheapest native Selenium locator.
+
+    Supports page.locator(), get_by_role(), get_by_text(), get_by_test_id(),
+    get_by_placeholder(), get_by_label(), .nth(), .first, .last, chained locators and
+    '>>' / engine prefixes (css=, xpath=, text=, id=, nth=) inside selector strings.
+    Plain selector strings without `page.` are accepted as well.
+
+    Args:
+        source (str): Locator string, e.g. 'page.locator("[data-cy=\\"bt-delivery\\"]").first'
+
+    Returns:
+        tuple: (By.ID | By.CSS_SELECTOR | By.XPATH, LocatorValue)
+
+    Raises:
+        LocatorCompileError: If the locator uses a feature with no Selenium equivalent
+    """
+    stripped = source.strip()
+    if stripped.startswith("page.") or stripped.startswith("page "):
+        operations = _page_operations(stripped)
+    else:
+        operations = _selector_operations(_unquote(stripped))
+
+    part = None
+    index = None
+    for operation in operations:
+        if operation[0] == "nth":
+            if part is None:
+                raise LocatorCompileError(f"nth() without a locator: {source}")
+            if index is not None:
+                part = _fold_index(part, index)
+            index = operation[1]
+            continue
+        if index is not None:
+            # nth() in the middle of a chain can only be expressed in XPath
+            part, index = _fold_index(part, index), None
+        new_part = _operation_part(operation)
+        part = new_part if part is None else _chain(part, new_part)
+
+    if part is None:
+        raise LocatorCompileError(f"Empty locator: {source}")
+
+    if index not in (None, 0) and part.strategy == _XPATH:
+        part, index = _fold_index(part, index), None
+    # on ID/CSS the index stays metadata, applied by BaseAction, so the selector is not turned into XPath
+
+    return _emit(part, index, source)
+
+
+def _emit(part: _Part, index, source: str) -> tuple:
+    if part.strategy == _XPATH:
+        return By.XPATH, LocatorValue(part.value, index, source)
+    id_match = _CSS_ID_ONLY.match(part.value.strip())
+    if id_match:
+        return By.ID, LocatorValue(id_match.group(1), index, source)
+    return By.CSS_SELECTOR, LocatorValue(part.value.strip(), index, source)
+
+
+class LocatorRegistry:
+    """
+    Memoized Playwright -> Selenium locator compilation keyed by the source string.
+    Locator classes call `selector()`, so each distinct string is compiled once per process.
+    """
+
+    def __init__(self):
+        self._compiled = {}
+
+    def get(self, source: str) -> tuple:
+        """
+        Get the compiled locator for the source string, compiling it on first use
+        """
+        compiled = self._compiled.get(source)
+        if compiled is None:
+            compiled = compile_locator(source)
+            self._compiled[source] = compiled
+        return compiled
+
+    def sources(self) -> list:
+        return list(self._compiled)
+
+    def clear(self):
+        self._compiled.clear()
+
+    def __len__(self):
+        return len(self._compiled)
+
+
+LOCATOR_REGISTRY = LocatorRegistry()
+
+
 def convert_playwright_to_selenium(locator_str: str) -> tuple:
     """
     Convert Playwright locator to Selenium locator format
-    
+
     Args:
         locator_str (str): Playwright locator string, e.g. 'page.locator('[data-sentry-component="HeaderAvatar"]')'
-        
+
     Returns:
         tuple: Selenium locator tuple (By.CSS_SELECTOR, selector)
     """
     return selector(locator_str)
 
-def _extract_test_id(selector_str: str) -> str:
-    """Extract test ID and clean quotes"""
-    test_id = selector_str.replace('page.get_by_test_id(', '').replace(')', '')
-    return _clean_quotes(test_id)
-
-def _clean_quotes(text: str) -> str:
-    """Clean quotes around the string"""
-    if text.startswith(('`', '"', "'")):
-        return text[1:-1]  # remove quotes
-    return text
-
-def _clean_escaped_quotes(text: str) -> str:
-    """Clean escaped quotes"""
-    return text.replace('\\"', "'")
-
-def _process_page_locator(selector_str: str) -> str:
-    """Process page.locator selector"""
-    # Extract selector part
-    prefix = 'page.locator('
-    selector_body = selector_str[len(prefix):]
-    if selector_body.endswith(')'):
-        selector_body = selector_body[:-1]
-    
-    # Process .first method
-    if '.first' in selector_body:
-        selector_body = selector_body.split('.first')[0]
-        
-    # Process .nth() method
-    if '.nth(' in selector_body:
-        selector_body = selector_body.split('.nth(')[0]
-        
-    return _clean_quotes(selector_body)
-
-def _get_selenium_locator(selector_str: str) -> tuple:
-    """Return corresponding Selenium locator based on selector type"""
-    if selector_str.startswith('//'):
-        return By.XPATH, selector_str
-    elif selector_str.startswith('#'):
-        return By.ID, selector_str[1:]
-    elif selector_str.startswith('.'):
-        return By.CLASS_NAME, selector_str[1:]
-    else:
-        # For CSS selectors, clean escaped quotes
-        selector_str = _clean_escaped_quotes(selector_str)
-        return By.CSS_SELECTOR, selector_str
 
 def selector(selector_str: str) -> tuple:
     """
     Simplified locator conversion function, supports full Playwright format
-    
+
     Args:
         selector_str (str): Selector string, supports the following formats:
             - Full format: 'page.locator('[data-sentry-component="HeaderAvatar"]')'
             - Full format: 'page.locator("[data-sentry-component=\"HeaderAvatar\"]")'
             - Full format: 'page.locator(`[data-sentry-component="HeaderAvatar"]`)'
             - Full format: 'page.get_by_test_id('component-id')'
+            - Full format: 'page.get_by_role("button", name="Confirm")', 'page.get_by_text("Edit")'
+            - Chained: 'page.locator("#menu").locator("li").nth(2)', 'page.locator("#menu >> li")'
             - Simplified format: '[data-sentry-component="HeaderAvatar"]'
-        
+
     Returns:
-        tuple: Selenium locator tuple
+        tuple: Selenium locator tuple, compiled once and served from LOCATOR_REGISTRY
     """
-    # Process page.get_by_test_id format
-    if selector_str.startswith('page.get_by_test_id'):
-        test_id = _extract_test_id(selector_str)
-        return By.CSS_SELECTOR, f'[data-testid="{test_id}"]'
+    return LOCATOR_REGISTRY.get(selector_str)
 
-    # Process page.locator format
-    if selector_str.startswith('page.locator'):
-        selector_str = _process_page_locator(selector_str)
-    
-    return _get_selenium_locator(selector_str)
+
+def to_playwright_selector(locator_type: str, locator_value: str) -> str:
+    """
+    Convert a Selenium locator back to a Playwright selector (used by the Playwright engine)
+
+    Args:
+        locator_type (str): Selenium `By` strategy
+        locator_value (str): Locator value
+
+    Returns:
+        str: Playwright selector with an explicit engine prefix
+    """
+    quoted = '"' + str(locator_value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+    if locator_type == By.XPATH:
+        return f"xpath={locator_value}"
+    if locator_type == By.CSS_SELECTOR:
+        return f"css={locator_value}"
+    if locator_type == By.ID:
+        return f"css=[id={quoted}]"
+    if locator_type == By.NAME:
+        return f"css=[name={quoted}]"
+    if locator_type == By.CLASS_NAME:
+        return f"css=.{locator_value}"
+    if locator_type == By.TAG_NAME:
+        return f"css={locator_value}"
+    if locator_type == By.LINK_TEXT:
+        return f"css=a:text-is({quoted})"
+    if locator_type == By.PARTIAL_LINK_TEXT:
+        return f"css=a:has-text({quoted})"
+    raise LocatorCompileError(f"Unsupported locator type: {locator_type}")
 
 
 if __name__ == "__main__":
     test_locator = 'page.locator(`[data-sentry-component="HeaderAvatar"]`)'
-    selenium_locator = convert_playwright_to_selenium(test_locator)
\ No newline at end of file
+    selenium_locator = convert_playwright_to_selenium(test_locator)
+    print(selenium_locator)
@@ -0,0 +1,158 @@
+"""
+Locator health preflight (--preflight-locators, or as a command).
+
+Opens every page of PREFLIGHT_PAGES once, gives its READY_LOCATORS READY_TIMEOUT seconds
+to show up and checks every locator declared on its locator class, and every READY locator,
+in a single script call:
+
+    missing     no element matches (unless listed in PREFLIGHT_DEFERRED of the class,
+                for elements that only exist after an interaction)
+    hidden      a READY locator matches, but not a visible element
+    ambiguous   several elements match a locator that is used as one element (no `.nth()`
+                index, not listed in PREFLIGHT_MULTIPLE)
+
+A broken selector is reported for the whole page within seconds instead of failing its
+steps one at a time after a full wait timeout.
+
+Usage:
+    python -m utils.locator_health [--browser chrome] [--device desktop] [--headless]
+"""
+import argparse
+import sys
+import time
+
+from selenium.common.exceptions import TimeoutException
+
+from config.config import Config
+from locators.order_page_locators import OrderPageLocators
+from pages.order_page import OrderPage
+from utils.drivers import add_browser_arguments, browser_config, create_driver, get_device_class
+from utils.locator_converter import locator_index
+
+
+# (page object class, locator class) pairs checked by the preflight
+PREFLIGHT_PAGES = (
+    (OrderPage, OrderPageLocators),
+)
+
+FAILING_STATUSES = ("missing", "hidden", "ambiguous")
+# Seconds a page gets to show its READY_LOCATORS; broken ones are reported, not waited out
+READY_TIMEOUT = 5
+
+
+def declared_locators(locator_class) -> dict:
+    """
+    Returns:
+        dict: {attribute name: (locator_type, locator_value)} of the single locators
+              declared on the class (groups such as PAGE_READY are skipped)
+    """
+    return {
+        name: value
+        for name, value in vars(locator_class).items()
+        if not name.startswith("_")
+        and isinstance(value, tuple)
+        and len(value) == 2
+        and all(isinstance(part, str) for part in value)
+    }
+
+
+def check_page(page, locator_class) -> list:
+    """
+    Check every locator of `locator_class` and the READY_LOCATORS of `page` on the page it has loaded
+
+    Returns:
+        list: {'name', 'locator', 'count', 'visible', 'status'} per locator
+    """
+    locators = declared_locators(locator_class)
+    ready = set(page.READY_LOCATORS or ())
+    declared = set(locators.values())
+    for position, locator in enumerate(page.READY_LOCATORS or ()):
+        if locator not in declared:
+            locators[f"READY_LOCATORS[{position}]"] = locator
+    deferred = set(getattr(locator_class, "PREFLIGHT_DEFERRED", ())) - ready
+    multiple = set(getattr(locator_class, "PREFLIGHT_MULTIPLE", ()))
+    results = []
+    for (name, locator), counts in zip(locators.items(), page.match_counts(list(locators.values()))):
+        locator_type, locator_value = locator
+        if not counts["found"]:
+            status = "deferred" if locator in deferred else "missing"
+        elif locator in ready and not counts["visible"]:
+            status = "hidden"
+        elif counts["count"] > 1 and locator_index(locator_value) is None and locator not in multiple:
+            status = "ambiguous"
+        else:
+            status = "ok"
+        results.append({
+            "name": f"{locator_class.__name__}.{name}",
+            "locator": getattr(locator_value, "source", None) or f"{locator_type}: {locator_value}",
+            "count": counts["count"],
+            "visible": counts["visible"],
+            "status": status,
+        })
+    return results
+
+
+def run_preflight(driver, pages=PREFLIGHT_PAGES) -> dict:
+    """
+    Load each page once and check its locators
+
+    Returns:
+        dict: {'results': per-locator results of every page, 'seconds': float}
+    """
+    start = time.perf_counter()
+    # Pages only wait for the document on open(), the READY locators get READY_TIMEOUT below
+    settings = Config.current().replace(PAGE_READY_STRATEGY="document")
+    results = []
+    for page_class, locator_class in pages:
+        page = page_class(driver, settings)
+        page.open()
+        try:
+            page.wait_for_page_ready(timeout=READY_TIMEOUT)
+        except TimeoutException:
+            pass  # check_page reports which READY locators are missing or hidden
+        results.extend(check_page(page, locator_class))
+    return {"results": results, "seconds": round(time.perf_counter() - start, 2)}
+
+
+def failures(report: dict) -> list:
+    return [result for result in report["results"] if result["status"] in FAILING_STATUSES]
+
+
+def format_report(report: dict, verbose: bool = False) -> list:
+    """
+    Returns:
+        list: Report lines, only the failing locators unless verbose
+    """
+    rows = report["results"] if verbose else failures(report)
+    lines = [
+        f"{result['status']:<10} {result['count']:>3} match(es) "
+        f"{'visible' if result['visible'] else 'hidden':<8} {result['name']}  ({result['locator']})"
+        for result in rows
+    ]
+    lines.append(
+        f"{len(report['results'])} locators checked in {report['seconds']}s, "
+        f"{len(failures(report))} broken"
+    )
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_browser_arguments(parser, Config.current())
+    settings = browser_config(parser.parse_args(), Config.current())
+
+    site = None
+    if settings.ENV == "local":
+        from utils.local_site import start_local_site
+
+        site, settings = start_local_site(settings)
+    settings.activate()
+    driver = create_driver(settings.BROWSER, settings.HEADLESS, get_device_class(settings.DEVICE_TYPE))
+    try:
+        preflight = run_preflight(driver)
+    finally:
+        driver.quit()
+        if site:
+            site.stop()
+    print("\n".join(format_report(preflight, verbose=True)))
+    sys.exit(1 if failures(preflight) else 0)
@@ -0,0 +1,204 @@
+"""
+Shared Chromium for xdist workers: several scenarios at once in one browser process.
+
+With `-n W --contexts-per-worker=N` the controller starts one Chromium per N workers
+(ceil(W / N) in total) instead of one browser per worker. Every worker connects to its
+Chromium over CDP with its own Playwright instance and the regular `browser` fixture
+opens a fresh BrowserContext per test, so `-n 8 --contexts-per-worker=4` runs eight
+scenarios at once in two Chromium processes.
+
+Every worker is an ordinary pytest process: fixtures, output capture, logging and
+pytest-timeout behave as in any xdist run, only the browser process is shared.
+
+Isolation guarantees:
+    - Separate per test: cookies, localStorage/sessionStorage, IndexedDB, HTTP cache,
+      service workers and permissions (every test gets a new incognito BrowserContext).
+    - Separate per worker: every pytest fixture and all Python state.
+    - Shared by the workers of one Chromium: its CPU and memory (browser, GPU and network
+      service processes); a crash of that Chromium fails the running tests of all of them.
+"""
+import math
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+import psutil
+import pytest
+
+from utils.run_reports import publish_report, worker_id
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_tree_rss(pid: int) -> int:
+    """
+    Resident memory of a process and its children (Chromium: browser, renderers, GPU/network services)
+    """
+    try:
+        root = psutil.Process(pid)
+        processes = [root, *root.children(recursive=True)]
+    except psutil.NoSuchProcess:
+        return 0
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return total
+
+
+class SharedChromium:
+    """
+    One Chromium process, reachable over CDP, hosting the BrowserContexts of several workers
+    """
+
+    def __init__(self, headless: bool):
+        self.headless = headless
+        self.process = None
+        self.port = None
+        self.user_data_dir = None
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: int = 30):
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as playwright:
+            executable = playwright.chromium.executable_path
+
+        self.port = _free_port()
+        self.user_data_dir = tempfile.mkdtemp(prefix="multi-context-")
+        args = [
+            executable,
+            f"--remote-debugging-port={self.port}",
+            f"--user-data-dir={self.user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--no-sandbox",
+            "--disable-dev-shm-usage",
+        ]
+        if self.headless:
+            args.append("--headless=new")
+        self.process = subprocess.Popen(
+            [*args, "about:blank"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                urllib.request.urlopen(f"{self.endpoint}/json/version", timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        self.stop()
+        raise RuntimeError(f"Chromium did not open the CDP endpoint within {timeout} seconds")
+
+    def stop(self):
+        if self.process:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+class SharedChromiumPool:
+    """
+    Controller plugin: one SharedChromium per `contexts` xdist workers, assigned as the workers start
+    """
+
+    name = "shared_chromium_pool"
+
+    def __init__(self, headless: bool, workers: int, contexts: int):
+        self.workers = workers
+        self.contexts = contexts
+        self.chromiums = [SharedChromium(headless) for _ in range(math.ceil(workers / contexts))]
+
+    def start(self):
+        try:
+            for chromium in self.chromiums:
+                chromium.start()
+        except Exception:
+            self.stop()
+            raise
+
+    def stop(self):
+        for chromium in self.chromiums:
+            chromium.stop()
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node):
+        # gw0..gwN-1, a restarted worker gets the next free number
+        number = int(node.workerinput["workerid"].lstrip("gw"))
+        index = number // self.contexts % len(self.chromiums)
+        chromium = self.chromiums[index]
+        node.workerinput["shared_chromium"] = {
+            "endpoint": chromium.endpoint,
+            "pid": chromium.process.pid,
+            "index": index,
+            "workers": min(self.contexts, self.workers - index * self.contexts),
+        }
+
+    def pytest_unconfigure(self, config):
+        self.stop()
+
+
+class SharedChromiumWorker:
+    """
+    Worker plugin: the shared Chromium this worker connects to, with its throughput and memory
+    """
+
+    name = "shared_chromium_worker"
+
+    def __init__(self, shared: dict):
+        self.endpoint = shared["endpoint"]
+        self.pid = shared["pid"]
+        self.index = shared["index"]
+        self.workers = shared["workers"]
+        self.tests = 0
+        self.busy_seconds = 0.0
+        self.rss_samples = []
+        self.started = time.perf_counter()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        start = time.perf_counter()
+        yield
+        self.busy_seconds += time.perf_counter() - start
+        self.tests += 1
+        self.rss_samples.append(process_tree_rss(self.pid))
+
+    def pytest_sessionfinish(self, session):
+        if self.tests:
+            publish_report(session.config, "multi_context", self.summary(worker_id(session.config)))
+
+    def summary(self, worker: str) -> dict:
+        """
+        Throughput and memory of this worker's context. Chromium does not expose per-context
+        memory, so the process-tree RSS is attributed evenly to the workers sharing it.
+        """
+        wall_seconds = time.perf_counter() - self.started
+        samples = self.rss_samples or [0]
+        return {
+            "worker": worker,
+            "chromium": self.index,
+            "tests": self.tests,
+            "busy_seconds": round(self.busy_seconds, 2),
+            "tests_per_minute": round(self.tests / wall_seconds * 60, 2) if wall_seconds else 0.0,
+            "avg_rss_mb": round(sum(samples) / len(samples) / self.workers / 2 ** 20, 1),
+            "peak_browser_rss_mb": round(max(samples) / 2 ** 20, 1),
+            "runner_rss_mb": round(psutil.Process(os.getpid()).memory_info().rss / 2 ** 20, 1),
+        }
@@ -0,0 +1,333 @@
+"""
+Record and replay the browser's HTTP(S) traffic through a local in-process proxy
+(--network=record|replay).
+
+The browser is launched with the proxy and with certificate errors ignored; HTTPS is
+terminated in the proxy with a throwaway self-signed certificate, so it can see and
+answer every request. In record mode requests are forwarded upstream and stored per
+scenario; in replay mode they are answered from the store with no upstream call.
+
+Store layout (NETWORK_STORE directory):
+    blobs/<sha256>          zlib-compressed bodies, shared by every scenario
+    scenarios/<test>.json   ordered request/response index of one scenario
+
+A request is matched on method, URL and request body hash, then on method and URL
+without the query string (cache-busting parameters). Repeated requests are answered
+in recorded order. Unmatched requests get a 404 and are reported per test.
+"""
+import datetime
+import hashlib
+import http.client
+import json
+import logging
+import os
+import re
+import ssl
+import tempfile
+import threading
+import zlib
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+logger = logging.getLogger(__name__)
+
+# Headers that belong to one connection and are never stored or forwarded
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-connection", "proxy-authorization", "te",
+    "trailer", "transfer-encoding", "upgrade", "content-length",
+}
+
+
+class NetworkStore:
+    """
+    Content-addressed body store plus one request/response index per scenario
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "blobs"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "scenarios"), exist_ok=True)
+
+    def put_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.directory, "blobs", digest)
+        if not os.path.exists(path):
+            with open(path, "wb") as blob:
+                blob.write(zlib.compress(data))
+        return digest
+
+    def get_blob(self, digest: str) -> bytes:
+        with open(os.path.join(self.directory, "blobs", digest), "rb") as blob:
+            return zlib.decompress(blob.read())
+
+    def _scenario_path(self, name: str) -> str:
+        return os.path.join(self.directory, "scenarios", re.sub(r"[^A-Za-z0-9_.-]+", "_", name) + ".json")
+
+    def save_scenario(self, name: str, entries: list):
+        with open(self._scenario_path(name), "w") as index:
+            json.dump({"test": name, "entries": entries}, index, separators=(",", ":"))
+
+    def load_scenario(self, name: str):
+        """
+        Returns:
+            list: Recorded entries, or None if the scenario was never recorded
+        """
+        try:
+            with open(self._scenario_path(name)) as index:
+                return json.load(index)["entries"]
+        except FileNotFoundError:
+            return None
+
+
+def _body_hash(body: bytes):
+    return hashlib.sha256(body).hexdigest() if body else None
+
+
+def _without_query(url: str) -> str:
+    return url.split("?", 1)[0]
+
+
+def _self_signed_context() -> ssl.SSLContext:
+    """
+    TLS server context with a throwaway certificate; the browser ignores certificate errors
+    """
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "network-replay")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=30))
+        .sign(key, hashes.SHA256())
+    )
+
+    with tempfile.NamedTemporaryFile("wb", suffix=".pem", delete=False) as pem:
+        pem.write(certificate.public_bytes(serialization.Encoding.PEM))
+        pem.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    try:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(pem.name)
+    finally:
+        os.unlink(pem.name)
+    # The proxy only speaks HTTP/1.1 inside the tunnel
+    context.set_alpn_protocols(["http/1.1"])
+    return context
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    tunnel_host = None
+
+    def do_CONNECT(self):
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        try:
+            connection = self.server.proxy.ssl_context.wrap_socket(self.connection, server_side=True)
+        except (ssl.SSLError, OSError):
+            self.close_connection = True
+            return
+        # Serve the requests inside the tunnel, then drop the (now TLS) connection
+        _TunnelHandler(connection, self.client_address, self.server, self.path)
+        self.close_connection = True
+
+    def _relay(self):
+        if self.tunnel_host:
+            host, _, port = self.tunnel_host.partition(":")
+            authority = host if port in ("", "443") else self.tunnel_host
+            url = f"https://{authority}{self.path}"
+        else:
+            url = self.path
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, headers, payload = self.server.proxy.handle(self.command, url, self.headers.items(), body)
+
+        self.send_response(status)
+        for name, value in headers:
+            if name.lower() not in HOP_BY_HOP_HEADERS:
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _relay
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+class _TunnelHandler(_ProxyHandler):
+
+    def __init__(self, request, client_address, server, tunnel_host):
+        self.tunnel_host = tunnel_host
+        super().__init__(request, client_address, server)
+
+
+class _ProxyServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class NetworkProxy:
+    """
+    Local recording/replaying proxy for one pytest process; tests run one at a time per proxy
+    """
+
+    def __init__(self, store: NetworkStore, mode: str):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unsupported network mode: {mode}")
+        self.store = store
+        self.mode = mode
+        self.ssl_context = _self_signed_context()
+        self.server = _ProxyServer(("127.0.0.1", 0), _ProxyHandler)
+        self.server.proxy = self
+        self.tests = []
+        self._lock = threading.Lock()
+        self._scenario = None
+        self._recorded = []
+        self._unmatched = []
+        self._requests = 0
+        self._exact = {}
+        self._fallback = {}
+
+    @property
+    def address(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="network-proxy", daemon=True).start()
+        logger.info("Network %s proxy listening on %s", self.mode, self.address)
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def begin_scenario(self, name: str):
+        with self._lock:
+            self._scenario = name
+            self._recorded = []
+            self._unmatched = []
+            self._requests = 0
+            self._exact = defaultdict(deque)
+            self._fallback = defaultdict(deque)
+            if self.mode == "replay":
+                for entry in self.store.load_scenario(name) or []:
+                    self._exact[(entry["method"], entry["url"], entry["request_body"])].append(entry)
+                    self._fallback[(entry["method"], _without_query(entry["url"]))].append(entry)
+
+    def end_scenario(self):
+        with self._lock:
+            name, self._scenario = self._scenario, None
+            if self.mode == "record":
+                self.store.save_scenario(name, self._recorded)
+            self.tests.append({
+                "test": name,
+                "requests": self._requests,
+                "recorded": len(self._recorded),
+                "unmatched": list(self._unmatched),
+            })
+
+    def handle(self, method: str, url: str, headers, body: bytes):
+        """
+        Answer one proxied request
+
+        Returns:
+            tuple: (status, [(header, value)], body)
+        """
+        with self._lock:
+            self._requests += 1
+            scenario = self._scenario
+        request_hash = _body_hash(body)
+
+        if self.mode == "replay":
+            entry = self._match(method, url, request_hash)
+            if entry is None:
+                with self._lock:
+                    self._unmatched.append(f"{method} {url}")
+                return 404, [("Content-Type", "text/plain")], b"Not recorded"
+            return entry["status"], entry["headers"], self.store.get_blob(entry["body"])
+
+        try:
+            status, response_headers, payload = self._forward(method, url, headers, body)
+        except (OSError, http.client.HTTPException) as exc:
+            logger.warning("Upstream request failed: %s %s (%s)", method, url, exc)
+            return 502, [("Content-Type", "text/plain")], b"Upstream request failed"
+
+        if scenario is not None:
+            entry = {
+                "method": method,
+                "url": url,
+                "request_body": request_hash,
+                "status": status,
+                "headers": [[name, value] for name, value in response_headers
+                            if name.lower() not in HOP_BY_HOP_HEADERS],
+                "body": self.store.put_blob(payload),
+            }
+            with self._lock:
+                self._recorded.append(entry)
+        return status, response_headers, payload
+
+    def _match(self, method, url, request_hash):
+        with self._lock:
+            for candidates in (
+                self._exact.get((method, url, request_hash)),
+                self._fallback.get((method, _without_query(url))),
+            ):
+                if candidates:
+                    # Serve repeated requests in recorded order, then keep answering the last one
+                    return candidates.popleft() if len(candidates) > 1 else candidates[0]
+        return None
+
+    @staticmethod
+    def _forward(method, url, headers, body):
+        parts = urlsplit(url)
+        if parts.scheme == "https":
+            connection = http.client.HTTPSConnection(
+                parts.hostname, parts.port or 443, context=ssl.create_default_context(), timeout=30
+            )
+        else:
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+        try:
+            connection.request(
+                method, path, body=body or None,
+                headers={name: value for name, value in headers if name.lower() not in HOP_BY_HOP_HEADERS},
+            )
+            response = connection.getresponse()
+            # Bodies are passed through as received (still content-encoded)
+            return response.status, response.getheaders(), response.read()
+        finally:
+            connection.close()
+
+    def summary(self) -> dict:
+        """
+        Requests and unmatched requests per test for the run report
+
+        Returns:
+            dict: JSON-serializable network summary
+        """
+        return {
+            "mode": self.mode,
+            "store": self.store.directory,
+            "tests": self.tests,
+            "requests": sum(test["requests"] for test in self.tests),
+            "unmatched": sum(len(test["unmatched"]) for test in self.tests),
+        }
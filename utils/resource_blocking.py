@@ -0,0 +1,462 @@
+"""
+Apply a ResourceProfile (config/resource_profiles.py) to the browser under test, count
+what it blocked and the bytes that saved.
+
+    Playwright:          BrowserContext.route
+    Selenium + Chromium: CDP Fetch interception (Fetch.enable patterns per resource type
+                         and URL pattern) over Selenium's CDP websocket
+    Selenium + Firefox:  WebDriver BiDi network.addIntercept, with the resource type taken
+                         from the request destination
+
+Every engine decides with ResourceProfile.blocks(), so resource types, URL patterns and
+the allow list behave the same everywhere. A paused request has to be answered while the
+test is driving the page, so the Selenium interceptors run in a background thread per driver.
+
+A blocked request never gets a response, so its size comes from a baseline run
+(--resource-baseline): the requests the profile matches load as usual and their transfer
+sizes are kept in RESOURCE_SIZES_FILE. Blocking runs add up the recorded sizes of what they
+blocked and count the requests without a recorded size as unsized.
+"""
+import json
+import logging
+import math
+import os
+import threading
+import urllib.request
+
+import trio
+
+from config.resource_profiles import RESOURCE_PROFILES, guess_resource_type
+from pages.base_actions.driver_state import get_driver_state
+
+
+logger = logging.getLogger(__name__)
+
+# How a profile is applied per engine, printed with the summary
+BLOCKING_METHODS = {
+    "playwright": "context routing by resource type and URL, allow list honoured",
+    "chromium": "CDP Fetch interception by resource type and URL, allow list honoured",
+    "firefox": "WebDriver BiDi interception by request destination and URL, allow list honoured",
+    "unsupported": "no request interception for this browser, nothing blocked",
+}
+
+# Seconds a Selenium interceptor may take to connect to the browser
+CONNECT_TIMEOUT = 10
+
+# WebDriver BiDi request destinations (Fetch standard) as CDP/Playwright resource types
+DESTINATION_TYPES = {
+    "document": "document",
+    "iframe": "document",
+    "frame": "document",
+    "style": "stylesheet",
+    "script": "script",
+    "worker": "script",
+    "sharedworker": "script",
+    "serviceworker": "script",
+    "image": "image",
+    "font": "font",
+    "audio": "media",
+    "video": "media",
+    "track": "texttrack",
+    "manifest": "manifest",
+}
+# Requests without a destination, by initiator type
+INITIATOR_TYPES = {
+    "fetch": "fetch",
+    "xmlhttprequest": "xhr",
+}
+
+
+def _without_query(url: str) -> str:
+    return url.split("?", 1)[0]
+
+
+class ResourceSizes:
+    """
+    Transfer sizes in bytes per URL, recorded by --resource-baseline runs
+    """
+
+    def __init__(self, sizes: dict):
+        self.sizes = sizes
+        # Cache-busting query parameters change between runs
+        self._without_query = {_without_query(url): size for url, size in sizes.items()}
+
+    def lookup(self, url: str):
+        """
+        Returns:
+            int: Recorded size of the URL, None if it was never recorded
+        """
+        size = self.sizes.get(url)
+        return self._without_query.get(_without_query(url)) if size is None else size
+
+
+def load_sizes(path: str) -> ResourceSizes:
+    try:
+        with open(path) as sizes:
+            return ResourceSizes(json.load(sizes).get("sizes", {}))
+    except FileNotFoundError:
+        return ResourceSizes({})
+    except (ValueError, OSError) as exc:
+        logger.warning("Ignoring unreadable resource sizes %s: %s", path, exc)
+        return ResourceSizes({})
+
+
+def save_sizes(path: str, summaries: list):
+    """
+    Add the sizes recorded by every worker to RESOURCE_SIZES_FILE and write it atomically
+    """
+    new_sizes = [summary["sizes"] for summary in summaries if summary["sizes"]]
+    if not new_sizes:
+        return
+    sizes = load_sizes(path).sizes
+    for recorded in new_sizes:
+        sizes.update(recorded)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as file:
+        json.dump({"sizes": sizes}, file, indent=1, sort_keys=True)
+    os.replace(temporary, path)
+
+
+class RequestInterceptor:
+    """
+    Background thread answering the paused requests of one Selenium driver.
+
+    apply() sets the profile for the next test and returns once the browser intercepts
+    accordingly; collect() takes the requests the profile matched since. Subclasses
+    connect in _serve() and call _connected() once requests can be intercepted.
+    """
+
+    method = None
+
+    def __init__(self):
+        self.profile = RESOURCE_PROFILES["off"]
+        self.baseline = False
+        self._matched = []
+        # Matched requests of a baseline run waiting for their size, by request id
+        self._loading = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._token = None
+        self._error = None
+
+    def start(self):
+        threading.Thread(target=trio.run, args=(self._run,), name=f"{self.method}-interceptor", daemon=True).start()
+        if not self._ready.wait(CONNECT_TIMEOUT):
+            raise TimeoutError(f"Request interceptor did not connect in {CONNECT_TIMEOUT} seconds")
+        if self._error:
+            raise self._error
+
+    def apply(self, profile, baseline: bool = False):
+        with self._lock:
+            self._matched = []
+            self._loading = {}
+        trio.from_thread.run(self._enable, profile, baseline, trio_token=self._token)
+
+    def collect(self) -> list:
+        """
+        Returns:
+            list: {"url", "type"} per matched request, plus "bytes" once loaded in a baseline run
+        """
+        with self._lock:
+            matched, self._matched = self._matched, []
+        return matched
+
+    async def _run(self):
+        try:
+            await self._serve()
+        except Exception as exc:
+            # Ends with the browser session; only an error before _connected() is raised
+            self._error = exc
+            logger.debug("%s request interceptor stopped: %s", self.method, exc)
+        finally:
+            self._ready.set()
+
+    def _connected(self):
+        self._token = trio.lowlevel.current_trio_token()
+        self._ready.set()
+
+    async def _serve(self):
+        raise NotImplementedError
+
+    async def _enable(self, profile, baseline: bool):
+        raise NotImplementedError
+
+    def _match(self, request_id, url: str, resource_type: str) -> bool:
+        """
+        Record a request the profile matches
+
+        Returns:
+            bool: True if the request is to be blocked
+        """
+        if not self.profile.blocks(url, resource_type):
+            return False
+        request = {"url": url, "type": resource_type}
+        with self._lock:
+            self._matched.append(request)
+            if self.baseline and request_id is not None:
+                self._loading[request_id] = request
+        return not self.baseline
+
+    def _loaded(self, request_id, size):
+        with self._lock:
+            request = self._loading.pop(request_id, None)
+        if request is not None:
+            request["bytes"] = int(size)
+
+
+class CdpRequestInterceptor(RequestInterceptor):
+    """
+    Chromium: Fetch.requestPaused for the profile's resource types and URL patterns, on the page target
+    """
+
+    method = "chromium"
+
+    def __init__(self, driver):
+        super().__init__()
+        self._url, self._version = _cdp_endpoint(driver)
+        self._session = None
+        self._devtools = None
+
+    async def _serve(self):
+        from selenium.webdriver.common.bidi import cdp
+
+        devtools = self._devtools = cdp.import_devtools(self._version)
+        async with cdp.open_cdp(self._url) as connection:
+            targets = await connection.execute(devtools.target.get_targets())
+            target_id = next(target.target_id for target in targets if target.type_ == "page")
+            async with connection.open_session(target_id) as session:
+                self._session = session
+                # Unbuffered: a dropped requestPaused event would stall its request for good
+                events = session.listen(devtools.fetch.RequestPaused, devtools.network.LoadingFinished,
+                                        buffer_size=math.inf)
+                self._connected()
+                async for event in events:
+                    if isinstance(event, devtools.network.LoadingFinished):
+                        self._loaded(event.request_id, event.encoded_data_length)
+                    elif self._match(event.network_id, event.request.url, event.resource_type.value.lower()):
+                        await session.execute(devtools.fetch.fail_request(
+                            event.request_id, devtools.network.ErrorReason.BLOCKED_BY_CLIENT
+                        ))
+                    else:
+                        await session.execute(devtools.fetch.continue_request(event.request_id))
+
+    async def _enable(self, profile, baseline: bool):
+        fetch, network = self._devtools.fetch, self._devtools.network
+        resource_types = {resource_type.value.lower(): resource_type for resource_type in network.ResourceType}
+        patterns = [
+            fetch.RequestPattern(url_pattern="*", resource_type=resource_types[resource_type])
+            for resource_type in profile.block_types
+            if resource_type in resource_types
+        ]
+        patterns.extend(fetch.RequestPattern(url_pattern=pattern) for pattern in profile.block_patterns)
+        self.profile, self.baseline = profile, baseline
+        # Network events only for the sizes of a baseline run
+        await self._session.execute(network.enable() if baseline else network.disable())
+        await self._session.execute(fetch.enable(patterns=patterns) if patterns else fetch.disable())
+
+
+def _cdp_endpoint(driver) -> tuple:
+    """
+    Returns:
+        tuple: (CDP websocket URL, devtools version) of a local or Grid Chromium session
+    """
+    if driver.caps.get("se:cdp"):
+        return driver.caps["se:cdp"], driver.caps["se:cdpVersion"].split(".")[0]
+    address = driver.caps["goog:chromeOptions"]["debuggerAddress"]
+    with urllib.request.urlopen(f"http://{address}/json/version", timeout=CONNECT_TIMEOUT) as response:
+        details = json.load(response)
+    return details["webSocketDebuggerUrl"], details["Browser"].split("/")[1].split(".")[0]
+
+
+class BidiRequestInterceptor(RequestInterceptor):
+    """
+    Firefox: WebDriver BiDi beforeRequestSent interception of every request while a profile is enabled.
+    BiDi URL patterns are not globs, so the profile decides per request.
+    """
+
+    method = "firefox"
+
+    def __init__(self, driver):
+        super().__init__()
+        self._url = driver.caps["webSocketUrl"]
+        self._socket = None
+        self._replies = {}
+        self._last_id = 0
+        self._intercept = None
+
+    async def _serve(self):
+        from trio_websocket import open_websocket_url
+
+        events_in, events = trio.open_memory_channel(math.inf)
+        async with open_websocket_url(self._url) as socket, trio.open_nursery() as nursery:
+            self._socket = socket
+            nursery.start_soon(self._read, events_in)
+            await self._command("session.subscribe", {
+                "events": ["network.beforeRequestSent", "network.responseCompleted"],
+            })
+            self._connected()
+            async for event in events:
+                params = event["params"]
+                if event["method"] == "network.responseCompleted":
+                    self._loaded(params["request"]["request"], params["response"].get("bytesReceived") or 0)
+                elif params.get("isBlocked"):
+                    request = params["request"]
+                    blocked = self._match(request["request"], request["url"], bidi_resource_type(request))
+                    await self._command(
+                        "network.failRequest" if blocked else "network.continueRequest",
+                        {"request": request["request"]},
+                    )
+
+    async def _read(self, events_in):
+        while True:
+            message = json.loads(await self._socket.get_message())
+            if "id" in message:
+                self._replies.pop(message["id"]).send_nowait(message)
+            elif "method" in message:
+                events_in.send_nowait(message)
+
+    async def _command(self, method: str, params: dict) -> dict:
+        self._last_id += 1
+        reply_in, reply = trio.open_memory_channel(1)
+        self._replies[self._last_id] = reply_in
+        await self._socket.send_message(json.dumps({"id": self._last_id, "method": method, "params": params}))
+        message = await reply.receive()
+        if "error" in message:
+            raise RuntimeError(f"{method} failed: {message['error']} {message.get('message', '')}")
+        return message["result"]
+
+    async def _enable(self, profile, baseline: bool):
+        self.profile, self.baseline = profile, baseline
+        if self._intercept:
+            await self._command("network.removeIntercept", {"intercept": self._intercept})
+            self._intercept = None
+        if profile.enabled:
+            result = await self._command("network.addIntercept", {"phases": ["beforeRequestSent"]})
+            self._intercept = result["intercept"]
+
+
+def bidi_resource_type(request: dict) -> str:
+    """
+    CDP/Playwright resource type of a WebDriver BiDi request, from its destination or initiator type.
+    Firefox versions that report neither get a guess from the file extension.
+    """
+    destination = request.get("destination")
+    if destination:
+        return DESTINATION_TYPES.get(destination, "other")
+    return INITIATOR_TYPES.get(request.get("initiatorType")) or guess_resource_type(request["url"])
+
+
+def apply_selenium_profile(driver, profile, baseline: bool = False):
+    """
+    Apply the profile of the next test to a (possibly reused) driver, connecting its interceptor on first use
+    """
+    state = get_driver_state(driver)
+    if state.request_interceptor is None:
+        if hasattr(driver, "execute_cdp_cmd"):
+            state.request_interceptor = CdpRequestInterceptor(driver)
+        elif driver.caps.get("webSocketUrl"):
+            state.request_interceptor = BidiRequestInterceptor(driver)
+        else:
+            return
+        state.request_interceptor.start()
+    state.request_interceptor.apply(profile, baseline)
+
+
+def collect_selenium_blocked(driver) -> tuple:
+    """
+    Requests matched by the profile since apply_selenium_profile()
+
+    Returns:
+        tuple: (BLOCKING_METHODS key, [{"url", "type"[, "bytes"]}])
+    """
+    interceptor = get_driver_state(driver).request_interceptor
+    if interceptor is None:
+        return "unsupported", []
+    return interceptor.method, interceptor.collect()
+
+
+def route_playwright_profile(context, profile, blocked: list, baseline: bool = False):
+    """
+    Abort requests of the BrowserContext matched by the profile, appending them to `blocked`;
+    in a baseline run they load and get their transfer size instead
+    """
+    loading = {}
+
+    def _handle(route):
+        request = route.request
+        if not profile.blocks(request.url, request.resource_type):
+            route.fallback()
+            return
+        matched = {"url": request.url, "type": request.resource_type}
+        blocked.append(matched)
+        if baseline:
+            loading[request] = matched
+            route.fallback()
+        else:
+            route.abort("blockedbyclient")
+
+    def _finished(request):
+        matched = loading.pop(request, None)
+        if matched is not None:
+            sizes = request.sizes()
+            matched["bytes"] = sizes["responseHeadersSize"] + sizes["responseBodySize"]
+
+    context.route("**/*", _handle)
+    if baseline:
+        context.on("requestfinished", _finished)
+
+
+class ResourceBlockingStats:
+    """
+    Blocked requests, bytes saved and navigation time per test, for the run report.
+    In a baseline run nothing is blocked: the matched requests load and their sizes are
+    kept for RESOURCE_SIZES_FILE.
+    """
+
+    def __init__(self, sizes: ResourceSizes = None, baseline: bool = False):
+        self.known_sizes = sizes or ResourceSizes({})
+        self.baseline = baseline
+        self.recorded_sizes = {}
+        self.tests = []
+
+    def record(self, nodeid: str, profile, method: str, blocked: list, navigations: list):
+        by_type = {}
+        bytes_saved = 0
+        unsized = 0
+        for request in blocked:
+            by_type[request["type"]] = by_type.get(request["type"], 0) + 1
+            if self.baseline:
+                size = request.get("bytes")
+                if size is not None:
+                    self.recorded_sizes[request["url"]] = size
+            else:
+                size = self.known_sizes.lookup(request["url"])
+            if size is None:
+                unsized += 1
+            else:
+                bytes_saved += size
+        self.tests.append({
+            "test": nodeid,
+            "profile": profile.name,
+            "method": method,
+            "blocked": len(blocked),
+            "blocked_by_type": by_type,
+            "bytes_saved": bytes_saved,
+            "unsized": unsized,
+            "navigation_seconds": round(sum(navigation["seconds"] for navigation in navigations), 3),
+        })
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: JSON-serializable blocking summary
+        """
+        return {
+            "baseline": self.baseline,
+            "tests": self.tests,
+            "blocked": sum(test["blocked"] for test in self.tests),
+            "bytes_saved": sum(test["bytes_saved"] for test in self.tests),
+            "unsized": sum(test["unsized"] for test in self.tests),
+            "methods": sorted({test["method"] for test in self.tests}),
+            "sizes": self.recorded_sizes,
+        }
@@ -0,0 +1,61 @@
+import pytest
+
+
+_REPORTS_KEY = pytest.StashKey[dict]()
+
+
+def is_xdist_worker(config) -> bool:
+    """
+    Check whether the current process is a pytest-xdist worker
+
+    Args:
+        config: pytest config object
+
+    Returns:
+        bool: True when running inside an xdist worker process
+    """
+    return hasattr(config, "workerinput")
+
+
+def worker_id(config) -> str:
+    """
+    Get the xdist worker id ("gw0", "gw1", ...) or "main" when running without xdist
+    """
+    if is_xdist_worker(config):
+        return config.workerinput.get("workerid", "gw?")
+    return "main"
+
+
+def publish_report(config, name: str, data):
+    """
+    Publish a run report so the controlling process can print it in the terminal summary.
+
+    Inside an xdist worker the data travels back through ``config.workeroutput``,
+    so it must only contain plain JSON-like types (dict, list, str, int, float, bool).
+
+    Args:
+        config: pytest config object
+        name: Report name, e.g. 'driver_pool'
+        data: Report payload
+    """
+    if is_xdist_worker(config):
+        config.workeroutput[name] = data
+        return
+    config.stash.setdefault(_REPORTS_KEY, {}).setdefault(name, []).append(data)
+
+
+def collect_worker_output(config, workeroutput: dict):
+    """
+    Store the reports a finished xdist worker sent back (called from pytest_testnodedown)
+    """
+    reports = config.stash.setdefault(_REPORTS_KEY, {})
+    for name, data in workeroutput.items():
+        if isinstance(data, (dict, list)):
+            reports.setdefault(name, []).append(data)
+
+
+def get_reports(config, name: str) -> list:
+    """
+    Get every published payload for the given report name (one entry per worker)
+    """
+    return config.stash.get(_REPORTS_KEY, {}).get(name, [])
@@ -0,0 +1,243 @@
+"""
+Step and wait timing trace (--timing-trace).
+
+Every BDD step and every BaseAction wait (methods decorated with @traced_wait) is
+recorded with its test, step, locator, condition, timeout, time spent and outcome:
+
+    TRACE_DIR/timing-<worker>.jsonl   one JSON event per line, written as they happen
+    TRACE_DIR/timing-<worker>.json    Chrome trace-event export (chrome://tracing, Perfetto)
+
+Tracing is off unless a TimingTrace is activated; without it and without a wait timeout
+policy the decorator costs two checks.
+"""
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+from utils import wait_timeouts
+
+
+_active_trace = None
+
+
+def traced_wait(method):
+    """
+    Record a BaseAction wait method call in the active timing trace and apply the active
+    wait timeout policy (utils/wait_timeouts.py) to its `timeout` argument
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        trace = _active_trace
+        timeouts = wait_timeouts.active
+        if trace is None and timeouts is None:
+            return method(self, *args, **kwargs)
+
+        arguments = signature.bind(self, *args, **kwargs)
+        arguments.apply_defaults()
+        locator = _describe_locators(arguments.arguments)
+        timeout = arguments.arguments.get("timeout")
+        if timeout is None:
+            timeout = self.config.DEFAULT_TIMEOUT
+        if timeouts is None:
+            return _traced_call(trace, method, arguments, locator, timeout)
+
+        wait = f"{method.__name__}({locator})"
+        timeout = timeouts.begin(wait, timeout)
+        if "timeout" in arguments.arguments:
+            arguments.arguments["timeout"] = timeout
+        start = time.perf_counter()
+        succeeded = False
+        try:
+            result = _traced_call(trace, method, arguments, locator, timeout)
+            succeeded = result is not False
+            return result
+        finally:
+            timeouts.end(wait, time.perf_counter() - start, succeeded)
+
+    return wrapper
+
+
+def _traced_call(trace, method, arguments, locator, timeout):
+    if trace is None:
+        return method(*arguments.args, **arguments.kwargs)
+    with trace.span("wait", method.__name__, {"locator": locator, "timeout": timeout}) as span:
+        result = method(*arguments.args, **arguments.kwargs)
+        if result is False:
+            span["outcome"] = "false"
+        return result
+
+
+def _describe_locators(arguments) -> str:
+    if "locator_type" in arguments:
+        return f"{arguments['locator_type']}: {arguments['locator_value']}"
+    if arguments.get("locators"):
+        return " | ".join(f"{locator_type}: {locator_value}" for locator_type, locator_value in arguments["locators"])
+    return arguments.get("url") or ""
+
+
+class _Span:
+
+    def __init__(self, trace, kind, name, fields):
+        self.trace = trace
+        self.event = {"type": kind, "name": name, **fields}
+
+    def __enter__(self):
+        context = self.trace.context()
+        self.event.update(test=context.test, step=context.step, depth=context.depth)
+        context.depth += 1
+        self.event["start"] = time.time()
+        self._start = time.perf_counter()
+        return self.event
+
+    def __exit__(self, exc_type, exc, tb):
+        self.event["seconds"] = round(time.perf_counter() - self._start, 4)
+        if exc_type is not None:
+            self.event["outcome"] = exc_type.__name__
+        self.event.setdefault("outcome", "ok")
+        self.trace.context().depth -= 1
+        self.trace.write(self.event)
+        return False
+
+
+class TimingTrace:
+    """
+    Timing events of one pytest process, with slowest-step/locator aggregates
+    """
+
+    def __init__(self, directory: str, worker: str):
+        os.makedirs(directory, exist_ok=True)
+        self.worker = worker
+        self.jsonl_path = os.path.join(directory, f"timing-{worker}.jsonl")
+        self.chrome_path = os.path.join(directory, f"timing-{worker}.json")
+        self.events = []
+        self._file = open(self.jsonl_path, "w", buffering=1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def activate(self):
+        global _active_trace
+        _active_trace = self
+
+    def close(self):
+        global _active_trace
+        if _active_trace is self:
+            _active_trace = None
+        self._file.close()
+
+    def context(self):
+        """
+        Test, step and wait nesting depth of the calling thread
+        """
+        local = self._local
+        if not hasattr(local, "test"):
+            local.test, local.step, local.depth, local.step_start = None, None, 0, None
+        return local
+
+    def span(self, kind: str, name: str, fields: dict = None) -> _Span:
+        return _Span(self, kind, name, fields or {})
+
+    def write(self, event: dict):
+        with self._lock:
+            self.events.append(event)
+            self._file.write(json.dumps(event) + "\n")
+
+    def step_started(self, test: str, step: str):
+        context = self.context()
+        context.test, context.step = test, step
+        context.step_start = (time.time(), time.perf_counter())
+
+    def step_finished(self, outcome: str):
+        context = self.context()
+        if context.step_start is None:
+            return
+        start, perf_start = context.step_start
+        self.write({
+            "type": "step",
+            "name": context.step,
+            "test": context.test,
+            "step": context.step,
+            "depth": 0,
+            "start": start,
+            "seconds": round(time.perf_counter() - perf_start, 4),
+            "outcome": outcome,
+        })
+        context.step, context.step_start = None, None
+
+    def export_chrome_trace(self):
+        """
+        Write the events as Chrome trace-event 'complete' events, one track per test
+        """
+        if not self.events:
+            return
+        origin = min(event["start"] for event in self.events)
+        pid = os.getpid()
+        tracks = {}
+        trace_events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": self.worker}}]
+        for event in self.events:
+            track = tracks.setdefault(event["test"], len(tracks) + 1)
+            trace_events.append({
+                "name": event["name"] if event["type"] == "step" else f"{event['name']} {event['locator']}",
+                "cat": event["type"],
+                "ph": "X",
+                "ts": round((event["start"] - origin) * 1e6),
+                "dur": round(event["seconds"] * 1e6),
+                "pid": pid,
+                "tid": track,
+                "args": {key: value for key, value in event.items() if key not in ("start", "seconds")},
+            })
+        for test, track in tracks.items():
+            trace_events.append({
+                "name": "thread_name", "ph": "M", "pid": pid, "tid": track, "args": {"name": test or "(no test)"},
+            })
+        with open(self.chrome_path, "w") as chrome_trace:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, chrome_trace)
+
+    def summary(self) -> dict:
+        """
+        Time per step name and per locator (outermost waits only, nested waits are part of them)
+
+        Returns:
+            dict: {"steps": {name: (count, total, max, failures)}, "locators": {...}, "trace": path}
+        """
+        steps = {}
+        locators = {}
+        for event in self.events:
+            if event["type"] == "step":
+                _aggregate(steps, event["name"], event)
+            elif event["depth"] == 0:
+                _aggregate(locators, f"{event['name']}({event['locator']})", event)
+        return {"steps": steps, "locators": locators, "trace": self.jsonl_path}
+
+
+def _aggregate(totals: dict, key: str, event: dict):
+    count, total, longest, failures = totals.get(key, (0, 0.0, 0.0, 0))
+    totals[key] = (
+        count + 1,
+        round(total + event["seconds"], 4),
+        max(longest, event["seconds"]),
+        failures + (event["outcome"] != "ok" and event["outcome"] != "passed"),
+    )
+
+
+def merge_summaries(summaries: list, limit: int = 10) -> dict:
+    """
+    Combine the per-worker summaries and keep the `limit` slowest entries by total time
+
+    Returns:
+        dict: {"steps": [...], "locators": [...]} rows of (name, count, total, max, failures)
+    """
+    merged = {}
+    for kind in ("steps", "locators"):
+        totals = {}
+        for summary in summaries:
+            for key, (count, total, longest, failures) in summary[kind].items():
+                current = totals.get(key, (0, 0.0, 0.0, 0))
+                totals[key] = (current[0] + count, current[1] + total, max(current[2], longest), current[3] + failures)
+        rows = sorted(((key, *values) for key, values in totals.items()), key=lambda row: -row[2])
+        merged[kind] = rows[:limit]
+    return merged
@@ -0,0 +1,206 @@
+"""
+Adaptive wait timeouts and per-scenario wait budgets.
+
+--adaptive-timeouts=learn|on
+    The time every BaseAction wait (@traced_wait) takes to succeed is recorded per browser,
+    device, wait method and locator in WAIT_HISTORY_FILE. With 'on', a wait with at least
+    MIN_SAMPLES recorded successes gets TIMEOUT_MULTIPLIER x its p99 latency as timeout,
+    bounded by TIMEOUT_FLOOR and TIMEOUT_CEILING, instead of the hard-coded helper default.
+    'learn' only records, so the history can be built up before timeouts change.
+--scenario-budget=SECONDS
+    Every wait of a scenario is capped by the time left in the scenario's budget; once it
+    is spent, waits fail immediately instead of waiting out their timeout.
+
+Only the outermost wait is adapted and recorded. While either option is on, begin()
+records the deadline of every running wait and a nested wait (verify_element_not_clickable
+-> find_element) is clamped to the time its enclosing wait has left, like the budget; so
+are the WebDriverWaits a wait builds through BaseAction._wait() (cap_timeout).
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+
+
+logger = logging.getLogger(__name__)
+
+# Successes a wait needs in the history before its timeout is adapted
+MIN_SAMPLES = 5
+# Recent successes kept per wait
+HISTORY_SAMPLES = 100
+
+active = None
+
+
+def cap_timeout(timeout: float) -> float:
+    """
+    Cap a timeout by the time left in the scenario's budget and in the enclosing wait
+    (no-op without a wait timeout policy)
+    """
+    if active is None:
+        return timeout
+    remaining = active.remaining()
+    return timeout if remaining is None else max(0.0, min(timeout, remaining))
+
+
+def p99(samples) -> float:
+    """
+    Nearest-rank 99th percentile
+    """
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(0.99 * len(ordered)) - 1)]
+
+
+class WaitTimeouts:
+    """
+    Timeout policy for the waits of one pytest process
+    """
+
+    def __init__(self, history_path: str, browser: str, device: str, mode: str = "off",
+                 multiplier: float = 3.0, floor: float = 1.0, ceiling: float = 20.0, budget: float = 0):
+        if mode not in ("off", "learn", "on"):
+            raise ValueError(f"Unsupported adaptive timeout mode: {mode}")
+        self.mode = mode
+        self.prefix = f"{browser}|{device}|"
+        self.multiplier = multiplier
+        self.floor = floor
+        self.ceiling = ceiling
+        self.budget = budget
+        self.history = load_history(history_path) if mode != "off" else {}
+        self.samples = {}
+        self.adapted = 0
+        self.adapted_waits = set()
+        self.out_of_budget = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def activate(self):
+        global active
+        active = self
+
+    def deactivate(self):
+        global active
+        if active is self:
+            active = None
+
+    def _context(self):
+        local = self._local
+        if not hasattr(local, "deadlines"):
+            # deadline: scenario budget; deadlines: running (nested) waits, outermost first
+            local.test, local.deadline, local.deadlines = None, None, []
+        return local
+
+    def start_scenario(self, nodeid: str):
+        context = self._context()
+        context.test = nodeid
+        context.deadline = time.monotonic() + self.budget if self.budget else None
+
+    def end_scenario(self):
+        context = self._context()
+        context.test, context.deadline = None, None
+
+    def remaining(self):
+        """
+        Seconds left in the current scenario's budget and in the innermost running wait,
+        None outside of both
+        """
+        context = self._context()
+        deadlines = [deadline for deadline in (context.deadline, *context.deadlines[-1:]) if deadline is not None]
+        return min(deadlines) - time.monotonic() if deadlines else None
+
+    def timeout_for(self, wait: str, requested: float) -> float:
+        """
+        Adapted timeout of a wait ('wait_for_element_clickable(id: submit)'), or the requested one
+        """
+        if self.mode != "on":
+            return requested
+        samples = self.history.get(self.prefix + wait, [])
+        if len(samples) < MIN_SAMPLES:
+            return requested
+        return min(self.ceiling, max(self.floor, self.multiplier * p99(samples)))
+
+    def begin(self, wait: str, requested: float) -> float:
+        """
+        Enter a wait; every begin() must be followed by an end()
+
+        Returns:
+            float: Timeout to use, clamped to the budget and the enclosing wait's deadline
+
+        Raises:
+            TimeoutException: If the scenario budget is already spent
+        """
+        context = self._context()
+        now = time.monotonic()
+        if context.deadline is not None and context.deadline <= now:
+            with self._lock:
+                if context.test not in self.out_of_budget:
+                    self.out_of_budget.append(context.test)
+            raise TimeoutException(f"Scenario budget of {self.budget}s spent before {wait}")
+
+        timeout = requested
+        if not context.deadlines:
+            timeout = self.timeout_for(wait, requested)
+            if timeout != requested:
+                with self._lock:
+                    self.adapted += 1
+                    self.adapted_waits.add(wait)
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = max(0.0, min(timeout, remaining))
+        context.deadlines.append(now + timeout)
+        return timeout
+
+    def end(self, wait: str, seconds: float, succeeded: bool):
+        context = self._context()
+        context.deadlines.pop()
+        if not context.deadlines and succeeded and self.mode != "off":
+            with self._lock:
+                self.samples.setdefault(self.prefix + wait, []).append(round(seconds, 3))
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: JSON-serializable adaptation counts and the latencies recorded in this run
+        """
+        return {
+            "mode": self.mode,
+            "budget": self.budget,
+            "adapted": self.adapted,
+            "adapted_waits": len(self.adapted_waits),
+            "out_of_budget": self.out_of_budget,
+            "samples": self.samples,
+        }
+
+
+def load_history(path: str) -> dict:
+    try:
+        with open(path) as history:
+            return json.load(history).get("latencies", {})
+    except FileNotFoundError:
+        return {}
+    except (ValueError, OSError) as exc:
+        logger.warning("Ignoring unreadable wait latency history %s: %s", path, exc)
+        return {}
+
+
+def save_history(path: str, summaries: list):
+    """
+    Append the latencies recorded by every worker to the history and write it atomically
+    """
+    new_samples = [summary["samples"] for summary in summaries if summary["samples"]]
+    if not new_samples:
+        return
+    latencies = load_history(path)
+    for samples in new_samples:
+        for wait, seconds in samples.items():
+            recorded = latencies.setdefault(wait, [])
+            recorded.extend(seconds)
+            del recorded[:-HISTORY_SAMPLES]
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as history:
+        json.dump({"latencies": latencies}, history, indent=1, sort_keys=True)
+    os.replace(temporary, path)